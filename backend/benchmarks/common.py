@@ -0,0 +1,71 @@
+"""Shared helpers for the backend benchmarks.
+
+Run benchmarks from backend/, e.g. ``python -m benchmarks.user_cache``.
+Each app gets its own temporary SQLite file, with the schema created by
+create_all(), so runs never touch instance/. The auth rate limiter is off
+unless a benchmark turns it on, since every test client shares one address.
+"""
+import tempfile
+import time
+from sqlalchemy import event
+from finance_tracker import create_app
+from finance_tracker.extensions import db
+
+
+def make_app(**config):
+    workdir = tempfile.mkdtemp(prefix='finance-tracker-bench-')
+    settings = {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{workdir}/bench.db',
+        'RATELIMIT_ENABLED': False,
+    }
+    settings.update(config)
+    app = create_app(settings)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def register(client, email, password='benchmark-password', name='Bench User'):
+    """Register (or log in) a user and return auth headers."""
+    response = client.post('/auth/register', json={'name': name, 'email': email, 'password': password})
+    if response.status_code == 201:
+        token = response.get_json()['access_token']
+    else:
+        response = client.post('/auth/login', json={'email': email, 'password': password})
+        token = response.get_json()['data']['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+class QueryCounter:
+    """Count SQL statements executed on the app's engine while active."""
+
+    def __init__(self, app):
+        self.app = app
+        self.count = 0
+
+    def _count(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        with self.app.app_context():
+            self.engine = db.engine
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
@@ -0,0 +1,50 @@
+"""Polling cost with and without conditional GETs.
+
+Fetches each endpoint `--polls` times the way a polling dashboard would:
+once without validators, and once replaying the ETag from the first
+response in If-None-Match. Reports per-request time, bytes sent and SQL
+statements.
+
+    python -m benchmarks.conditional_get --goals 2000 --polls 200
+"""
+import argparse
+import time
+from benchmarks.common import make_app, register, QueryCounter
+from benchmarks.savings_lists import seed_goals
+
+
+def poll(app, client, headers, url, polls):
+    """(ms per request, bytes per request, SQL per request, status) over `polls` GETs"""
+    size = 0
+    with QueryCounter(app) as counter:
+        started = time.perf_counter()
+        for _ in range(polls):
+            response = client.get(url, headers=headers)
+            size += len(response.data)
+        elapsed = time.perf_counter() - started
+    return elapsed * 1000 / polls, size / polls, counter.count / polls, response.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--goals', type=int, default=2000)
+    parser.add_argument('--polls', type=int, default=200)
+    args = parser.parse_args()
+
+    app = make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    client = app.test_client()
+    headers = register(client, 'poller@example.com')
+    seed_goals(app, 1, args.goals)
+    # A real write so the user has a version row
+    client.post('/api/savings/rules', headers=headers, json={'type': 'round-up'})
+
+    print(f"{'endpoint':<22} {'mode':<14} {'ms/req':>8} {'bytes/req':>10} {'SQL/req':>8} {'status':>7}")
+    for url in ('/api/savings/goals', '/api/savings/rules', '/api/dashboard'):
+        etag = client.get(url, headers=headers).headers['ETag']
+        for mode, request_headers in (('unconditional', headers), ('If-None-Match', {**headers, 'If-None-Match': etag})):
+            ms, size, sql, status = poll(app, client, request_headers, url, args.polls)
+            print(f'{url:<22} {mode:<14} {ms:>8.2f} {size:>10.0f} {sql:>8.1f} {status:>7}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""Peak memory of /api/export against account size.
+
+Loads users with `--sizes` transactions each into one database, then for
+every size and format runs a single export in a fresh interpreter and
+reports how much its peak RSS grew while the response body was read, with
+the throughput and the size of the file. A fresh process per measurement
+keeps one export's high-water mark from hiding the next one's. Each
+process first exports a warm-up account of ROW_GROUP_ROWS rows, so the
+numbers are growth beyond one full batch.
+
+The children use the `default` database profile unless `--profile` says
+otherwise: the production profile's 64 MiB page cache and 256 MiB of
+memory-mapped reads fill up with whatever a process reads, which shows as
+RSS growth on any large query up to those caps (the mapped pages are the
+OS page cache, shared by every worker).
+
+For comparison, the "to_dict" row builds the export the obvious way: the
+user's rows as ORM objects, a list of to_dict() dicts, then one JSON body.
+
+Exits non-zero if a streaming export's peak growth on the largest account
+is more than `--tolerance-mb` above its growth on the smallest.
+
+    python -m benchmarks.export --sizes 10000,100000,500000
+"""
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+MODES = ('csv', 'csv.gz', 'parquet', 'parquet.gz')
+MERCHANTS = ('Blue Bottle Coffee', 'Whole Foods Market', 'Shell Oil 5521', 'Amazon Marketplace',
+             'City Power & Light', 'Netflix.com', 'Trader Joe\'s #112', 'Uber Trip', 'Corner Bakery')
+CATEGORIES = ('Food', 'Groceries', 'Transport', 'Shopping', 'Utilities', 'Entertainment')
+
+
+def load(app, sizes, warmup, seed, chunk=50000):
+    """Create the warm-up user and one user per size; returns their ids"""
+    from finance_tracker.extensions import db
+    from finance_tracker.models.savings import SavingsGoal, SavingsRule
+    from finance_tracker.models.transaction import Transaction
+    from finance_tracker.models.user import User
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    start = date.today() - timedelta(days=5 * 365)
+    user_ids = []
+    with app.app_context():
+        for size in (warmup, *sizes):
+            user = User(name=f'Export {size}', email=f'export{len(user_ids)}@example.com', password_hash='x')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add_all([SavingsGoal(user_id=user.id, name=f'Goal {i}', target_amount=100000 * (i + 1))
+                                for i in range(5)])
+            db.session.add(SavingsRule(user_id=user.id, type='round-up', is_active=True))
+            for offset in range(0, size, chunk):
+                db.session.execute(Transaction.__table__.insert(), [
+                    {
+                        'user_id': user.id,
+                        'date': start + timedelta(days=rng.randrange(5 * 365)),
+                        'amount': -rng.randrange(100, 20000),
+                        'description': f'CARD PAYMENT {rng.choice(MERCHANTS).upper()} #{rng.randrange(10000)}',
+                        'merchant': rng.choice(MERCHANTS),
+                        'category': rng.choice(CATEGORIES),
+                        'created_at': now,
+                    }
+                    for _ in range(min(chunk, size - offset))
+                ])
+            db.session.commit()
+            user_ids.append(user.id)
+    return user_ids
+
+
+def measure(database_url, profile, user_id, warmup_user_id, mode):
+    """Run in a fresh interpreter: (peak RSS growth MB, seconds, body bytes) of one export"""
+    from flask import jsonify
+    from flask_jwt_extended import create_access_token
+    from finance_tracker import create_app
+    from finance_tracker.models.transaction import Transaction
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_url, 'DATABASE_PROFILE': profile,
+                      'RATELIMIT_ENABLED': False, 'METRICS_ENABLED': False})
+    client = app.test_client()
+
+    def request(uid):
+        if mode == 'to_dict':
+            with app.test_request_context():
+                return jsonify([t.to_dict() for t in Transaction.query.filter_by(user_id=uid).order_by(Transaction.id)])
+        with app.app_context():
+            token = create_access_token(identity=str(uid))
+        headers = {'Authorization': f'Bearer {token}'}
+        fmt, _, gz = mode.partition('.')
+        query = f'format={fmt}' + ('&gzip=1' if gz else '')
+        return client.get(f'/api/export/transactions?{query}', headers=headers, buffered=False)
+
+    def consume(response):
+        size = sum(len(chunk) for chunk in response.iter_encoded())
+        response.close()
+        return size
+
+    consume(request(warmup_user_id))  # imports, first queries, caches
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    size = consume(request(user_id))
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return (peak - before) / 1024, elapsed, size
+
+
+def run_child(database_url, profile, user_id, warmup_user_id, mode):
+    result = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.export', '--child', database_url, profile,
+         str(user_id), str(warmup_user_id), mode],
+        cwd=BACKEND, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000,500000',
+                        help='Comma-separated transaction counts, one account each.')
+    parser.add_argument('--tolerance-mb', type=float, default=16)
+    parser.add_argument('--profile', default='default', help='DATABASE_PROFILE for the measured processes.')
+    parser.add_argument('--skip-to-dict', action='store_true', help='Leave out the to_dict() comparison.')
+    parser.add_argument('--seed', type=int, default=29)
+    parser.add_argument('--child', nargs=5, metavar=('URL', 'PROFILE', 'USER', 'WARMUP_USER', 'MODE'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        database_url, profile, user_id, warmup_user_id, mode = args.child
+        print(json.dumps(measure(database_url, profile, int(user_id), int(warmup_user_id), mode)))
+        return
+
+    from benchmarks.common import make_app
+    from finance_tracker.utils.export import ROW_GROUP_ROWS
+
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    app = make_app()
+    started = time.perf_counter()
+    warmup_user_id, *user_ids = load(app, sizes, ROW_GROUP_ROWS, args.seed)
+    print(f'Loaded {sum(sizes)} transactions for {len(sizes)} accounts in {time.perf_counter() - started:.1f}s\n')
+    database_url = app.config['SQLALCHEMY_DATABASE_URI']
+
+    modes = MODES if args.skip_to_dict else (*MODES, 'to_dict')
+    print(f"{'format':<11} {'rows':>9} {'peak RSS +MB':>13} {'seconds':>8} {'rows/s':>10} {'body MB':>9}")
+    growth = {}
+    for mode in modes:
+        for size, user_id in zip(sizes, user_ids):
+            peak_mb, elapsed, body = run_child(database_url, args.profile, user_id, warmup_user_id, mode)
+            growth[mode, size] = peak_mb
+            print(f'{mode:<11} {size:>9} {peak_mb:>13.1f} {elapsed:>8.2f} {size / elapsed:>10,.0f} '
+                  f'{body / 1e6:>9.1f}')
+        print()
+
+    failed = [mode for mode in MODES if growth[mode, sizes[-1]] - growth[mode, sizes[0]] > args.tolerance_mb]
+    if failed:
+        print(f"Peak memory grew with account size for: {', '.join(failed)}")
+        sys.exit(1)
+    print(f'Streaming exports stay within {args.tolerance_mb:.0f} MB of their smallest-account peak '
+          f'from {sizes[0]} to {sizes[-1]} rows')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Latency budget for savings goal forecasts.
+
+Seeds one user with `--months` of ledger history and `--goals` goals, then
+times the all-goals and single-goal forecast endpoints end to end through
+the test client. Exits non-zero if either p95 exceeds `--budget-ms`.
+
+    python -m benchmarks.forecast --goals 10 --requests 50 --budget-ms 50
+"""
+import argparse
+import io
+import random
+import sys
+import time
+from datetime import date, timedelta
+from benchmarks.common import make_app, register, percentile
+
+
+def ledger_csv(months, seed):
+    rng = random.Random(seed)
+    lines = ['Date,Amount,Description,Category']
+    start = date.today().replace(day=1)
+    for m in range(months):
+        month_start = start - timedelta(days=30 * m)
+        lines.append(f'{month_start.isoformat()},{round(rng.uniform(3500, 5000), 2)},Payroll,Income')
+        for i in range(60):
+            day = month_start + timedelta(days=i % 28)
+            lines.append(f'{day.isoformat()},-{round(rng.uniform(5, 120), 2)},Purchase {i},Shopping')
+    return '\n'.join(lines) + '\n'
+
+
+def measure(client, headers, url, requests):
+    client.get(url, headers=headers)  # warm-up
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.get_json()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--goals', type=int, default=10)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    app = make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    client = app.test_client()
+    headers = register(client, 'forecast@example.com')
+    client.post('/api/transactions/import', headers=headers,
+                data={'file': (io.BytesIO(ledger_csv(args.months, 3).encode()), 'ledger.csv')})
+    goal_ids = []
+    for i in range(args.goals):
+        deadline = (date.today() + timedelta(days=90 * (i + 1))).isoformat()
+        goal = client.post('/api/savings/goals', headers=headers,
+                           json={'name': f'Goal {i}', 'target_amount': 500 * (i + 1), 'deadline': deadline})
+        goal_ids.append(goal.get_json()['id'])
+
+    sample = client.get('/api/savings/goals/forecast', headers=headers).get_json()
+    print(f"inflow model: {sample['monthly_inflow']}")
+    for forecast in sample['forecasts'][:3]:
+        print(f"  goal {forecast['goal_id']}: p={forecast['completion_probability']} {forecast['completion_dates']}")
+
+    failed = False
+    print(f"{'endpoint':<28} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'budget':>8}")
+    for name, url in (('all goals', '/api/savings/goals/forecast'),
+                      ('single goal', f'/api/savings/goals/{goal_ids[0]}/forecast')):
+        latencies = measure(client, headers, url, args.requests)
+        p95 = percentile(latencies, 95)
+        ok = p95 <= args.budget_ms
+        failed |= not ok
+        print(f"{name:<28} {percentile(latencies, 50):>8.1f} {p95:>8.1f} {max(latencies):>8.1f} "
+              f"{'ok' if ok else 'OVER':>8}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Cold-start budget for `wsgi:app`.
+
+Starts fresh interpreters that import wsgi (building the app) under
+``python -X importtime`` and reports the median wall time, the slowest
+direct imports, and whether any integration that should load on first
+use (openai, plaid, numpy, pyarrow) was imported at startup. Exits non-zero if the
+median exceeds `--budget-ms` or a lazy integration was imported.
+
+    python -m benchmarks.import_time --runs 5 --budget-ms 900
+
+tests/test_import_time.py runs the same check under pytest.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+LAZY_MODULES = ('openai', 'plaid', 'numpy', 'pyarrow')
+BUDGET_MS = 900
+PROBE = ('import time; started = time.perf_counter(); import wsgi; '
+         'print((time.perf_counter() - started) * 1000)')
+
+
+def cold_start(database_url):
+    """(wall ms, {module: (self us, cumulative us, depth)}) for one fresh interpreter"""
+    env = dict(os.environ, DATABASE_URL=database_url, PYTHONDONTWRITEBYTECODE='')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE], cwd=BACKEND, env=env,
+                            capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.setdefault(name.strip(), (int(self_us), int(cumulative_us), depth))
+    return float(result.stdout.strip().splitlines()[-1]), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS)
+    parser.add_argument('--top', type=int, default=10, help='Slowest direct imports to list.')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='finance-tracker-import-')
+    database_url = f'sqlite:///{workdir}/import.db'
+    runs = [cold_start(database_url) for _ in range(args.runs)]
+    wall = statistics.median(ms for ms, _ in runs)
+    modules = runs[-1][1]
+
+    print(f'wsgi:app cold start: median {wall:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)')
+    print(f"\n{'import':<36} {'cumulative ms':>14}")
+    # What wsgi and the finance_tracker package pull in directly
+    direct = sorted(((cumulative, name) for name, (_, cumulative, depth) in modules.items()
+                     if depth <= 2 and name not in ('wsgi', 'finance_tracker')), reverse=True)
+    for cumulative, name in direct[:args.top]:
+        print(f'{name:<36} {cumulative / 1000:>14.1f}')
+
+    eager = [name for name in LAZY_MODULES if name in modules]
+    failed = False
+    if eager:
+        print(f"\nImported at startup but should load on first use: {', '.join(eager)}")
+        failed = True
+    if wall > args.budget_ms:
+        print(f'\nCold start {wall:.0f} ms is over the {args.budget_ms:.0f} ms budget')
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
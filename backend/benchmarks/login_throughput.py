@@ -0,0 +1,54 @@
+"""Login throughput under concurrency, inline hashing vs the hashing pool.
+
+    python -m benchmarks.login_throughput --threads 16 --logins 400
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.common import make_app, register, percentile
+from finance_tracker.utils.passwords import default_workers
+
+PASSWORD = 'benchmark-password'
+
+
+def run(workers, threads, logins, method, users=8):
+    app = make_app(PASSWORD_HASH_WORKERS=workers, PASSWORD_HASH_METHOD=method)
+    client = app.test_client()
+    emails = [f'login{i}@example.com' for i in range(users)]
+    for email in emails:
+        register(client, email, PASSWORD)
+
+    def login(i):
+        started = time.perf_counter()
+        response = app.test_client().post('/auth/login', json={'email': emails[i % users], 'password': PASSWORD})
+        # 503 means the hashing pool shed load; anything else is a bug
+        assert response.status_code in (200, 503), response.get_data(as_text=True)
+        return response.status_code, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    latencies = [seconds * 1000 for status, seconds in results if status == 200]
+    rejected = sum(1 for status, _ in results if status == 503)
+    return len(latencies) / elapsed, percentile(latencies, 50), percentile(latencies, 99), rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help='Hashing pool size for the pooled run.')
+    parser.add_argument('--method', default='scrypt',
+                        help='PASSWORD_HASH_METHOD to benchmark.')
+    args = parser.parse_args()
+
+    print(f"{'mode':<16} {'logins/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'rejected':>10}")
+    for label, workers in (('inline', 0), (f'pool x{args.workers}', args.workers)):
+        throughput, p50, p99, rejected = run(workers, args.threads, args.logins, args.method)
+        print(f'{label:<16} {throughput:>10.1f} {p50:>10.1f} {p99:>10.1f} {rejected:>10}')
+
+
+if __name__ == '__main__':
+    main()
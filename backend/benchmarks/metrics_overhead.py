@@ -0,0 +1,52 @@
+"""Per-request cost of the /metrics instrumentation.
+
+Runs the same polling workload against an app with METRICS_ENABLED and
+one without, then times rendering /metrics with every series slot used.
+
+    python -m benchmarks.metrics_overhead --requests 2000
+"""
+import argparse
+import time
+from benchmarks.common import make_app, register, percentile
+from finance_tracker.extensions import metrics
+from finance_tracker.utils.metrics import RouteSeries
+
+
+def run(app, requests):
+    client = app.test_client()
+    headers = register(client, 'metrics@example.com')
+    client.post('/api/savings/goals', headers=headers, json={'name': 'Trip', 'target_amount': 500})
+    samples = []
+    for i in range(requests):
+        url = '/api/savings/goals' if i % 2 else '/api/dashboard'
+        started = time.perf_counter()
+        client.get(url, headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'metrics':<9} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for enabled in (False, True):
+        samples = run(make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', METRICS_ENABLED=enabled), args.requests)
+        print(f"{'on' if enabled else 'off':<9} {sum(samples) / len(samples):>8.3f} "
+              f"{percentile(samples, 50):>8.3f} {percentile(samples, 95):>8.3f}")
+
+    app = make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', METRICS_TOKEN='benchmark')
+    client = app.test_client()
+    for i in range(metrics.max_series):
+        series = metrics.routes[(f'/route/{i}', 'GET')] = RouteSeries()
+        series.latency.observe(0.01)
+        series.statuses[200] = 1
+    started = time.perf_counter()
+    body = client.get('/metrics', headers={'Authorization': 'Bearer benchmark'}).get_data()
+    print(f'/metrics with {len(metrics.routes)} series: {(time.perf_counter() - started) * 1000:.1f} ms, '
+          f'{len(body) / 1024:.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
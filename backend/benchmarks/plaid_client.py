@@ -0,0 +1,91 @@
+"""Plaid client behaviour under load and upstream failure, against the local stub.
+
+Compares a bare PlaidApi call (what routes/auth.py used to do) with the
+PlaidGateway in three scenarios:
+
+* healthy  - every call succeeds after `--latency` seconds
+* flaky    - `--error-rate` of calls fail with a 503
+* outage   - every call fails with a 503
+* hung     - the stub takes `--hang` seconds, longer than the gateway timeout
+
+    python -m benchmarks.plaid_client --threads 32 --calls 400 --latency 0.05
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.common import percentile
+from benchmarks.plaid_stub import start_stub
+from finance_tracker.utils.plaid_client import PlaidGateway, create_plaid_client
+
+
+def exchange_request():
+    from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
+    return ItemPublicTokenExchangeRequest(public_token='public-stub')
+
+
+def run(call, threads, calls):
+    def one(_):
+        started = time.perf_counter()
+        try:
+            call()
+            ok = True
+        except Exception:
+            ok = False
+        return ok, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(one, range(calls)))
+    elapsed = time.perf_counter() - started
+    latencies = [ms for _, ms in results]
+    return {
+        'calls_per_s': calls / elapsed,
+        'ok': sum(1 for ok, _ in results if ok),
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--calls', type=int, default=400)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.2)
+    parser.add_argument('--hang', type=float, default=3.0)
+    parser.add_argument('--timeout', type=float, default=0.5, help='gateway read timeout for the hung scenario')
+    parser.add_argument('--max-concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    stub = start_stub()
+    config = {'PLAID_HOST': stub.url, 'PLAID_CLIENT_ID': 'bench', 'PLAID_SECRET': 'bench',
+              'PLAID_POOL_SIZE': args.max_concurrency}
+    scenarios = [
+        ('healthy', args.latency, 0.0, args.calls),
+        ('flaky', args.latency, args.error_rate, args.calls),
+        ('outage', args.latency, 1.0, args.calls),
+        ('hung', args.hang, 0.0, args.threads * 2),
+    ]
+
+    print(f"{'scenario':<9} {'client':<8} {'calls/s':>9} {'ok':>6} {'p50 ms':>9} {'p99 ms':>9} {'upstream':>9}")
+    for name, latency, error_rate, calls in scenarios:
+        stub.latency, stub.error_rate = latency, error_rate
+        request = exchange_request()
+
+        bare = create_plaid_client(config)
+        clients = [('bare', lambda: bare.item_public_token_exchange(request))]
+        gateway = PlaidGateway(max_concurrency=args.max_concurrency, timeout=(1, args.timeout if name == 'hung' else 10),
+                               retries=2, backoff=0.05, acquire_timeout=5, breaker_threshold=5, breaker_reset=30)
+        gateway.config = config
+        clients.append(('gateway', lambda: gateway.call('item_public_token_exchange', request)))
+
+        for label, call in clients:
+            before = stub.requests
+            r = run(call, args.threads, calls)
+            print(f"{name:<9} {label:<8} {r['calls_per_s']:>9.1f} {r['ok']:>6} {r['p50']:>9.1f} "
+                  f"{r['p99']:>9.1f} {stub.requests - before:>9}")
+    stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
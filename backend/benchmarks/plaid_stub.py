@@ -0,0 +1,126 @@
+"""Minimal local stand-in for the Plaid endpoints the backend calls.
+
+Serves /item/public_token/exchange and /transactions/sync with
+deterministic data: every access token has `transactions` transactions,
+handed out in order with the cursor as an offset. `latency` seconds are
+slept per request to model the network round trip, and `error_rate` of
+requests fail with a 503 to model a degraded upstream. Both can be changed
+on a running server.
+
+    python -m benchmarks.plaid_stub --port 8765 --latency 0.05 --error-rate 0.1
+    PLAID_HOST=http://127.0.0.1:8765 flask plaid sync
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CATEGORIES = ['FOOD_AND_DRINK', 'TRANSPORTATION', 'ENTERTAINMENT', 'GENERAL_MERCHANDISE', 'RENT_AND_UTILITIES']
+
+
+def stub_transaction(access_token, index):
+    income = index % 10 == 0
+    return {
+        'transaction_id': f'{access_token}-{index}',
+        'account_id': 'stub-account',
+        'date': (date(2024, 1, 1) + timedelta(days=index % 365)).isoformat(),
+        # Plaid sign convention: positive = money out
+        'amount': -2500.0 if income else round(5 + (index * 37 % 20000) / 100, 2),
+        'name': 'Payroll' if income else f'Purchase {index}',
+        'merchant_name': None if income else f'Merchant {index % 50}',
+        'personal_finance_category': {'primary': 'INCOME' if income else CATEGORIES[index % len(CATEGORIES)]},
+    }
+
+
+class PlaidStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client timed out and hung up
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and random.random() < server.error_rate:
+            self._send(503, {'error_type': 'API_ERROR', 'error_code': 'INTERNAL_SERVER_ERROR',
+                             'error_message': 'stub outage', 'request_id': 'stub'})
+            return
+
+        if self.path == '/item/public_token/exchange':
+            with server.lock:
+                server.items += 1
+                number = server.items
+            self._send(200, {'access_token': f'access-stub-{number}',
+                             'item_id': f'item-stub-{number}', 'request_id': 'stub'})
+        elif self.path == '/transactions/sync':
+            token = body.get('access_token', '')
+            offset = int(body.get('cursor') or 0)
+            count = int(body.get('count') or 100)
+            end = min(offset + count, server.transactions)
+            self._send(200, {
+                'added': [stub_transaction(token, i) for i in range(offset, end)],
+                'modified': [],
+                'removed': [],
+                'accounts': [],
+                'next_cursor': str(end),
+                'has_more': end < server.transactions,
+                'transactions_update_status': 'HISTORICAL_UPDATE_COMPLETE',
+                'request_id': 'stub',
+            })
+        else:
+            self._send(404, {'error_type': 'INVALID_REQUEST', 'error_code': 'NOT_FOUND',
+                             'error_message': f'unknown endpoint {self.path}'})
+
+
+def start_stub(port=0, latency=0.0, transactions=1000, error_rate=0.0):
+    """Start the stub on a daemon thread; returns the server (server.url is its base URL)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), PlaidStubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.latency = latency
+    server.error_rate = error_rate
+    server.transactions = transactions
+    server.requests = 0
+    server.items = 0
+    server.url = f'http://127.0.0.1:{server.server_address[1]}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds slept per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--transactions', type=int, default=1000, help='transactions per access token')
+    args = parser.parse_args()
+
+    server = start_stub(args.port, args.latency, args.transactions, args.error_rate)
+    print(f'Plaid stub listening on {server.url}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
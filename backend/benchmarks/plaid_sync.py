@@ -0,0 +1,74 @@
+"""Items synced per minute by the Plaid sync worker against a local stub.
+
+    python -m benchmarks.plaid_sync --items 40 --transactions 2000 --latency 0.05
+"""
+import argparse
+import time
+from benchmarks.common import make_app
+from benchmarks.plaid_stub import start_stub
+from finance_tracker.extensions import db
+from finance_tracker.models.plaid_item import PlaidItem
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+from finance_tracker.utils.plaid_sync import sync_items
+
+
+def seed_items(app, count):
+    with app.app_context():
+        user = User(name='Sync User', email='sync@example.com')
+        user.password = 'benchmark-password'
+        db.session.add(user)
+        db.session.flush()
+        db.session.add_all(
+            PlaidItem(user_id=user.id, access_token=f'access-stub-{i}', plaid_item_id=f'item-stub-{i}')
+            for i in range(count)
+        )
+        db.session.commit()
+
+
+def run(stub, items, concurrency, page_size):
+    app = make_app(PLAID_HOST=stub.url, PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    seed_items(app, items)
+    requests_before = stub.requests
+
+    started = time.perf_counter()
+    results = sync_items(app, concurrency=concurrency, page_size=page_size)
+    elapsed = time.perf_counter() - started
+
+    # Second pass: cursors are current, so each item costs one empty page
+    started = time.perf_counter()
+    sync_items(app, concurrency=concurrency, page_size=page_size)
+    incremental = time.perf_counter() - started
+
+    with app.app_context():
+        stored = db.session.scalar(db.select(db.func.count()).select_from(Transaction))
+    errors = sum(1 for result in results if 'error' in result)
+    return {
+        'items_per_min': items / elapsed * 60,
+        'incremental_items_per_min': items / incremental * 60,
+        'requests': stub.requests - requests_before,
+        'stored': stored,
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=40)
+    parser.add_argument('--transactions', type=int, default=2000, help='transactions per item')
+    parser.add_argument('--latency', type=float, default=0.05, help='stub seconds per request')
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    args = parser.parse_args()
+
+    stub = start_stub(latency=args.latency, transactions=args.transactions)
+    print(f"{'concurrency':>11} {'items/min':>10} {'incr/min':>10} {'requests':>9} {'rows':>9} {'errors':>7}")
+    for concurrency in args.concurrency:
+        r = run(stub, args.items, concurrency, args.page_size)
+        print(f"{concurrency:>11} {r['items_per_min']:>10.0f} {r['incremental_items_per_min']:>10.0f} "
+              f"{r['requests']:>9} {r['stored']:>9} {r['errors']:>7}")
+    stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Login rate limiting under a credential-stuffing burst.
+
+For `--seconds`, `--attackers` threads each post `--attempt-rate` wrong
+passwords a second to /auth/login
+from one address (alternating between a real account, which costs a
+password hash, and never-seen emails, as in credential stuffing)
+while one legitimate client from another address polls /api/dashboard.
+This runs with the limiter off and on, and reports the dashboard latency,
+how many attempts got as far as a password check, and what a rejected
+attempt costs.
+
+It then checks the shared SQLite mode: `--processes` processes spend
+tokens from one bucket at once, and together they must be allowed exactly
+the burst. It also times a single check in each mode.
+
+    python -m benchmarks.rate_limit --seconds 5 --attackers 8 --processes 4
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from multiprocessing import Pool
+from benchmarks.common import make_app, register, percentile, QueryCounter
+from finance_tracker.utils.ratelimit import MemoryBuckets, SQLiteBuckets
+
+ATTACKER = {'REMOTE_ADDR': '203.0.113.7'}
+USER = {'REMOTE_ADDR': '198.51.100.20'}
+VICTIM = 'victim@example.com'
+
+
+def run(enabled, seconds, attackers, attempt_rate, method):
+    app = make_app(RATELIMIT_ENABLED=enabled, PASSWORD_HASH_METHOD=method, METRICS_ENABLED=False)
+    headers = register(app.test_client(), VICTIM)
+    stop = threading.Event()
+    statuses = {}
+    rejected_ms = []
+    lock = threading.Lock()
+
+    def attack(t):
+        client = app.test_client()
+        begun = time.perf_counter()
+        i = 0
+        # Paced like a client on the network, not as fast as the GIL allows
+        while not stop.wait(max(0.0, begun + i / attempt_rate - time.perf_counter())):
+            started = time.perf_counter()
+            response = client.post('/auth/login', environ_base=ATTACKER,
+                                   json={'email': VICTIM if i % 2 else f'stuffed-{t}-{i}@example.com',
+                                         'password': 'hunter2hunter2'})
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code == 429:
+                    rejected_ms.append(elapsed)
+            i += 1
+
+    workers = [threading.Thread(target=attack, args=(t,)) for t in range(attackers)]
+    for worker in workers:
+        worker.start()
+    client = app.test_client()
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = client.get('/api/dashboard', headers=headers, environ_base=USER)
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.get_json()
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    # SQL statements behind one rejected attempt (the address is still over its limit)
+    rejected_sql = None
+    if enabled:
+        with QueryCounter(app) as counter:
+            response = client.post('/auth/login', environ_base=ATTACKER,
+                                   json={'email': 'one-more@example.com', 'password': 'hunter2hunter2'})
+        assert response.status_code == 429 and response.headers['Retry-After']
+        rejected_sql = counter.count
+    return latencies, statuses, rejected_ms, rejected_sql
+
+
+def _spend(args):
+    path, attempts, burst = args
+    buckets = SQLiteBuckets(path)
+    return sum(1 for _ in range(attempts) if not buckets.take('login:ip:shared', burst, 1e-9))
+
+
+def shared_enforcement(processes, attempts, burst):
+    path = os.path.join(tempfile.mkdtemp(prefix='finance-tracker-ratelimit-'), 'ratelimit.db')
+    SQLiteBuckets(path)  # create the table before the workers race for it
+    with Pool(processes) as pool:
+        allowed = pool.map(_spend, [(path, attempts, burst)] * processes)
+    return allowed, path
+
+
+def time_check(buckets, keys, checks):
+    started = time.perf_counter()
+    for i in range(checks):
+        buckets.take(f'login:ip:{i % keys}', 20, 10 / 60)
+    return (time.perf_counter() - started) / checks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--attackers', type=int, default=8)
+    parser.add_argument('--attempt-rate', type=float, default=25, help='Login attempts per second per attacker.')
+    parser.add_argument('--method', default='pbkdf2:sha256:200000', help='PASSWORD_HASH_METHOD.')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--burst', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'limiter':<8} {'dashboard p50':>14} {'p99 ms':>8} {'attempts':>9} {'checked':>8} "
+          f"{'429s':>6} {'429 p50 ms':>11} {'SQL/429':>8}")
+    for label, enabled in (('off', False), ('on', True)):
+        latencies, statuses, rejected_ms, rejected_sql = run(enabled, args.seconds, args.attackers, args.attempt_rate,
+                                                               args.method)
+        attempts = sum(statuses.values())
+        rejected = statuses.get(429, 0)
+        print(f'{label:<8} {percentile(latencies, 50):>14.2f} {percentile(latencies, 99):>8.2f} {attempts:>9} '
+              f'{attempts - rejected:>8} {rejected:>6} '
+              f"{percentile(rejected_ms, 50) if rejected_ms else float('nan'):>11.3f} "
+              f"{'-' if rejected_sql is None else rejected_sql:>8}")
+
+    allowed, path = shared_enforcement(args.processes, args.burst, args.burst)
+    print(f'\nshared SQLite buckets: {args.processes} processes x {args.burst} attempts, burst {args.burst}: '
+          f'{sum(allowed)} allowed {allowed}')
+    if sum(allowed) != args.burst:
+        raise SystemExit(f'expected exactly {args.burst} allowed across processes')
+
+    print(f'\none check, 10k keys: memory {time_check(MemoryBuckets(), 10000, 100000):.2f} us, '
+          f'SQLite {time_check(SQLiteBuckets(path), 10000, 20000):.1f} us')
+
+
+if __name__ == '__main__':
+    main()
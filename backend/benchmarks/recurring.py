@@ -0,0 +1,149 @@
+"""Recurring charge detection: throughput, incremental cost and accuracy.
+
+Imports `--transactions` random purchases from a few hundred merchants
+over three years for one user, plus planted recurring series (monthly
+subscriptions with a few days of jitter and one price increase, biweekly
+payroll, rent, a variable utility bill, weekly, quarterly and yearly
+charges). Runs the detector over the full history, then adds `--increment`
+more rows and runs it again to show that only new rows are processed, and
+compares that with rebuilding from the whole ledger.
+
+Checks that every planted series is found with the right cadence and kind,
+that no random merchant is reported as recurring, and that the
+incrementally maintained series are identical to a rebuild.
+
+    python -m benchmarks.recurring --transactions 100000 --increment 1000
+"""
+import argparse
+import io
+import random
+from datetime import date, timedelta
+from benchmarks.common import make_app, timed
+from finance_tracker.extensions import db
+from finance_tracker.models.recurring import RecurringSeries
+from finance_tracker.models.user import User
+from finance_tracker.utils.importer import import_transactions
+from finance_tracker.utils.recurring import (
+    detect_recurring, rebuild_recurring, recurring_insights, recurring_series, merchant_key
+)
+
+START = date(2023, 1, 1)
+DAYS = 3 * 365
+
+# (statement merchant, category, first day, period in days, jitter in days,
+#  cents (negative = expense), expected cadence, expected kind)
+PLANTED = [
+    ('NETFLIX.COM 866-579-7172 CA', 'Entertainment', 3, 30.44, 2, -1599, 'monthly', 'subscription'),
+    ('SPOTIFY USA', 'Entertainment', 11, 30.44, 1, -1099, 'monthly', 'subscription'),
+    ('SQ *IRON GYM', 'Health', 1, 30.44, 2, -4500, 'monthly', 'subscription'),
+    ('ACME CORP PAYROLL', 'Income', 5, 14, 0, 215000, 'biweekly', 'payroll'),
+    ('Maple Apartments', 'Rent', 0, 30.44, 1, -180000, 'monthly', 'rent'),
+    ('City Power & Light', 'Utilities', 20, 30.44, 2, None, 'monthly', 'bill'),
+    ('Sparkle Car Wash', 'Transport', 2, 7, 0, -1200, 'weekly', 'subscription'),
+    ('Shield Insurance', 'Insurance', 40, 91.31, 3, -36000, 'quarterly', 'subscription'),
+    ('Domain Registrar', 'Shopping', 60, 365.25, 2, -1999, 'yearly', 'subscription'),
+]
+PRICE_INCREASE = ('NETFLIX.COM 866-579-7172 CA', 1799)  # from the last charge on
+
+ADJECTIVES = ('Green', 'Blue', 'Golden', 'Happy', 'Urban', 'Corner', 'Royal', 'Lucky', 'Silver', 'Little',
+              'Grand', 'Sunny', 'Fresh', 'Old', 'Bright', 'Wild', 'Quiet', 'Rapid', 'Noble', 'Crimson')
+NOUNS = ('Market', 'Bistro', 'Books', 'Garage', 'Bakery', 'Pharmacy', 'Diner', 'Outfitters', 'Florist',
+         'Hardware', 'Cafe', 'Deli', 'Boutique', 'Kitchen', 'Tavern', 'Grocer', 'Cinema', 'Salon',
+         'Pizzeria', 'Electronics')
+
+
+def _csv(rows):
+    lines = ['Date,Amount,Merchant,Description,Category']
+    for day, cents, merchant, category in sorted(rows, key=lambda row: row[0]):
+        lines.append(f'{day.isoformat()},{cents / 100:.2f},"{merchant}",{merchant} purchase,{category}')
+    return io.StringIO('\n'.join(lines) + '\n')
+
+
+def planted_rows(rng, start_day, end_day):
+    rows = []
+    for merchant, category, first, period, jitter, cents, _, _ in PLANTED:
+        k = 0
+        while True:
+            day = round(first + k * period)
+            k += 1
+            if day >= end_day:
+                break
+            if day < start_day:
+                continue
+            amount = cents if cents is not None else -rng.randrange(6000, 14000)
+            rows.append((START + timedelta(days=day + rng.randint(0, jitter)), amount, merchant, category))
+    return rows
+
+
+def noise_rows(rng, count, start_day, end_day):
+    return [
+        (START + timedelta(days=rng.randrange(start_day, end_day)), -rng.randrange(300, 20000),
+         f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}', 'Shopping')
+        for _ in range(count)
+    ]
+
+
+def snapshot(user_id):
+    columns = [column for column in RecurringSeries.__table__.columns if column.name != 'updated_at']
+    return sorted(tuple(row) for row in db.session.execute(
+        db.select(*columns).where(RecurringSeries.user_id == user_id)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=100000)
+    parser.add_argument('--increment', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=13)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    app = make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    with app.app_context():
+        user = User(name='Recurring User', email='recurring@example.com')
+        user.password = 'benchmark-password'
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+        history_end = DAYS - 30
+        rows = planted_rows(rng, 0, history_end) + noise_rows(rng, args.transactions, 0, history_end)
+        import_transactions(user_id, _csv(rows))
+        processed, full = timed(detect_recurring, user_id)
+        print(f'full run:        {processed:>8} transactions in {full * 1000:8.1f} ms '
+              f'({processed / full:,.0f} txn/s)')
+
+        processed, idle = timed(detect_recurring, user_id)
+        print(f'no-op run:       {processed:>8} transactions in {idle * 1000:8.1f} ms')
+
+        # The last month: the next charge of every series (Netflix at its new price) plus noise
+        increment = planted_rows(rng, history_end, DAYS)
+        increment = [(day, PRICE_INCREASE[1] * -1 if merchant == PRICE_INCREASE[0] else cents, merchant, category)
+                     for day, cents, merchant, category in increment]
+        increment += noise_rows(rng, max(args.increment - len(increment), 0), history_end, DAYS)
+        import_transactions(user_id, _csv(increment))
+        processed, incremental = timed(detect_recurring, user_id)
+        print(f'incremental run: {processed:>8} transactions in {incremental * 1000:8.1f} ms')
+
+        incremental_series = snapshot(user_id)
+        processed, rebuild = timed(rebuild_recurring, user_id)
+        print(f'rebuild:         {processed:>8} transactions in {rebuild * 1000:8.1f} ms')
+        print(f'incremental series match rebuild: {incremental_series == snapshot(user_id)}')
+
+        today = START + timedelta(days=DAYS)
+        found = {series.merchant_key: series for series, _ in recurring_series(user_id, today=today)}
+        wrong = 0
+        for merchant, _, _, _, _, _, cadence, kind in PLANTED:
+            series = found.pop(merchant_key(merchant), None)
+            detected = (series.cadence, series.kind) if series else (None, None)
+            ok = detected == (cadence, kind)
+            wrong += not ok
+            print(f"  {'ok  ' if ok else 'MISS'} {merchant:<30} expected {cadence}/{kind}, got {detected[0]}/{detected[1]}")
+        print(f'planted series detected: {len(PLANTED) - wrong}/{len(PLANTED)}, '
+              f'false positives: {len(found)} {sorted(found)}')
+
+        for insight in recurring_insights(user_id, today=today):
+            print(f"  insight: {insight['title']}: {insight['description']}")
+
+
+if __name__ == '__main__':
+    main()
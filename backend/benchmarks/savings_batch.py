@@ -0,0 +1,88 @@
+"""N single-row savings calls vs one :batch call.
+
+Creates, updates and deletes `--rules` rules (and the same number of
+goals) one request at a time, then again with one batch request per
+operation kind. Reports wall time and SQL statements for each.
+
+    python -m benchmarks.savings_batch --rules 100 --profile production
+"""
+import argparse
+import time
+from benchmarks.common import make_app, register, QueryCounter
+
+
+def timed_calls(app, calls):
+    with QueryCounter(app) as counter:
+        started = time.perf_counter()
+        for call in calls:
+            call()
+        elapsed = time.perf_counter() - started
+    return elapsed * 1000, counter.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rules', type=int, default=100)
+    parser.add_argument('--profile', default='production')
+    args = parser.parse_args()
+    n = args.rules
+
+    app = make_app(DATABASE_PROFILE=args.profile, PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    client = app.test_client()
+    headers = register(client, 'batch@example.com')
+
+    def check(response, status):
+        assert response.status_code == status, (response.status_code, response.get_json())
+        return response.get_json()
+
+    print(f"{'resource':<7} {'operation':<8} {'single ms':>10} {'batch ms':>10} {'speedup':>8} "
+          f"{'single SQL':>11} {'batch SQL':>10}")
+    for resource, payload, change in (
+        ('rules', lambda i: {'type': 'fixed', 'amount': 1 + i % 5}, lambda i: {'amount': 10 + i % 5}),
+        ('goals', lambda i: {'name': f'Goal {i}', 'target_amount': 100 + i}, lambda i: {'current_amount': i + 1}),
+    ):
+        url = f'/api/savings/{resource}'
+        # Warm up statement caches for both paths so neither pays first-compile costs
+        warm = check(client.post(url, headers=headers, json=payload(0)), 201)['id']
+        check(client.put(f'{url}/{warm}', headers=headers, json=change(0)), 200)
+        client.delete(f'{url}/{warm}', headers=headers)
+        warm = check(client.post(f'{url}:batch', headers=headers,
+                                 json={'operations': [{'op': 'create', 'data': payload(0)}]}), 200)
+        operations = [{'op': 'update', 'id': warm['results'][0]['id'], 'data': change(0)},
+                      {'op': 'create', 'data': payload(1)}]
+        for result in check(client.post(f'{url}:batch', headers=headers, json={'operations': operations}),
+                            200)['results']:
+            client.delete(f"{url}/{result['id']}", headers=headers)
+
+        ids = []
+        single = {}
+        single['create'] = timed_calls(app, [
+            lambda i=i: ids.append(check(client.post(url, headers=headers, json=payload(i)), 201)['id'])
+            for i in range(n)])
+        single['update'] = timed_calls(app, [
+            lambda i=i, id=id: check(client.put(f'{url}/{id}', headers=headers, json=change(i)), 200)
+            for i, id in enumerate(ids)])
+        single['delete'] = timed_calls(app, [
+            lambda id=id: client.delete(f'{url}/{id}', headers=headers) for id in ids])
+
+        batch, batch_ids = {}, []
+
+        def run_batch(operations):
+            results = check(client.post(f'{url}:batch', headers=headers, json={'operations': operations}), 200)
+            assert results['failed'] == 0, results
+            return results['results']
+
+        batch['create'] = timed_calls(app, [lambda: batch_ids.extend(
+            r['id'] for r in run_batch([{'op': 'create', 'data': payload(i)} for i in range(n)]))])
+        batch['update'] = timed_calls(app, [lambda: run_batch(
+            [{'op': 'update', 'id': id, 'data': change(i)} for i, id in enumerate(batch_ids)])])
+        batch['delete'] = timed_calls(app, [lambda: run_batch([{'op': 'delete', 'id': id} for id in batch_ids])])
+
+        for operation in ('create', 'update', 'delete'):
+            (single_ms, single_sql), (batch_ms, batch_sql) = single[operation], batch[operation]
+            print(f'{resource:<7} {operation:<8} {single_ms:>10.1f} {batch_ms:>10.1f} {single_ms / batch_ms:>7.1f}x '
+                  f'{single_sql:>11} {batch_sql:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Time-to-first-byte and peak memory of the savings goal list modes.
+
+Seeds one heavy account with `--goals` goals and fetches them as a full
+array (the old behaviour), as a streamed array, and page by page.
+
+    python -m benchmarks.savings_lists --goals 50000
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+from benchmarks.common import make_app, register
+from finance_tracker.extensions import db
+from finance_tracker.models.savings import SavingsGoal
+
+
+def seed_goals(app, user_id, count):
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.execute(SavingsGoal.__table__.insert(), [
+            {'user_id': user_id, 'name': f'Goal {i}', 'target_amount': 10000 + 100 * i, 'current_amount': 0,
+             'created_at': now, 'updated_at': now}
+            for i in range(count)
+        ])
+        db.session.commit()
+
+
+def fetch(client, headers, url):
+    """(ttfb ms, total ms, bytes, peak traced MiB) for one buffered=False GET"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get(url, headers=headers, buffered=False)
+    chunks = iter(response.response)
+    size = len(next(chunks))
+    ttfb = time.perf_counter() - started
+    for chunk in chunks:
+        size += len(chunk)
+    total = time.perf_counter() - started
+    response.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return ttfb * 1000, total * 1000, size, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--goals', type=int, default=50000)
+    parser.add_argument('--page-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    app = make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    client = app.test_client()
+    headers = register(client, 'heavy@example.com')
+    seed_goals(app, 1, args.goals)
+
+    print(f"{'mode':<24} {'ttfb ms':>9} {'total ms':>9} {'MiB out':>8} {'peak MiB':>9}")
+    for mode, url in (('full array', '/api/savings/goals'),
+                      ('streamed', '/api/savings/goals?stream=1'),
+                      ('streamed id,name', '/api/savings/goals?stream=1&fields=id,name'),
+                      (f'page of {args.page_size}', f'/api/savings/goals?limit={args.page_size}')):
+        ttfb, total, size, peak = fetch(client, headers, url)
+        print(f'{mode:<24} {ttfb:>9.1f} {total:>9.1f} {size / 2 ** 20:>8.2f} {peak:>9.2f}')
+
+    # Walk every page by cursor
+    started, after, pages = time.perf_counter(), None, 0
+    while True:
+        url = f'/api/savings/goals?limit={args.page_size}' + (f'&after={after}' if after else '')
+        after = client.get(url, headers=headers).headers.get('X-Next-Cursor')
+        pages += 1
+        if after is None:
+            break
+    print(f'walked {pages} pages in {(time.perf_counter() - started) * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Savings rule engine throughput, checked against a per-transaction Python loop.
+
+Imports `--transactions` ledger rows for one user with a round-up, a
+percentage and a fixed rule, runs the engine over the full history, then
+adds `--increment` rows and runs it again to show that only new rows are
+processed.
+
+    python -m benchmarks.savings_rules --transactions 200000 --increment 1000
+"""
+import argparse
+import io
+import random
+from datetime import date, timedelta
+from benchmarks.common import make_app, timed
+from finance_tracker.extensions import db
+from finance_tracker.models.savings import SavingsRule
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+from finance_tracker.utils.importer import import_transactions
+from finance_tracker.utils.savings_engine import run_rules, contribution_totals
+
+# (type, amount in cents, percentage in basis points)
+RULES = [('round-up', None, None), ('percentage', None, 1000), ('fixed', 50, None)]
+
+
+def ledger_csv(count, seed, start_day=0):
+    rng = random.Random(seed)
+    lines = ['Date,Amount,Description,Category']
+    for i in range(count):
+        day = date(2024, 1, 1) + timedelta(days=(start_day + i // 20) % 730)
+        amount = round(rng.uniform(1500, 4000), 2) if rng.random() < 0.05 else -round(rng.uniform(1, 300), 2)
+        lines.append(f'{day.isoformat()},{amount},Txn {i},Misc')
+    return io.StringIO('\n'.join(lines) + '\n')
+
+
+def python_reference(user_id, rules):
+    """The straightforward per-transaction, per-rule loop, in cents"""
+    totals = {rule.id: 0 for rule in rules}
+    for (cents,) in db.session.execute(db.select(Transaction.amount).where(Transaction.user_id == user_id)):
+        for rule in rules:
+            if rule.type == 'round-up' and cents < 0:
+                totals[rule.id] += (100 - -cents % 100) % 100
+            elif rule.type == 'percentage' and cents > 0:
+                totals[rule.id] += (cents * rule.percentage + 5000) // 10000
+            elif rule.type == 'fixed' and cents < 0:
+                totals[rule.id] += rule.amount
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=200000)
+    parser.add_argument('--increment', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    app = make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    with app.app_context():
+        user = User(name='Rules User', email='rules@example.com')
+        user.password = 'benchmark-password'
+        db.session.add(user)
+        db.session.flush()
+        for kind, amount, percentage in RULES:
+            db.session.add(SavingsRule(user_id=user.id, type=kind, amount=amount, percentage=percentage))
+        db.session.commit()
+        user_id = user.id
+        rules = SavingsRule.query.filter_by(user_id=user_id).all()
+
+        import_transactions(user_id, ledger_csv(args.transactions, args.seed))
+        processed, full = timed(run_rules, user_id)
+        print(f'full run:        {processed:>8} transactions in {full * 1000:8.1f} ms '
+              f'({processed / full:,.0f} txn/s)')
+
+        processed, idle = timed(run_rules, user_id)
+        print(f'no-op run:       {processed:>8} transactions in {idle * 1000:8.1f} ms')
+
+        import_transactions(user_id, ledger_csv(args.increment, args.seed + 1, start_day=700))
+        processed, incremental = timed(run_rules, user_id)
+        print(f'incremental run: {processed:>8} transactions in {incremental * 1000:8.1f} ms')
+
+        reference, loop = timed(python_reference, user_id, rules)
+        print(f'python loop:     {args.transactions + args.increment:>8} transactions in {loop * 1000:8.1f} ms')
+
+        engine = contribution_totals(user_id)
+        mismatches = [rule_id for rule_id, cents in reference.items() if engine.get(rule_id, 0) != cents]
+        print(f'totals match reference: {not mismatches} {engine}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Full-text search latency over a large ledger, against LIKE '%term%' scans.
+
+Writes `--rows` transactions spread over `--users` users through the
+normal table INSERT (so the FTS triggers index them as they would in
+production), then times /api/search's query for a mix of terms: common
+words, short prefixes, two words, a rare merchant and a term with no
+matches. Each term is searched for `--repeat` random users.
+
+The LIKE baseline is the query a search box would otherwise run:
+the user's rows whose description or merchant contains the term, newest
+first, one page. It can stop early when the term is common, but has to read
+every one of the user's rows when it is rare or absent (and it can't rank).
+Search ranks every match, so a short prefix that matches most of a user's
+rows is the slowest case and can exceed the 10 ms budget on large ledgers.
+
+    python -m benchmarks.search --rows 1000000 --users 20
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from benchmarks.common import make_app, percentile
+from finance_tracker.extensions import db
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+from finance_tracker.utils.search import DEFAULT_LIMIT, search
+
+BRANDS = ('Blue Bottle', 'Green Leaf', 'Golden Gate', 'Silver Spoon', 'Red Rock', 'Urban Fresh', 'Corner',
+          'Harbor', 'Summit', 'Maple', 'Cedar', 'Lakeside', 'Northside', 'Sunrise', 'Pioneer', 'Liberty')
+TRADES = ('Coffee', 'Grocery', 'Pharmacy', 'Hardware', 'Books', 'Bakery', 'Fitness', 'Cinema', 'Pizza',
+          'Fuel', 'Florist', 'Electronics', 'Tailor', 'Garage', 'Sushi', 'Laundry')
+CHANNELS = ('POS PURCHASE', 'CARD PAYMENT', 'ONLINE ORDER', 'CONTACTLESS', 'DIRECT DEBIT')
+CITIES = ('Springfield', 'Riverton', 'Fairview', 'Georgetown', 'Franklin', 'Clinton', 'Madison', 'Salem')
+RARE_MERCHANT = 'Zephyr Observatory'
+
+TERMS = ('coffee', 'co', 'gro', 'blue bottle', 'harb pizz', 'zephyr', 'qwxyz')
+
+
+def load(app, rows, users, seed, chunk=50000):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    start = date.today() - timedelta(days=5 * 365)
+    with app.app_context():
+        db.session.execute(User.__table__.insert(), [
+            {'name': f'Search User {i}', 'email': f'search{i}@example.com', 'password_hash': 'x', 'created_at': now}
+            for i in range(users)
+        ])
+        user_ids = db.session.scalars(db.select(User.id).order_by(User.id)).all()
+        insert = Transaction.__table__.insert()
+        for offset in range(0, rows, chunk):
+            batch = []
+            for i in range(offset, min(offset + chunk, rows)):
+                merchant = (RARE_MERCHANT if rng.random() < 0.0002
+                            else f'{rng.choice(BRANDS)} {rng.choice(TRADES)}')
+                batch.append({
+                    'user_id': user_ids[i % users],
+                    'date': start + timedelta(days=rng.randrange(5 * 365)),
+                    'amount': -rng.randrange(100, 20000),
+                    'description': f'{rng.choice(CHANNELS)} {merchant.upper()} {rng.choice(CITIES).upper()} '
+                                   f'#{rng.randrange(10000)}',
+                    'merchant': merchant,
+                    'category': 'Shopping',
+                    'created_at': now,
+                })
+            db.session.execute(insert, batch)
+            db.session.commit()
+        db.session.execute(db.text("INSERT INTO transactions_fts (transactions_fts) VALUES ('optimize')"))
+        db.session.commit()
+        return user_ids
+
+
+def like_page(user_id, term):
+    pattern = f'%{term}%'
+    return db.session.execute(
+        db.select(Transaction.id)
+        .where(Transaction.user_id == user_id,
+               db.or_(Transaction.description.like(pattern), Transaction.merchant.like(pattern)))
+        .order_by(Transaction.date.desc())
+        .limit(DEFAULT_LIMIT + 1)
+    ).all()
+
+
+def measure(fn, user_ids, term, repeat, rng):
+    samples, found = [], 0
+    for _ in range(repeat):
+        user_id = rng.choice(user_ids)
+        started = time.perf_counter()
+        result = fn(user_id, term)
+        samples.append((time.perf_counter() - started) * 1000)
+        found += len(result)
+    return samples, found / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=50, help='Searches per term.')
+    parser.add_argument('--seed', type=int, default=17)
+    args = parser.parse_args()
+
+    app = make_app(METRICS_ENABLED=False)
+    started = time.perf_counter()
+    user_ids = load(app, args.rows, args.users, args.seed)
+    elapsed = time.perf_counter() - started
+    print(f'Loaded {args.rows} transactions for {args.users} users (indexed by the triggers) '
+          f'in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s)\n')
+
+    rng = random.Random(args.seed)
+    print(f"{'term':<12} {'FTS p50 ms':>11} {'p95':>7} {'max':>7} {'hits':>5}   "
+          f"{'LIKE p50 ms':>11} {'p95':>7} {'hits':>5} {'speedup':>8}")
+    worst = 0
+    with app.app_context():
+        for term in TERMS:
+            search(user_ids[0], term, 'transactions')  # warm the page cache
+            fts, fts_hits = measure(lambda user_id, q: search(user_id, q, 'transactions')[0],
+                                    user_ids, term, args.repeat, rng)
+            like, like_hits = measure(like_page, user_ids, term, max(args.repeat // 5, 3), rng)
+            worst = max(worst, percentile(fts, 95))
+            print(f'{term:<12} {percentile(fts, 50):>11.2f} {percentile(fts, 95):>7.2f} {max(fts):>7.2f} '
+                  f'{fts_hits:>5.0f}   {percentile(like, 50):>11.2f} {percentile(like, 95):>7.2f} '
+                  f'{like_hits:>5.0f} {percentile(like, 50) / percentile(fts, 50):>7.1f}x')
+    print(f"\nworst FTS p95: {worst:.2f} ms ({'under' if worst < 10 else 'OVER'} the 10 ms budget)")
+
+
+if __name__ == '__main__':
+    main()
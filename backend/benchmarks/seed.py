@@ -0,0 +1,142 @@
+"""Deterministic data generator for benchmarks and load tests.
+
+seed_database() fills an app's database with `users` users, each with
+goals, rules, a linked Plaid item and `transactions` ledger rows spread
+over the last `months` months. Amounts are written as integer cents (and
+percentages as basis points), as the columns store them. The same arguments and seed always give
+the same rows. Everything is written with executemany INSERTs and the
+rollups are maintained the same way the statement importer does it, so
+seeding tens of thousands of rows takes seconds.
+
+Every seeded user logs in with PASSWORD.
+
+    python -m benchmarks.seed --users 100 --transactions 1000
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from benchmarks.common import make_app
+from finance_tracker.extensions import db, password_hasher
+from finance_tracker.models.plaid_item import PlaidItem
+from finance_tracker.models.savings import SavingsGoal, SavingsRule
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+from finance_tracker.utils.changes import mark_user_changed
+from finance_tracker.utils.rollups import accumulate, apply_deltas
+
+PASSWORD = 'benchmark-password'
+
+EXPENSE_CATEGORIES = ('Groceries', 'Dining', 'Transport', 'Shopping', 'Utilities', 'Entertainment', 'Health')
+MERCHANTS = ('Corner Market', 'City Transit', 'Bistro 21', 'Online Store', 'Power & Light', 'Cinema', 'Pharmacy')
+
+
+def seed_email(index):
+    return f'seed{index}@example.com'
+
+
+def _ledger(rng, user_id, count, months, today):
+    """`count` rows over `months` months: a monthly payroll plus random expenses"""
+    start = today - timedelta(days=30 * months)
+    rows = []
+    for m in range(months):
+        rows.append({
+            'date': start + timedelta(days=30 * m + 1), 'amount': round(rng.uniform(3500, 5500) * 100),
+            'description': 'Payroll', 'merchant': 'Employer', 'category': 'Income',
+        })
+    for _ in range(max(count - months, 0)):
+        pick = rng.randrange(len(EXPENSE_CATEGORIES))
+        rows.append({
+            'date': start + timedelta(days=rng.randrange(30 * months)),
+            'amount': -round(rng.lognormvariate(3, 0.9) * 100),
+            'description': f'{MERCHANTS[pick]} purchase', 'merchant': MERCHANTS[pick],
+            'category': EXPENSE_CATEGORIES[pick],
+        })
+    rows.sort(key=lambda row: row['date'])
+    for row in rows[:count]:
+        row['user_id'] = user_id
+    return rows[:count]
+
+
+def seed_database(app, users=50, goals=5, rules=3, transactions=500, months=12, seed=7):
+    """Seed `app`'s database; returns [(user_id, email), ...] in creation order"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    today = date.today()
+    with app.app_context():
+        # One hash shared by every seeded user keeps seeding fast at any PASSWORD_HASH_METHOD
+        password_hash = password_hasher.hash(PASSWORD)
+        first = (db.session.scalar(db.select(db.func.max(User.id))) or 0) + 1
+        db.session.execute(User.__table__.insert(), [
+            {'name': f'Seed User {first + i}', 'email': seed_email(first + i),
+             'password_hash': password_hash, 'created_at': now}
+            for i in range(users)
+        ])
+        user_ids = db.session.scalars(
+            db.select(User.id).where(User.id >= first).order_by(User.id)
+        ).all()
+
+        goal_rows, rule_rows, item_rows, ledger_rows = [], [], [], []
+        for user_id in user_ids:
+            for g in range(goals):
+                goal_rows.append({
+                    'user_id': user_id, 'name': f'Goal {g + 1}',
+                    'target_amount': round(rng.uniform(500, 20000) * 100),
+                    'current_amount': round(rng.uniform(0, 400) * 100),
+                    'deadline': (datetime.combine(today, datetime.min.time()) + timedelta(days=rng.randrange(60, 1500))
+                                 if rng.random() < 0.7 else None),
+                    'created_at': now, 'updated_at': now,
+                })
+            for r in range(rules):
+                kind = ('round-up', 'percentage', 'fixed')[r % 3]
+                rule_rows.append({
+                    'user_id': user_id, 'type': kind, 'is_active': True,
+                    'amount': round(rng.uniform(1, 10) * 100) if kind == 'fixed' else None,
+                    'percentage': round(rng.uniform(1, 15) * 10) * 10 if kind == 'percentage' else None,
+                    'created_at': now, 'updated_at': now,
+                })
+            item_rows.append({
+                'user_id': user_id, 'plaid_item_id': f'seed-item-{user_id}',
+                'access_token': f'access-seed-{user_id}', 'institution_id': 'ins_seed',
+                'institution_name': 'Seed Bank', 'created_at': now,
+            })
+            ledger_rows.extend(_ledger(rng, user_id, transactions, months, today))
+            mark_user_changed(db.session, user_id)
+
+        if goal_rows:
+            db.session.execute(SavingsGoal.__table__.insert(), goal_rows)
+        if rule_rows:
+            db.session.execute(SavingsRule.__table__.insert(), rule_rows)
+        db.session.execute(PlaidItem.__table__.insert(), item_rows)
+        for row in ledger_rows:
+            row['created_at'] = now
+        if ledger_rows:
+            db.session.execute(Transaction.__table__.insert(), ledger_rows)
+            apply_deltas(db.session, accumulate(ledger_rows))
+        db.session.commit()
+        return [(user_id, seed_email(user_id)) for user_id in user_ids]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--goals', type=int, default=5, help='Goals per user.')
+    parser.add_argument('--rules', type=int, default=3, help='Rules per user.')
+    parser.add_argument('--transactions', type=int, default=500, help='Ledger rows per user.')
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--database-url', default=None,
+                        help='Seed this database instead of a temporary one.')
+    args = parser.parse_args()
+
+    config = {'SQLALCHEMY_DATABASE_URI': args.database_url} if args.database_url else {}
+    app = make_app(**config)
+    started = time.perf_counter()
+    users = seed_database(app, args.users, args.goals, args.rules, args.transactions, args.months, args.seed)
+    elapsed = time.perf_counter() - started
+    print(f'Seeded {len(users)} users, {len(users) * args.transactions} transactions into '
+          f"{app.config['SQLALCHEMY_DATABASE_URI']} in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
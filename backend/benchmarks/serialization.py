@@ -0,0 +1,104 @@
+"""Serialization cost per 10k rows, old path vs the serializer layer.
+
+before: ORM query hydrating every instance, the hand-written to_dict()
+        each model used to have, and the stdlib encoder behind jsonify()
+after:  column-projected Core rows, serialize_rows() with its cached field
+        plan, and FastJSONProvider (orjson when installed)
+
+    python -m benchmarks.serialization --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from benchmarks.common import make_app
+from finance_tracker.extensions import db
+from finance_tracker.models.savings import SavingsGoal
+from finance_tracker.models.user import User
+from finance_tracker.utils import serializers
+from finance_tracker.utils.money import from_hundredths
+from finance_tracker.utils.serializers import serialize_rows
+
+
+def legacy_to_dict(goal):
+    return {
+        'id': goal.id,
+        'name': goal.name,
+        'target_amount': from_hundredths(goal.target_amount),
+        'current_amount': from_hundredths(goal.current_amount),
+        'deadline': goal.deadline.isoformat() if goal.deadline else None,
+        'created_at': goal.created_at.isoformat(),
+        'updated_at': goal.updated_at.isoformat()
+    }
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    with app.app_context():
+        user = User(name='Serializer', email='serializer@example.com')
+        user.password = 'benchmark-password'
+        db.session.add(user)
+        db.session.commit()
+        now = datetime.utcnow()
+        db.session.execute(SavingsGoal.__table__.insert(), [
+            {'user_id': user.id, 'name': f'Goal {i}', 'target_amount': 10000 + 100 * i, 'current_amount': i * 33,
+             'deadline': now + timedelta(days=i % 400) if i % 2 else None, 'created_at': now, 'updated_at': now}
+            for i in range(args.rows)
+        ])
+        db.session.commit()
+        user_id, fields = user.id, SavingsGoal.API_FIELDS
+        columns = [getattr(SavingsGoal, name) for name in fields]
+        stdlib = lambda obj: json.dumps(obj, sort_keys=True, separators=(',', ':'))
+        fast = lambda obj: app.json.dumps(obj, separators=(',', ':'))
+
+        stages = [
+            ('load: ORM instances', lambda: SavingsGoal.query.filter_by(user_id=user_id).all()),
+            ('load: projected rows', lambda: db.session.execute(
+                db.select(*columns).where(SavingsGoal.user_id == user_id)).all()),
+        ]
+        results = {}
+        for name, fn in stages:
+            results[name] = best_of(args.repeat, fn)
+        goals = results['load: ORM instances'][1]
+        rows = results['load: projected rows'][1]
+        dicts = [legacy_to_dict(goal) for goal in goals]
+        stages = [
+            ('dicts: legacy to_dict()', lambda: [legacy_to_dict(goal) for goal in goals]),
+            ('dicts: serialize_rows()', lambda: list(serialize_rows(SavingsGoal, rows, fields))),
+            ('encode: stdlib json', lambda: stdlib(dicts)),
+            (f"encode: {'orjson' if serializers.orjson else 'stdlib'} provider", lambda: fast(dicts)),
+        ]
+        for name, fn in stages:
+            results[name] = best_of(args.repeat, fn)
+
+        per = 10000 / args.rows
+        print(f"{'stage':<30} {'ms / 10k rows':>14}")
+        for name, (ms, _) in results.items():
+            print(f'{name:<30} {ms * per:>14.2f}')
+
+        before = best_of(args.repeat, lambda: stdlib(
+            [legacy_to_dict(goal) for goal in SavingsGoal.query.filter_by(user_id=user_id).all()]))
+        after = best_of(args.repeat, lambda: fast(list(serialize_rows(
+            SavingsGoal, db.session.execute(db.select(*columns).where(SavingsGoal.user_id == user_id)), fields))))
+        assert json.loads(before[1]) == json.loads(after[1])
+        print(f"{'end to end: before':<30} {before[0] * per:>14.2f}")
+        print(f"{'end to end: after':<30} {after[0] * per:>14.2f}  ({before[0] / after[0]:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Mixed read/write savings traffic against each SQLite engine profile.
+
+    python -m benchmarks.sqlite_concurrency --threads 16 --requests 2000 --write-ratio 0.3
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.common import make_app, register, percentile
+
+
+def run(profile, threads, requests, write_ratio, users=8, seed=7):
+    app = make_app(DATABASE_PROFILE=profile, PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    client = app.test_client()
+    accounts = []
+    for i in range(users):
+        headers = register(client, f'mixed{i}@example.com')
+        goal = client.post('/api/savings/goals', headers=headers, json={'name': 'Goal', 'target_amount': 1000})
+        accounts.append((headers, goal.get_json()['id']))
+
+    rng = random.Random(seed)
+    plan = [(rng.choice(accounts), rng.random() < write_ratio, rng.random()) for _ in range(requests)]
+
+    def request(item):
+        (headers, goal_id), is_write, coin = item
+        started = time.perf_counter()
+        try:
+            local = app.test_client()
+            if not is_write:
+                response = local.get('/api/savings/goals', headers=headers)
+            elif coin < 0.5:
+                response = local.post('/api/savings/goals', headers=headers,
+                                      json={'name': 'Extra', 'target_amount': 50})
+            else:
+                response = local.put(f'/api/savings/goals/{goal_id}', headers=headers,
+                                     json={'current_amount': round(coin * 1000, 2)})
+            ok = response.status_code < 500
+        except Exception:
+            # e.g. sqlite3.OperationalError: database is locked
+            ok = False
+        return ok, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(request, plan))
+    elapsed = time.perf_counter() - started
+    latencies = [ms for ok, ms in results if ok]
+    errors = sum(1 for ok, _ in results if not ok)
+    return len(latencies) / elapsed, percentile(latencies, 50), percentile(latencies, 99), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--write-ratio', type=float, default=0.3)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>8}")
+    for profile in ('default', 'production'):
+        throughput, p50, p99, errors = run(profile, args.threads, args.requests, args.write_ratio)
+        print(f'{profile:<12} {throughput:>10.1f} {p50:>10.2f} {p99:>10.2f} {errors:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+"""End-to-end benchmark suite with a JSON baseline.
+
+Seeds a temporary SQLite database with benchmarks.seed, then runs each
+scenario through the Flask test client, `--threads` clients at a time,
+and reports throughput and p50/p95/p99 latency per scenario. An operation
+is one request, except savings_crud (create, update, list, delete).
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json --tolerance 0.2
+
+--compare exits with status 1 if a scenario's p95 grew, or its throughput
+fell, by more than --tolerance relative to the baseline, or if a scenario
+started returning errors. Baselines are only comparable when they were
+recorded with the same scale and hashing arguments (checked) on the same
+machine (not checked).
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from flask_jwt_extended import create_access_token
+from benchmarks.common import make_app, percentile
+from benchmarks.seed import PASSWORD, seed_database
+from finance_tracker.extensions import insights_cache
+
+
+class Context:
+    """Per-thread client plus the seeded users it works through"""
+
+    def __init__(self, app, users, tokens, thread):
+        self.app = app
+        self.client = app.test_client()
+        self.users = users
+        self.tokens = tokens
+        self.thread = thread
+        self.etags = {}
+
+    def user(self, i):
+        return self.users[i % len(self.users)]
+
+    def headers(self, i):
+        return {'Authorization': f'Bearer {self.tokens[self.user(i)[0]]}'}
+
+
+def _expect(response, *statuses):
+    if response.status_code not in statuses:
+        raise AssertionError(f'{response.request.method} {response.request.path}: {response.status_code}')
+    return response
+
+
+def register(ctx, i):
+    _expect(ctx.client.post('/auth/register', json={
+        'name': 'Load Test', 'email': f'load-{ctx.thread}-{i}@example.com', 'password': PASSWORD,
+    }), 201)
+
+
+def login(ctx, i):
+    _expect(ctx.client.post('/auth/login', json={'email': ctx.user(i)[1], 'password': PASSWORD}), 200)
+
+
+def savings_crud(ctx, i):
+    headers = ctx.headers(i)
+    goal = _expect(ctx.client.post('/api/savings/goals', headers=headers,
+                                   json={'name': f'Load {i}', 'target_amount': 1000}), 201).get_json()
+    _expect(ctx.client.put(f"/api/savings/goals/{goal['id']}", headers=headers,
+                           json={'current_amount': 250}), 200)
+    _expect(ctx.client.get('/api/savings/goals', headers=headers), 200)
+    _expect(ctx.client.delete(f"/api/savings/goals/{goal['id']}", headers=headers), 204)
+
+
+def savings_lists(ctx, i):
+    url = '/api/savings/rules' if i % 2 else '/api/savings/goals'
+    _expect(ctx.client.get(url, headers=ctx.headers(i)), 200)
+
+
+def insights_cold(ctx, i):
+    insights_cache.invalidate_group(ctx.user(i)[0])
+    _expect(ctx.client.post('/api/insights', headers=ctx.headers(i), json={}), 200)
+
+
+def insights_warm(ctx, i):
+    _expect(ctx.client.post('/api/insights', headers=ctx.headers(i), json={}), 200)
+
+
+def dashboard(ctx, i):
+    _expect(ctx.client.get('/api/dashboard', headers=ctx.headers(i)), 200)
+
+
+def auth_dashboard(ctx, i):
+    _expect(ctx.client.get('/auth/api/dashboard', headers=ctx.headers(i)), 200)
+
+
+def dashboard_revalidate(ctx, i):
+    """A polling client that replays the ETag it was last given"""
+    user_id = ctx.user(i)[0]
+    headers = ctx.headers(i)
+    if user_id in ctx.etags:
+        headers['If-None-Match'] = ctx.etags[user_id]
+    response = _expect(ctx.client.get('/api/dashboard', headers=headers), 200, 304)
+    ctx.etags[user_id] = response.headers['ETag']
+
+
+SCENARIOS = {
+    'register': register,
+    'login': login,
+    'savings_crud': savings_crud,
+    'savings_lists': savings_lists,
+    'insights_cold': insights_cold,
+    'insights_warm': insights_warm,
+    'dashboard': dashboard,
+    'auth_dashboard': auth_dashboard,
+    'dashboard_revalidate': dashboard_revalidate,
+}
+
+
+def run_scenario(app, users, tokens, operation, operations, threads, warmup):
+    """{'operations', 'errors', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms'} for one scenario"""
+    # Each thread works through its own slice of the users
+    contexts = [Context(app, users[t::threads] or users, tokens, t) for t in range(threads)]
+    for ctx in contexts:
+        for i in range(warmup):
+            operation(ctx, -1 - i)
+
+    latencies = [[] for _ in contexts]
+    errors = [0] * threads
+
+    def worker(t):
+        ctx = contexts[t]
+        for i in range(t, operations, threads):
+            started = time.perf_counter()
+            try:
+                operation(ctx, i)
+            except AssertionError:
+                errors[t] += 1
+                continue
+            latencies[t].append((time.perf_counter() - started) * 1000)
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = [value for per_thread in latencies for value in per_thread]
+    return {
+        'operations': len(samples),
+        'errors': sum(errors),
+        'throughput': round(len(samples) / elapsed, 2),
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print per-scenario changes; returns a list of regression messages"""
+    regressions = []
+    if baseline.get('config') != results['config']:
+        print(f"warning: baseline config {baseline.get('config')} differs from {results['config']}")
+    print(f"\n{'scenario':<22} {'ops/s':>19} {'p95 ms':>21}")
+    for name, current in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if before is None:
+            print(f'{name:<22} (not in baseline)')
+            continue
+        throughput_change = current['throughput'] / before['throughput'] - 1 if before['throughput'] else 0.0
+        p95_change = current['p95_ms'] / before['p95_ms'] - 1 if before['p95_ms'] else 0.0
+        print(f"{name:<22} {before['throughput']:>8.1f} -> {current['throughput']:<7.1f} "
+              f"{before['p95_ms']:>8.2f} -> {current['p95_ms']:<8.2f} "
+              f"({throughput_change:+.0%} ops/s, {p95_change:+.0%} p95)")
+        if throughput_change < -tolerance:
+            regressions.append(f'{name}: throughput {throughput_change:+.0%}')
+        if p95_change > tolerance:
+            regressions.append(f'{name}: p95 {p95_change:+.0%}')
+        if current['errors'] > before.get('errors', 0):
+            regressions.append(f"{name}: {current['errors']} errors (baseline {before.get('errors', 0)})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--goals', type=int, default=5, help='Goals per user.')
+    parser.add_argument('--rules', type=int, default=3, help='Rules per user.')
+    parser.add_argument('--transactions', type=int, default=500, help='Ledger rows per user.')
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--operations', type=int, default=500, help='Timed operations per scenario.')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed operations per thread first.')
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--hash-method', default='pbkdf2:sha256:1000',
+                        help='PASSWORD_HASH_METHOD; the cheap default keeps register/login about the '
+                             'request path rather than the hash (see benchmarks.login_throughput).')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Run only these scenarios (repeatable).')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against.')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative p95 growth / throughput loss before --compare fails.')
+    args = parser.parse_args()
+
+    app = make_app(PASSWORD_HASH_METHOD=args.hash_method)
+    started = time.perf_counter()
+    users = seed_database(app, args.users, args.goals, args.rules, args.transactions, args.months, args.seed)
+    print(f'Seeded {len(users)} users x {args.transactions} transactions in {time.perf_counter() - started:.1f}s')
+    with app.app_context():
+        tokens = {user_id: create_access_token(identity=str(user_id)) for user_id, _ in users}
+
+    results = {
+        'recorded_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'config': {key: getattr(args, key) for key in (
+            'users', 'goals', 'rules', 'transactions', 'months', 'seed', 'operations', 'threads', 'hash_method')},
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'machine': platform.machine(),
+            'processor': platform.processor() or None,
+        },
+        'scenarios': {},
+    }
+
+    print(f"{'scenario':<22} {'ops':>6} {'errors':>7} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name in args.scenario or SCENARIOS:
+        stats = run_scenario(app, users, tokens, SCENARIOS[name], args.operations, args.threads, args.warmup)
+        results['scenarios'][name] = stats
+        print(f"{name:<22} {stats['operations']:>6} {stats['errors']:>7} {stats['throughput']:>9.1f} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as stream:
+            json.dump(results, stream, indent=2)
+            stream.write('\n')
+        print(f'Wrote {args.output}')
+
+    if args.compare:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print('\nRegressions beyond tolerance:\n  ' + '\n  '.join(regressions))
+            sys.exit(1)
+        print('\nNo regressions beyond tolerance.')
+
+
+if __name__ == '__main__':
+    main()
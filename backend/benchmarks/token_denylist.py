@@ -0,0 +1,67 @@
+"""Cost of the revoked-token check on authenticated requests.
+
+Revokes `--revoked` tokens, then times `--requests` GETs with a live token
+twice: with the default in-memory denylist, and with JWT_DENYLIST_REFRESH=0,
+which goes to the database on every request the way a plain denylist
+table lookup would. Also times the raw Bloom filter check.
+
+    python -m benchmarks.token_denylist --revoked 5000 --requests 1000
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+from benchmarks.common import make_app, register, percentile, QueryCounter
+from finance_tracker.extensions import db, token_denylist
+from finance_tracker.models.revoked_token import RevokedToken
+from finance_tracker.utils.revocation import BloomFilter
+
+
+def run(refresh, revoked, requests):
+    app = make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', JWT_DENYLIST_REFRESH=refresh)
+    client = app.test_client()
+    headers = register(client, 'denylist@example.com')
+    expires = datetime.utcnow() + timedelta(hours=1)
+    with app.app_context():
+        db.session.execute(RevokedToken.__table__.insert(), [
+            {'jti': str(uuid.uuid4()), 'user_id': 1, 'expires_at': expires, 'revoked_at': datetime.utcnow()}
+            for _ in range(revoked)
+        ])
+        db.session.commit()
+    token_denylist.reset()
+    client.get('/api/protected', headers=headers)  # builds the filter
+
+    latencies = []
+    with QueryCounter(app) as counter:
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.get('/api/protected', headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.get_json()
+    return percentile(latencies, 50), percentile(latencies, 99), counter.count / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--revoked', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'denylist':<26} {'p50 ms':>8} {'p99 ms':>8} {'SQL/req':>8}")
+    for label, refresh in (('bloom filter (30s refresh)', 30), ('database every request', 0)):
+        p50, p99, sql = run(refresh, args.revoked, args.requests)
+        print(f'{label:<26} {p50:>8.3f} {p99:>8.3f} {sql:>8.1f}')
+
+    bloom = BloomFilter(100000, 0.001)
+    for _ in range(args.revoked):
+        bloom.add(str(uuid.uuid4()))
+    probes = [str(uuid.uuid4()) for _ in range(100000)]
+    started = time.perf_counter()
+    false_positives = sum(probe in bloom for probe in probes)
+    elapsed = time.perf_counter() - started
+    print(f'\nBloom check: {elapsed / len(probes) * 1e6:.1f} us, '
+          f'{false_positives / len(probes):.4%} false positives, {len(bloom.bits) / 1024:.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
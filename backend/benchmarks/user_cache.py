@@ -0,0 +1,50 @@
+"""Queries per request across the savings blueprint with and without the user cache.
+
+    python -m benchmarks.user_cache --requests 500
+"""
+import argparse
+from benchmarks.common import make_app, register, QueryCounter, percentile, timed
+
+SCENARIOS = [
+    ('GET', '/api/savings/goals', None),
+    ('GET', '/api/savings/rules', None),
+    ('PUT', '/api/savings/goals/1', {'current_amount': 10}),
+    ('GET', '/api/savings/calculate', None),
+]
+
+
+def run(label, requests, **config):
+    app = make_app(**config)
+    client = app.test_client()
+    headers = register(client, 'bench@example.com')
+    client.post('/api/savings/goals', headers=headers, json={'name': 'Emergency fund', 'target_amount': 5000})
+    client.post('/api/savings/rules', headers=headers, json={'type': 'percentage', 'percentage': 10})
+
+    rows = []
+    for method, path, body in SCENARIOS:
+        latencies = []
+        with QueryCounter(app) as counter:
+            for _ in range(requests):
+                response, elapsed = timed(client.open, path, method=method, headers=headers, json=body)
+                assert response.status_code < 400, (path, response.status_code, response.get_data(as_text=True))
+                latencies.append(elapsed * 1000)
+        rows.append((label, f'{method} {path}', counter.count / requests,
+                     percentile(latencies, 50), percentile(latencies, 99)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    rows = run('no cache', args.requests, USER_CACHE_TTL=0)
+    rows += run('user cache', args.requests)
+
+    print(f"{'mode':<12} {'route':<30} {'queries/req':>12} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, route, queries, p50, p99 in rows:
+        print(f'{label:<12} {route:<30} {queries:>12.2f} {p50:>8.2f} {p99:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -8,26 +8,78 @@ from flask_jwt_extended import JWTManager
 from datetime import timedelta
 
 # Initialize extensions
-from .extensions import db, jwt, migrate
+from .extensions import db, jwt, migrate, insights_cache, user_cache, password_hasher, plaid_gateway, metrics, token_denylist, rate_limiter
+from .utils.passwords import default_workers
+from .utils.sqlite import engine_options, install_pragmas
+from .utils.serializers import FastJSONProvider
 
 load_dotenv()
 
-def create_app():
+def create_app(test_config=None):
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     
-    # Configure database with absolute path
+    # DATABASE_URL picks the SQLite database per environment (other
+    # databases are rejected, see utils/sqlite.py); the default is a file
+    # under backend/instance
     instance_path = Path(__file__).parent.parent / "instance"
-    instance_path.mkdir(exist_ok=True)
-    db_path = instance_path / "finance_tracker.db"
+    default_database_url = f'sqlite:///{(instance_path / "finance_tracker.db").as_posix()}'
     
     # Unified configuration
     app.config.update(
         SECRET_KEY=os.getenv('SECRET_KEY', 'your-secret-key-here'),
         JWT_SECRET_KEY=os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key'),
-        SQLALCHEMY_DATABASE_URI=f'sqlite:///{db_path.as_posix()}',
+        SQLALCHEMY_DATABASE_URI=os.getenv('DATABASE_URL', default_database_url),
+        DATABASE_PROFILE=os.getenv('DATABASE_PROFILE', 'production'),
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
-        JWT_ACCESS_TOKEN_EXPIRES=timedelta(days=1)
+        JWT_ACCESS_TOKEN_EXPIRES=timedelta(days=1),
+        JWT_DENYLIST_CAPACITY=int(os.getenv('JWT_DENYLIST_CAPACITY', 100000)),
+        JWT_DENYLIST_ERROR_RATE=float(os.getenv('JWT_DENYLIST_ERROR_RATE', 0.001)),
+        JWT_DENYLIST_EXACT_SIZE=int(os.getenv('JWT_DENYLIST_EXACT_SIZE', 10000)),
+        JWT_DENYLIST_REFRESH=float(os.getenv('JWT_DENYLIST_REFRESH', 30)),
+        RATELIMIT_ENABLED=os.getenv('RATELIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+        RATELIMIT_IP_BURST=int(os.getenv('RATELIMIT_IP_BURST', 20)),
+        RATELIMIT_IP_PER_MINUTE=float(os.getenv('RATELIMIT_IP_PER_MINUTE', 10)),
+        RATELIMIT_EMAIL_BURST=int(os.getenv('RATELIMIT_EMAIL_BURST', 10)),
+        RATELIMIT_EMAIL_PER_MINUTE=float(os.getenv('RATELIMIT_EMAIL_PER_MINUTE', 5)),
+        RATELIMIT_MAX_KEYS=int(os.getenv('RATELIMIT_MAX_KEYS', 100000)),
+        RATELIMIT_STORAGE_URL=os.getenv('RATELIMIT_STORAGE_URL'),
+        INSIGHTS_CACHE_SIZE=int(os.getenv('INSIGHTS_CACHE_SIZE', 4096)),
+        INSIGHTS_CACHE_TTL=int(os.getenv('INSIGHTS_CACHE_TTL', 300)),
+        USER_CACHE_SIZE=int(os.getenv('USER_CACHE_SIZE', 10000)),
+        USER_CACHE_TTL=int(os.getenv('USER_CACHE_TTL', 60)),
+        PASSWORD_HASH_METHOD=os.getenv('PASSWORD_HASH_METHOD', 'scrypt'),
+        PASSWORD_HASH_WORKERS=int(os.getenv('PASSWORD_HASH_WORKERS', default_workers())),
+        PASSWORD_HASH_TIMEOUT=float(os.getenv('PASSWORD_HASH_TIMEOUT', 10)),
+        FORECAST_PATHS=int(os.getenv('FORECAST_PATHS', 5000)),
+        FORECAST_HORIZON_MONTHS=int(os.getenv('FORECAST_HORIZON_MONTHS', 120)),
+        FORECAST_HISTORY_MONTHS=int(os.getenv('FORECAST_HISTORY_MONTHS', 12)),
+        PLAID_CLIENT_ID=os.getenv('PLAID_CLIENT_ID', 'your_plaid_client_id'),
+        PLAID_SECRET=os.getenv('PLAID_SECRET', 'your_plaid_secret'),
+        PLAID_ENV=os.getenv('PLAID_ENV', 'sandbox'),
+        PLAID_HOST=os.getenv('PLAID_HOST'),
+        PLAID_POOL_SIZE=int(os.getenv('PLAID_POOL_SIZE', 10)),
+        PLAID_MAX_CONCURRENCY=int(os.getenv('PLAID_MAX_CONCURRENCY', 10)),
+        PLAID_ACQUIRE_TIMEOUT=float(os.getenv('PLAID_ACQUIRE_TIMEOUT', 2)),
+        PLAID_TIMEOUT=(3.05, float(os.getenv('PLAID_TIMEOUT', 10))),
+        PLAID_RETRIES=int(os.getenv('PLAID_RETRIES', 2)),
+        PLAID_RETRY_BACKOFF=float(os.getenv('PLAID_RETRY_BACKOFF', 0.25)),
+        PLAID_BREAKER_THRESHOLD=int(os.getenv('PLAID_BREAKER_THRESHOLD', 5)),
+        PLAID_BREAKER_RESET=float(os.getenv('PLAID_BREAKER_RESET', 30)),
+        PLAID_SYNC_CONCURRENCY=int(os.getenv('PLAID_SYNC_CONCURRENCY', 4)),
+        PLAID_SYNC_PAGE_SIZE=int(os.getenv('PLAID_SYNC_PAGE_SIZE', 500)),
+        METRICS_ENABLED=os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+        METRICS_SLOW_QUERY_MS=float(os.getenv('METRICS_SLOW_QUERY_MS', 100)),
+        METRICS_SLOW_REQUEST_MS=float(os.getenv('METRICS_SLOW_REQUEST_MS', 1000)),
+        METRICS_MAX_SERIES=int(os.getenv('METRICS_MAX_SERIES', 500)),
+        METRICS_TOKEN=os.getenv('METRICS_TOKEN')
     )
+    if test_config:
+        app.config.update(test_config)
+    if app.config['SQLALCHEMY_DATABASE_URI'] == default_database_url:
+        instance_path.mkdir(exist_ok=True)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(
+        app.config['DATABASE_PROFILE'], app.config['SQLALCHEMY_DATABASE_URI']))
 
     # Initialize CORS with specific configurations
     CORS(app, resources={
@@ -45,24 +97,48 @@ def create_app():
 
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        install_pragmas(db.engine, app.config['DATABASE_PROFILE'])
     jwt.init_app(app)
+    token_denylist.init_app(app, jwt)
     migrate.init_app(app, db)
+    insights_cache.init_app(app, 'INSIGHTS_CACHE')
+    user_cache.init_app(app, 'USER_CACHE')
+    password_hasher.init_app(app)
+    rate_limiter.init_app(app)
+    plaid_gateway.init_app(app)
+    if app.config['METRICS_ENABLED']:
+        metrics.init_app(app, sources={
+            'insights_cache': insights_cache.stats,
+            'user_cache': user_cache.stats,
+            'plaid_gateway': plaid_gateway.stats,
+            'token_denylist': token_denylist.stats,
+            'rate_limiter': rate_limiter.stats,
+        })
+        with app.app_context():
+            metrics.instrument_engine(db.engine)
 
     # Register blueprints
     from .routes.auth import auth_bp
     from .routes.api import api_bp
     from .routes.savings import savings_bp
+    from .routes.transactions import transactions_bp
     
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(savings_bp, url_prefix='/api/savings')
+    app.register_blueprint(transactions_bp, url_prefix='/api/transactions')
 
-    # Initialize database
-    with app.app_context():
-        try:
-            db.create_all()
-            print(f"Database initialized at: {db_path}")
-        except Exception as e:
-            print(f"Database initialization error: {str(e)}")
+    # Register CLI commands
+    from .cli import (transactions_cli, insights_cli, query_plans_cli, plaid_cli, savings_cli, recurring_cli,
+                      init_db_command)
+    app.cli.add_command(transactions_cli)
+    app.cli.add_command(plaid_cli)
+    app.cli.add_command(savings_cli)
+    app.cli.add_command(recurring_cli)
+    app.cli.add_command(insights_cli)
+    app.cli.add_command(query_plans_cli)
+    # The schema is created by migrations (`flask init-db`), not on boot
+    app.cli.add_command(init_db_command)
 
     return app
\ No newline at end of file
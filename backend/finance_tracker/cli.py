@@ -0,0 +1,176 @@
+import csv
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from finance_tracker.utils.importer import import_transactions, detect_format, CHUNK_SIZE
+
+transactions_cli = AppGroup('transactions', help='Transaction ledger commands.')
+
+@transactions_cli.command('import')
+@click.argument('user_id', type=int)
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ofx', 'qfx']), default=None,
+              help='Statement format (defaults to the file extension).')
+@click.option('--chunk-size', default=CHUNK_SIZE, show_default=True,
+              help='Rows per batched INSERT.')
+def import_command(user_id, path, fmt, chunk_size):
+    """Bulk import a CSV/OFX statement file for USER_ID."""
+    fmt = fmt or detect_format(path)
+    started = time.perf_counter()
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        result = import_transactions(user_id, stream, fmt=fmt, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - started
+    click.echo(f"Imported {result['imported']} transactions "
+               f"({result['skipped']} already present) in {elapsed:.2f}s")
+
+
+insights_cli = AppGroup('insights', help='Financial health scoring commands.')
+
+@insights_cli.command('score')
+@click.option('--output', type=click.Path(dir_okay=False, writable=True), default='-',
+              show_default=True, help='CSV file to write the scores to.')
+def score_command(output):
+    """Score every user from the monthly rollups in one vectorized pass."""
+    from finance_tracker.utils.health_batch import analyze_financial_health_batch, columns_from_rollups
+
+    started = time.perf_counter()
+    user_ids, columns, _ = columns_from_rollups()
+    result = analyze_financial_health_batch(**columns)
+    elapsed = time.perf_counter() - started
+
+    with click.open_file(output, 'w') as stream:
+        writer = csv.writer(stream)
+        writer.writerow(['user_id', 'score', 'health_status', 'savings_score', 'expense_score',
+                         'category_score', 'trend_score', 'savings_alert', 'high_spending_categories',
+                         'spending_increase_alert'])
+        high_spending = result['high_spending'].sum(axis=1)
+        for i, user_id in enumerate(user_ids.tolist()):
+            writer.writerow([
+                user_id, result['score'][i], result['health_status'][i],
+                round(result['savings_score'][i], 4), round(result['expense_score'][i], 4),
+                result['category_score'][i], round(result['trend_score'][i], 4),
+                int(result['savings_alert'][i]), high_spending[i], int(result['spending_increase_alert'][i]),
+            ])
+    click.echo(f'Scored {len(user_ids)} users in {elapsed:.2f}s', err=True)
+
+@insights_cli.command('verify')
+@click.option('--samples', default=10000, show_default=True, help='Random payloads to compare.')
+@click.option('--seed', default=None, type=int, help='Random seed for reproducible runs.')
+def verify_command(samples, seed):
+    """Check that the batch scorer matches analyze_financial_health exactly."""
+    from finance_tracker.utils.health import analyze_financial_health
+    from finance_tracker.utils.health_batch import (
+        analyze_financial_health_batch, batch_insights, columns_from_payloads, random_payloads
+    )
+
+    payloads = random_payloads(samples, seed=seed)
+    columns, category_names = columns_from_payloads(payloads)
+    result = analyze_financial_health_batch(**columns)
+    for i, payload in enumerate(payloads):
+        expected = analyze_financial_health(payload)
+        actual = batch_insights(result, i, category_names[i])
+        if actual != expected:
+            raise click.ClickException(f'Mismatch for payload {payload!r}: {actual!r} != {expected!r}')
+    click.echo(f'{samples} payloads match')
+
+
+query_plans_cli = AppGroup('query-plans', help='Query plan regression checks.')
+
+@query_plans_cli.command('check')
+@click.option('--verbose', is_flag=True, help='Print the plan for every query.')
+def check_plans_command(verbose):
+    """Fail if any route query falls back to a full table scan."""
+    from finance_tracker.utils.query_plans import check_query_plans
+
+    failures = 0
+    for name, plan, ok in check_query_plans():
+        if not ok:
+            failures += 1
+        if verbose or not ok:
+            click.echo(f"{'ok  ' if ok else 'SCAN'} {name}")
+            for line in plan:
+                click.echo(f'       {line}')
+    if failures:
+        raise click.ClickException(f'{failures} route queries use a full table scan')
+    click.echo('All route queries use an index')
+
+
+plaid_cli = AppGroup('plaid', help='Plaid integration commands.')
+
+@plaid_cli.command('sync')
+@click.option('--item-id', 'item_ids', type=int, multiple=True, help='Only sync these PlaidItem ids.')
+@click.option('--concurrency', type=int, default=None, help='Items synced in parallel (PLAID_SYNC_CONCURRENCY).')
+@click.option('--loop', is_flag=True, help='Keep running as a background worker.')
+@click.option('--interval', default=300, show_default=True, help='Seconds between passes with --loop.')
+def plaid_sync_command(item_ids, concurrency, loop, interval):
+    """Pull new, modified and removed transactions for Plaid items."""
+    from finance_tracker.utils.plaid_sync import sync_items, run_sync_worker
+
+    app = current_app._get_current_object()
+    if loop:
+        run_sync_worker(app, interval, concurrency=concurrency)
+        return
+
+    started = time.perf_counter()
+    results = sync_items(app, item_ids=list(item_ids) or None, concurrency=concurrency)
+    elapsed = time.perf_counter() - started
+    for result in results:
+        if 'error' in result:
+            click.echo(f"item {result['item_id']}: error: {result['error']}", err=True)
+        else:
+            click.echo(f"item {result['item_id']}: +{result['added']} ~{result['modified']} "
+                       f"-{result['removed']} ({result['pages']} pages)")
+    rate = len(results) / elapsed * 60 if elapsed else 0
+    click.echo(f'Synced {len(results)} items in {elapsed:.2f}s ({rate:.0f} items/min)')
+
+
+savings_cli = AppGroup('savings', help='Savings rule commands.')
+
+@savings_cli.command('apply-rules')
+@click.option('--user-id', type=int, default=None, help='Only process this user.')
+@click.option('--batch-size', default=50000, show_default=True, help='Transactions per database transaction.')
+def apply_rules_command(user_id, batch_size):
+    """Apply active savings rules to transactions added since the last run."""
+    from finance_tracker.utils.savings_engine import run_rules, run_all
+
+    started = time.perf_counter()
+    processed = {user_id: run_rules(user_id, batch_size)} if user_id else run_all(batch_size)
+    elapsed = time.perf_counter() - started
+    click.echo(f'Processed {sum(processed.values())} transactions for {len(processed)} users in {elapsed:.2f}s')
+
+
+recurring_cli = AppGroup('recurring', help='Recurring charge detection commands.')
+
+@recurring_cli.command('detect')
+@click.option('--user-id', type=int, default=None, help='Only process this user.')
+@click.option('--batch-size', default=50000, show_default=True, help='Transactions per database transaction.')
+@click.option('--rebuild', is_flag=True, help='Discard the detected series and start over from the whole ledger.')
+def detect_recurring_command(user_id, batch_size, rebuild):
+    """Fold transactions added since the last run into the recurring series."""
+    from finance_tracker.utils.recurring import detect_recurring, rebuild_recurring, detect_all
+
+    started = time.perf_counter()
+    if user_id:
+        run = rebuild_recurring if rebuild else detect_recurring
+        processed = {user_id: run(user_id, batch_size)}
+    else:
+        processed = detect_all(batch_size, rebuild=rebuild)
+    elapsed = time.perf_counter() - started
+    click.echo(f'Processed {sum(processed.values())} transactions for {len(processed)} users in {elapsed:.2f}s')
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create the database schema, or upgrade it to the latest migration."""
+    from flask_migrate import upgrade
+    from sqlalchemy import inspect
+    from finance_tracker.extensions import db
+
+    tables = set(inspect(db.engine).get_table_names())
+    if tables and 'alembic_version' not in tables:
+        raise click.ClickException('The database has tables but no migration history. Check that it matches '
+                                   'the models, then run "flask db stamp head" once.')
+    upgrade()
+    click.echo(f"Database initialized at: {current_app.config['SQLALCHEMY_DATABASE_URI']}")
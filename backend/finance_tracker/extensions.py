@@ -1,7 +1,34 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
+from finance_tracker.utils.cache import TTLCache
+from finance_tracker.utils.metrics import RequestMetrics
+from finance_tracker.utils.passwords import PasswordHasher
+from finance_tracker.utils.plaid_client import PlaidGateway
+from finance_tracker.utils.ratelimit import RateLimiter
+from finance_tracker.utils.revocation import TokenDenylist
 migrate = Migrate() 
 
 db = SQLAlchemy()
-jwt = JWTManager()
\ No newline at end of file
+jwt = JWTManager()
+
+# /api/insights results keyed by (user_id, payload hash)
+insights_cache = TTLCache(maxsize=4096, ttl=300)
+
+# User rows for login_required / jwt_required lookups, keyed by user id
+user_cache = TTLCache(maxsize=10000, ttl=60)
+
+# Bounded process pool for password hashing and verification
+password_hasher = PasswordHasher()
+
+# Pooled Plaid client with timeouts, retries and a circuit breaker
+plaid_gateway = PlaidGateway()
+
+# Per-IP and per-email attempt limits for /auth/login and /auth/register
+rate_limiter = RateLimiter()
+
+# Revoked access tokens, checked by every jwt_required/login_required call
+token_denylist = TokenDenylist()
+
+# Per-route latency and SQL statistics served at /metrics
+metrics = RequestMetrics()
@@ -0,0 +1,14 @@
+from datetime import datetime
+from finance_tracker.extensions import db
+
+class UserDataVersion(db.Model):
+    """Counter bumped in every transaction that changes a user's data.
+
+    Maintained by finance_tracker.utils.versions; list and dashboard
+    responses derive their ETag and Last-Modified from it.
+    """
+    __tablename__ = 'user_data_versions'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
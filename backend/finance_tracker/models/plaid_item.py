@@ -1,5 +1,6 @@
 from datetime import datetime
 from finance_tracker.extensions import db
+from finance_tracker.utils.serializers import serialize
 
 class PlaidItem(db.Model):
     __tablename__ = 'plaid_items'
@@ -10,16 +11,23 @@ class PlaidItem(db.Model):
     access_token = db.Column(db.String(255), unique=True, nullable=False)
     institution_id = db.Column(db.String(255))
     institution_name = db.Column(db.String(255))
+    transactions_cursor = db.Column(db.Text, nullable=True)  # last applied /transactions/sync cursor
+    last_synced_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_plaid_items_user_id', 'user_id'),
+    )
+
     user = db.relationship('User', backref=db.backref('plaid_items', lazy=True))
 
+    @classmethod
+    def by_plaid_item_id(cls, plaid_item_id):
+        """Query for the item Plaid knows as `plaid_item_id`, whoever owns it"""
+        return cls.query.filter_by(plaid_item_id=plaid_item_id)
+
+    # Keys of to_dict()
+    API_FIELDS = ('id', 'user_id', 'plaid_item_id', 'institution_id', 'institution_name', 'last_synced_at', 'created_at')
+
     def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'plaid_item_id': self.plaid_item_id,
-            'institution_id': self.institution_id,
-            'institution_name': self.institution_name,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return serialize(self)
@@ -0,0 +1,48 @@
+from datetime import datetime
+from finance_tracker.extensions import db
+from finance_tracker.utils.money import Cents
+from finance_tracker.utils.serializers import serialize
+
+class RecurringSeries(db.Model):
+    """Every charge (or deposit) from one counterparty, with its detected cadence.
+
+    Maintained incrementally by finance_tracker.utils.recurring: `history`
+    keeps only the most recent occurrences, which is all the detector
+    needs, so new transactions never require rereading the ledger. kind and
+    cadence are NULL while the series doesn't look recurring.
+    """
+    __tablename__ = 'recurring_series'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    merchant_key = db.Column(db.String(100), primary_key=True)  # normalized merchant, see merchant_key()
+    direction = db.Column(db.String(7), primary_key=True)  # 'expense' or 'income'
+    name = db.Column(db.String(255), nullable=False)  # merchant as last seen
+    category = db.Column(db.String(100), nullable=True)
+    kind = db.Column(db.String(20), nullable=True)  # 'subscription', 'bill', 'rent', 'payroll', 'income'
+    cadence = db.Column(db.String(20), nullable=True)  # 'weekly', 'biweekly', 'monthly', 'quarterly', 'yearly'
+    interval_days = db.Column(db.Integer, nullable=True)  # median days between occurrences
+    typical_amount = db.Column(Cents, nullable=True)  # median of recent amounts, always positive
+    last_amount = db.Column(Cents, nullable=False)
+    previous_amount = db.Column(Cents, nullable=True)
+    occurrences = db.Column(db.Integer, nullable=False, default=0)
+    first_date = db.Column(db.Date, nullable=False)
+    last_date = db.Column(db.Date, nullable=False)
+    next_date = db.Column(db.Date, nullable=True)
+    history = db.Column(db.JSON, nullable=False)  # [[ISO date, cents], ...], oldest first
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Keys of to_dict()
+    API_FIELDS = ('merchant_key', 'name', 'category', 'direction', 'kind', 'cadence', 'interval_days',
+                  'typical_amount', 'last_amount', 'previous_amount', 'occurrences', 'first_date',
+                  'last_date', 'next_date')
+
+    def to_dict(self):
+        return serialize(self)
+
+class RecurringCheckpoint(db.Model):
+    """Highest transaction id the recurring detector has processed for a user."""
+    __tablename__ = 'recurring_checkpoints'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    last_transaction_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,32 @@
+from datetime import datetime
+from finance_tracker.extensions import db
+
+class RevokedToken(db.Model):
+    """An access token revoked before it expired (logout), keyed by its jti.
+
+    Rows are only needed until expires_at and are pruned after that.
+    """
+    __tablename__ = 'revoked_tokens'
+
+    jti = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Denylist refreshes read rows revoked since the last one
+        db.Index('ix_revoked_tokens_revoked_at', 'revoked_at'),
+    )
+
+
+class TokenCutoff(db.Model):
+    """Every token a user was issued at or before revoked_before is revoked (revoke-all)"""
+    __tablename__ = 'token_cutoffs'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    revoked_before = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_token_cutoffs_updated_at', 'updated_at'),
+    )
@@ -0,0 +1,28 @@
+from datetime import datetime
+from finance_tracker.extensions import db
+from finance_tracker.utils.money import Cents, from_hundredths
+
+class MonthlyCategoryRollup(db.Model):
+    """Per-user income/expense totals for one (month, category) bucket.
+
+    Maintained incrementally by finance_tracker.utils.rollups whenever
+    transactions are written, so dashboards never scan the ledger.
+    """
+    __tablename__ = 'monthly_category_rollups'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # 'YYYY-MM'
+    category = db.Column(db.String(100), primary_key=True)
+    income = db.Column(Cents, nullable=False, default=0)
+    expenses = db.Column(Cents, nullable=False, default=0)  # stored as a positive total
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'month': self.month,
+            'category': self.category,
+            'income': from_hundredths(self.income),
+            'expenses': from_hundredths(self.expenses),
+            'transaction_count': self.transaction_count
+        }
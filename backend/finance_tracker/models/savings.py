@@ -1,5 +1,7 @@
 from datetime import datetime
 from finance_tracker import db
+from finance_tracker.utils.money import BasisPoints, Cents
+from finance_tracker.utils.serializers import serialize
 
 class SavingsGoal(db.Model):
     __tablename__ = 'savings_goals'
@@ -7,24 +9,32 @@ class SavingsGoal(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
-    target_amount = db.Column(db.Float, nullable=False)
-    current_amount = db.Column(db.Float, default=0)
+    target_amount = db.Column(Cents, nullable=False)
+    current_amount = db.Column(Cents, default=0)
     deadline = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_savings_goals_user_id_id', 'user_id', 'id'),
+    )
+
     user = db.relationship('User', backref=db.backref('savings_goals', lazy=True))
 
+    @classmethod
+    def for_user(cls, user_id):
+        return cls.query.filter_by(user_id=user_id)
+
+    @classmethod
+    def owned(cls, goal_id, user_id):
+        """Query for one goal, only if it belongs to the user"""
+        return cls.query.filter_by(id=goal_id, user_id=user_id)
+
+    # Keys of to_dict(), selectable with ?fields= on list endpoints
+    API_FIELDS = ('id', 'name', 'target_amount', 'current_amount', 'deadline', 'created_at', 'updated_at')
+
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'target_amount': self.target_amount,
-            'current_amount': self.current_amount,
-            'deadline': self.deadline.isoformat() if self.deadline else None,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+        return serialize(self)
 
 class SavingsRule(db.Model):
     __tablename__ = 'savings_rules'
@@ -32,21 +42,57 @@ class SavingsRule(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     type = db.Column(db.String(20), nullable=False)  # 'round-up', 'percentage', 'fixed'
-    amount = db.Column(db.Float, nullable=True)
-    percentage = db.Column(db.Float, nullable=True)
+    amount = db.Column(Cents, nullable=True)
+    percentage = db.Column(BasisPoints, nullable=True)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # calculate_savings filters on (user_id, is_active); get_rules pages by (user_id, id)
+        db.Index('ix_savings_rules_user_id_is_active', 'user_id', 'is_active'),
+        db.Index('ix_savings_rules_user_id_id', 'user_id', 'id'),
+    )
+
     user = db.relationship('User', backref=db.backref('savings_rules', lazy=True))
 
+    @classmethod
+    def owned(cls, rule_id, user_id):
+        """Query for one rule, only if it belongs to the user"""
+        return cls.query.filter_by(id=rule_id, user_id=user_id)
+
+    # Keys of to_dict(), selectable with ?fields= on list endpoints
+    API_FIELDS = ('id', 'type', 'amount', 'percentage', 'is_active', 'created_at', 'updated_at')
+
     def to_dict(self):
-        return {
-            'id': self.id,
-            'type': self.type,
-            'amount': self.amount,
-            'percentage': self.percentage,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        } 
\ No newline at end of file
+        return serialize(self)
+
+class SavingsContribution(db.Model):
+    """Amount one rule has set aside for a user in one month.
+
+    Written by finance_tracker.utils.savings_engine as new transactions are
+    processed. rule_id is deliberately not a foreign key: contributions are
+    history and outlive the rule that produced them.
+    """
+    __tablename__ = 'savings_contributions'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    rule_id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # 'YYYY-MM'
+    amount = db.Column(Cents, nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Keys of to_dict()
+    API_FIELDS = ('rule_id', 'month', 'amount', 'transaction_count')
+
+    def to_dict(self):
+        return serialize(self)
+
+class SavingsCheckpoint(db.Model):
+    """Highest transaction id the rule engine has processed for a user."""
+    __tablename__ = 'savings_checkpoints'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    last_transaction_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
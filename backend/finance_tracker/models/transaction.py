@@ -0,0 +1,51 @@
+from datetime import datetime
+from finance_tracker.extensions import db
+from finance_tracker.utils.money import Cents
+from finance_tracker.utils.serializers import serialize
+
+class Transaction(db.Model):
+    __tablename__ = 'transactions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # active_history keeps the previous value on assignment so the rollup
+    # listeners can back the old (month, category) bucket out on update
+    user_id = db.column_property(db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False), active_history=True)
+    external_id = db.Column(db.String(255), nullable=True)  # FITID / bank reference, used to skip re-imports
+    date = db.column_property(db.Column(db.Date, nullable=False), active_history=True)
+    amount = db.column_property(db.Column(Cents, nullable=False), active_history=True)  # cents; negative = expense, positive = income
+    description = db.Column(db.String(255), nullable=True)
+    merchant = db.Column(db.String(255), nullable=True)
+    category = db.column_property(db.Column(db.String(100), nullable=True), active_history=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_transactions_user_id_date', 'user_id', 'date'),
+        # The savings rule engine walks a user's ledger in id order from its checkpoint
+        db.Index('ix_transactions_user_id_id', 'user_id', 'id'),
+        db.UniqueConstraint('user_id', 'external_id', name='uq_transactions_user_id_external_id'),
+        # Ids are never reused: the rule engine and the recurring detector
+        # checkpoint on the highest id they have processed
+        {'sqlite_autoincrement': True},
+    )
+
+    user = db.relationship('User', backref=db.backref('transactions', lazy='dynamic'))
+
+    @classmethod
+    def recent_query(cls, user_id, limit=5):
+        """Latest transactions first, served by ix_transactions_user_id_date"""
+        return (
+            cls.query
+            .filter_by(user_id=user_id)
+            .order_by(cls.date.desc(), cls.id.desc())
+            .limit(limit)
+        )
+
+    @classmethod
+    def recent_for_user(cls, user_id, limit=5):
+        return cls.recent_query(user_id, limit).all()
+
+    # Keys of to_dict()
+    API_FIELDS = ('id', 'date', 'amount', 'description', 'merchant', 'category', 'created_at')
+
+    def to_dict(self):
+        return serialize(self)
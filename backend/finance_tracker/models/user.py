@@ -1,6 +1,6 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
-from finance_tracker.extensions import db
+from finance_tracker.extensions import db, password_hasher
+from finance_tracker.utils.serializers import serialize
 
 def to_dict(self):
     return {
@@ -16,7 +16,7 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)  # Make sure this exists
+    password_hash = db.Column(db.String(255), nullable=False)  # Make sure this exists
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     
@@ -27,27 +27,42 @@ class User(db.Model):
 
     @password.setter
     def password(self, password):
-        """Create hashed password with default werkzeug parameters"""
+        """Create hashed password with the configured method and cost"""
         if not password:
             raise ValueError('Password cannot be empty')
         if len(password) < 8:
             raise ValueError('Password must be at least 8 characters')
-        # Use default werkzeug hashing (pbkdf2:sha256)
-        self.password_hash = generate_password_hash(password)
+        # Hashing runs on the password_hasher process pool
+        self.password_hash = password_hasher.hash(password)
 
     def verify_password(self, password):
         """Check hashed password"""
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def rehash_password_if_needed(self, password):
+        """Re-hash a verified password stored with outdated parameters"""
+        if not password_hasher.needs_rehash(self.password_hash):
+            return False
+        self.password = password
+        return True
         
+    @classmethod
+    def by_email(cls, email):
+        """Query for the user with `email` (unique, served by its index)"""
+        return cls.query.filter_by(email=email)
+
+    def get_monthly_data(self):
+        """Income and expenses for the latest month, read from the rollup table"""
+        from finance_tracker.utils.rollups import latest_month
+        return latest_month(self.id)
+
     def __repr__(self):
         return f'<User {self.email}>'
     
+    # Keys of to_dict()
+    API_FIELDS = ('id', 'name', 'email', 'created_at')
+
     def to_dict(self):
         """Serialize user object to dictionary"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'email': self.email,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return serialize(self)
     
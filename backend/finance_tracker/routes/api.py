@@ -1,140 +1,125 @@
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from finance_tracker.extensions import db
+from finance_tracker.extensions import db, insights_cache
 from finance_tracker.models.user import User
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.utils import rollups
+from finance_tracker.utils.export import (
+    EXPORTS, ExportArgsError, download_name, export_chunks, mimetype, parquet_available, parse_export_args
+)
+from finance_tracker.utils.search import SearchArgsError, parse_search_args, search
+from finance_tracker.utils.recurring import recurring_insights, recurring_series, series_dict
+from finance_tracker.utils.health import analyze_financial_health
+from finance_tracker.utils.changes import user_data_changed
+from finance_tracker.utils.auth import load_user
+from finance_tracker.utils.versions import conditional_on_user_data
 from datetime import datetime, timedelta
-import openai
-import os
+import hashlib
+import json
 
 api_bp = Blueprint('api', __name__)
 
-# Initialize OpenAI client
-openai.api_key = os.getenv('OPENAI_API_KEY')
+def payload_digest(data):
+    """Stable hash of a JSON payload, independent of key order"""
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
 
-def analyze_financial_health(data):
-    """Analyze financial health and generate insights using GPT-4."""
-    
-    # Calculate financial health score (0-100)
-    monthly_data = data['monthlyData']
-    monthly_trend = data['monthlyTrend']
-    categories = data['categoryDistribution']
-    
-    # Component 1: Savings Rate (0-30 points)
-    income = monthly_data['income']
-    expenses = monthly_data['expenses']
-    savings_rate = ((income - expenses) / income * 100) if income > 0 else 0
-    savings_score = min(30, (savings_rate / 20) * 30)  # 20% savings rate = full score
-    
-    # Component 2: Expense Management (0-30 points)
-    expense_ratio = expenses / income if income > 0 else 1
-    expense_score = max(0, 30 * (1 - expense_ratio))
-    
-    # Component 3: Category Balance (0-20 points)
-    category_score = 20
-    for category in categories:
-        if category['percentage'] > 40:  # Penalize if any category is over 40%
-            category_score -= 5
-    category_score = max(0, category_score)
-    
-    # Component 4: Income Trend (0-20 points)
-    if len(monthly_trend) >= 2:
-        latest_income = monthly_trend[-1]['income']
-        previous_income = monthly_trend[-2]['income']
-        income_growth = ((latest_income - previous_income) / previous_income * 100) if previous_income > 0 else 0
-        trend_score = min(20, max(0, 10 + (income_growth / 10) * 10))
-    else:
-        trend_score = 10
-
-    # Calculate total score
-    total_score = round(savings_score + expense_score + category_score + trend_score)
-    
-    # Generate insights and recommendations
-    insights = []
-    
-    # Savings insights
-    if savings_rate < 20:
-        insights.append({
-            "type": "savings",
-            "title": "Improve Your Savings Rate",
-            "description": f"Your current savings rate is {savings_rate:.1f}%. Aim for at least 20%.",
-            "severity": "high" if savings_rate < 10 else "medium",
-            "recommendation": "Consider automating your savings and reviewing non-essential expenses."
-        })
-    
-    # Budget adherence
-    high_spending_categories = [cat for cat in categories if cat['percentage'] > 30]
-    if high_spending_categories:
-        for category in high_spending_categories:
-            insights.append({
-                "type": "budget",
-                "title": f"High Spending in {category['category']}",
-                "description": f"Spending in {category['category']} is {category['percentage']}% of your budget.",
-                "severity": "high" if category['percentage'] > 40 else "medium",
-                "recommendation": f"Try to reduce {category['category']} expenses to below 30% of your budget."
-            })
-    
-    # Financial health status
-    health_status = "Excellent" if total_score >= 80 else "Good" if total_score >= 60 else "Fair" if total_score >= 40 else "Needs Improvement"
-    insights.append({
-        "type": "health",
-        "title": "Financial Health Status",
-        "description": f"Your financial health score is {total_score}/100 - {health_status}",
-        "severity": "low" if total_score >= 60 else "medium" if total_score >= 40 else "high",
-        "recommendation": "Focus on building emergency savings and maintaining a balanced budget."
-    })
-    
-    # Monthly comparison
-    if len(monthly_trend) >= 2:
-        latest_expenses = monthly_trend[-1]['expenses']
-        previous_expenses = monthly_trend[-2]['expenses']
-        expense_change = ((latest_expenses - previous_expenses) / previous_expenses * 100) if previous_expenses > 0 else 0
-        
-        if expense_change > 10:
-            insights.append({
-                "type": "budget",
-                "title": "Spending Increase Alert",
-                "description": f"Your monthly expenses increased by {expense_change:.1f}%",
-                "severity": "high" if expense_change > 20 else "medium",
-                "recommendation": "Review your recent expenses and identify areas for reduction."
-            })
-    
-    return {
-        "score": total_score,
-        "insights": insights
-    }
+@user_data_changed.connect
+def invalidate_insights(user_id, **extra):
+    insights_cache.invalidate_group(user_id)
 
 @api_bp.route('/insights', methods=['POST'])
 @jwt_required()
 def get_insights():
     try:
-        data = request.get_json()
-        analysis = analyze_financial_health(data)
-        return jsonify(analysis), 200
+        user_id = int(get_jwt_identity())
+        data = request.get_json(silent=True) or {}
+        cache_key = (user_id, payload_digest(data))
+
+        analysis = insights_cache.get(cache_key)
+        cache_status = 'HIT'
+        if analysis is None:
+            cache_status = 'MISS'
+            # Fill anything the client didn't send from the server-side rollups
+            required = ('monthlyData', 'monthlyTrend', 'categoryDistribution')
+            if not all(key in data for key in required):
+                data = {**rollups.financial_summary(user_id), **data}
+            analysis = analyze_financial_health(data)
+            # Subscriptions, upcoming payments and pay cadence, as of the
+            # last detection run (after each import and Plaid sync)
+            analysis['insights'].extend(recurring_insights(user_id))
+            insights_cache.set(cache_key, analysis, group=user_id)
+
+        response = jsonify(analysis)
+        response.headers['X-Cache'] = cache_status
+        return response, 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@api_bp.route('/recurring', methods=['GET'])
+@jwt_required()
+def get_recurring():
+    user_id = int(get_jwt_identity())
+    include_inactive = request.args.get('include_inactive', 'false').lower() in ('1', 'true', 'yes')
+    return jsonify([series_dict(series, active)
+                    for series, active in recurring_series(user_id, include_inactive=include_inactive)]), 200
+
+# Conditional GETs are safe only because the ETag carries a digest of the
+# query string, so ?q=netf and ?q=car never validate against each other
+@api_bp.route('/search', methods=['GET'])
+@jwt_required()
+@conditional_on_user_data
+def search_records():
+    try:
+        query, kinds, limit, offset = parse_search_args(request.args)
+    except SearchArgsError as e:
+        return jsonify({'error': str(e)}), 400
+
+    user_id = int(get_jwt_identity())
+    response = {'query': query}
+    for kind in kinds:
+        results, next_offset = search(user_id, query, kind, limit, offset)
+        response[kind] = {'results': results, 'next_offset': next_offset}
+    return jsonify(response), 200
+
+@api_bp.route('/export/<kind>', methods=['GET'])
+@jwt_required()
+def export_records(kind):
+    if kind not in EXPORTS:
+        return jsonify({'error': f"Unknown export; choose from {', '.join(EXPORTS)}"}), 404
+    try:
+        fmt, gzip = parse_export_args(request.args)
+    except ExportArgsError as e:
+        return jsonify({'error': str(e)}), 400
+    if fmt == 'parquet' and not parquet_available():
+        return jsonify({'error': 'Parquet export is not available on this server'}), 501
+
+    # Rows are read and encoded while the body is sent; see utils.export
+    user_id = int(get_jwt_identity())
+    headers = {'Content-Disposition': f'attachment; filename="{download_name(kind, fmt, gzip)}"'}
+    return Response(stream_with_context(export_chunks(kind, user_id, fmt, gzip)),
+                    mimetype=mimetype(fmt, gzip), headers=headers)
+
 @api_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
+@conditional_on_user_data
 def dashboard():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = load_user(get_jwt_identity())
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    # Mock dashboard data (replace with real data later)
+    summary = rollups.financial_summary(user.id)
     dashboard_data = {
         'welcome_message': f'Welcome back, {user.name}',
         'stats': {
-            'total_balance': 5000,
-            'monthly_income': 3000,
-            'monthly_expenses': 2000
+            'total_balance': rollups.total_balance(user.id),
+            'monthly_income': summary['monthlyData']['income'],
+            'monthly_expenses': summary['monthlyData']['expenses']
         },
-        'recent_transactions': [
-            {'id': 1, 'description': 'Grocery Shopping', 'amount': -150, 'date': '2023-05-15'},
-            {'id': 2, 'description': 'Paycheck', 'amount': 2000, 'date': '2023-05-01'},
-            {'id': 3, 'description': 'Rent', 'amount': -1000, 'date': '2023-05-05'}
-        ]
+        'monthly_trend': summary['monthlyTrend'],
+        'category_distribution': summary['categoryDistribution'],
+        'recent_transactions': [t.to_dict() for t in Transaction.recent_for_user(user.id)]
     }
     
     return jsonify(dashboard_data)
@@ -1,37 +1,31 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
-from finance_tracker.extensions import db
+from finance_tracker.extensions import db, plaid_gateway, token_denylist, rate_limiter
 from finance_tracker.models.user import User
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.plaid_item import PlaidItem
+# Registers the denylist tables; TokenDenylist only imports them on first use
+from finance_tracker.models.revoked_token import RevokedToken, TokenCutoff
+from finance_tracker.utils import rollups
+from finance_tracker.utils.auth import load_user
+from finance_tracker.utils.passwords import HashingBusyError
+from finance_tracker.utils.plaid_client import PlaidUnavailableError
+from finance_tracker.utils.versions import conditional_on_user_data
 from flask_jwt_extended import (
     create_access_token, 
     jwt_required, 
     get_jwt_identity,
+    get_jwt,
     JWTManager
 )
 import logging
+import math
 from datetime import datetime, timedelta
-from plaid.api import plaid_api
-from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-from plaid.configuration import Configuration
-from plaid.api_client import ApiClient
-from plaid.exceptions import ApiException
 
 auth_bp = Blueprint('auth', __name__)
 
 # Initialize JWT
 jwt = JWTManager()
 
-# Initialize Plaid client
-configuration = Configuration(
-     host=Configuration(host="sandbox.plaid.com"),  # Or .Development/.Production
-    api_key={
-        'clientId': 'your_plaid_client_id',
-        'secret': 'your_plaid_secret',
-    }
-)
-api_client = ApiClient(configuration)
-plaid_client = plaid_api.PlaidApi(api_client)
-
 @auth_bp.route('/register', methods=['POST', 'OPTIONS'])
 def register():
     if request.method == 'OPTIONS':
@@ -50,7 +44,14 @@ def register():
 
         # Normalize email
         email = data['email'].strip().lower()
-        if User.query.filter_by(email=email).first():
+
+        # Before the uniqueness query and the hash
+        retry_after = rate_limiter.check('register', request.remote_addr, email)
+        if retry_after:
+            response = jsonify({'error': 'Too many attempts, please retry later'})
+            return _rate_limited(response, retry_after)
+
+        if User.by_email(email).first():
             return jsonify({'error': 'Email already exists'}), 409
 
         # Validate password
@@ -82,6 +83,9 @@ def register():
     except ValueError as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
+    except HashingBusyError:
+        db.session.rollback()
+        return jsonify({'error': 'Server busy, please retry'}), 503
     except Exception as e:
         db.session.rollback()
         logging.error(f"Registration error: {str(e)}")
@@ -114,8 +118,18 @@ def login():
                 "error": "missing_credentials"
             }), 400
 
+        # Before the user lookup and the password check
+        retry_after = rate_limiter.check('login', request.remote_addr, email)
+        if retry_after:
+            response = jsonify({
+                "status": "error",
+                "message": "Too many login attempts, please retry later",
+                "error": "rate_limited"
+            })
+            return _rate_limited(response, retry_after)
+
         # Find user and verify password
-        user = User.query.filter_by(email=email).first()
+        user = User.by_email(email).first()
         if not user or not user.verify_password(password):
             return jsonify({
                 "status": "error",
@@ -123,6 +137,10 @@ def login():
                 "error": "invalid_credentials"
             }), 401
 
+        # Upgrade hashes made with an older method or cost
+        if user.rehash_password_if_needed(password):
+            db.session.commit()
+
         # Create token with additional claims
         access_token = create_access_token(
             identity=str(user.id),
@@ -147,6 +165,13 @@ def login():
         
         return jsonify(response_data), 200
 
+    except HashingBusyError:
+        db.session.rollback()
+        return jsonify({
+            "status": "error",
+            "message": "Server busy, please retry",
+            "error": "server_busy"
+        }), 503
     except Exception as e:
         logging.error(f"Login error: {str(e)}", exc_info=True)
         return jsonify({
@@ -155,53 +180,80 @@ def login():
             "error": "server_error"
         }), 500
 
+@auth_bp.route('/logout', methods=['POST', 'OPTIONS'])
+@jwt_required()
+def logout():
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+
+    try:
+        claims = get_jwt()
+        token_denylist.revoke(claims['jti'], int(claims['sub']), datetime.utcfromtimestamp(claims['exp']))
+        return jsonify({
+            "status": "success",
+            "message": "Logged out"
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Logout error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Internal server error",
+            "error": "server_error"
+        }), 500
+
+@auth_bp.route('/logout-all', methods=['POST', 'OPTIONS'])
+@jwt_required()
+def logout_all():
+    """Revoke every token issued to the user so far, on every device"""
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+
+    try:
+        revoked_before = token_denylist.revoke_all(int(get_jwt_identity()))
+        return jsonify({
+            "status": "success",
+            "message": "All sessions logged out",
+            "revoked_before": revoked_before.isoformat()
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Logout-all error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Internal server error",
+            "error": "server_error"
+        }), 500
+
 @auth_bp.route('/api/dashboard', methods=['GET', 'OPTIONS'])
 @jwt_required()
+@conditional_on_user_data
 def get_dashboard():
     if request.method == 'OPTIONS':
         return _build_cors_preflight_response()
         
     try:
-        # Get identity as string
-        user_id = str(get_jwt_identity())
-        user = User.query.get(user_id)
+        user = load_user(get_jwt_identity())
         
         if not user:
             return jsonify({"error": "User not found"}), 404
 
         # Check Plaid integration
-        if not hasattr(user, 'plaid_access_token') or not user.plaid_access_token:
+        if not user.plaid_items:
             return jsonify({
                 "error": "Plaid integration not complete",
                 "solution": "Complete Plaid link flow"
             }), 422
 
-        # Demo data - replace with actual implementation
+        monthly = rollups.latest_month(user.id)
         dashboard_data = {
             "welcome_message": f"Welcome back, {user.name}",
             "stats": {
-                "total_balance": 12543.21,
-                "monthly_income": 5432.10,
-                "monthly_expenses": 3210.54,
-                "net_worth": 93210.87
+                "total_balance": rollups.total_balance(user.id),
+                "monthly_income": monthly['income'],
+                "monthly_expenses": monthly['expenses']
             },
-            "recent_transactions": [
-                {
-                    "id": 1,
-                    "date": datetime.now().strftime("%Y-%m-%d"),
-                    "description": "Sample Transaction",
-                    "amount": -125.50,
-                    "category": "Food"
-                }
-            ],
-            "accounts": [
-                {
-                    "id": "sample_account",
-                    "name": "Sample Account",
-                    "balance": 1103.42,
-                    "type": "checking"
-                }
-            ]
+            "recent_transactions": [t.to_dict() for t in Transaction.recent_for_user(user.id)]
         }
 
         return jsonify(dashboard_data), 200
@@ -216,13 +268,15 @@ def exchange_plaid_token():
     if request.method == 'OPTIONS':
         return _build_cors_preflight_response()
         
+    from plaid.exceptions import ApiException
+    from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
+
     try:
         public_token = request.json.get('public_token')
         if not public_token:
             return jsonify({"error": "Missing public token"}), 400
 
-        user_id = str(get_jwt_identity())
-        user = User.query.get(user_id)
+        user = load_user(get_jwt_identity())
         
         if not user:
             return jsonify({"error": "User not found"}), 404
@@ -231,15 +285,28 @@ def exchange_plaid_token():
         request_obj = ItemPublicTokenExchangeRequest(
             public_token=public_token
         )
-        response = plaid_client.item_public_token_exchange(request_obj)
+        response = plaid_gateway.call('item_public_token_exchange', request_obj)
         
-        # Store tokens
-        user.plaid_access_token = response.access_token
-        user.plaid_item_id = response.item_id
+        # Store tokens; the sync worker picks the item up on its next run.
+        # plaid_item_id is unique, so an item linked by another user is a
+        # conflict, never a row to take over.
+        item = PlaidItem.by_plaid_item_id(response.item_id).first()
+        if item is not None and item.user_id != user.id:
+            logging.warning(f"Plaid item {response.item_id} is already linked to another user")
+            return jsonify({"error": "This bank connection is linked to another account"}), 409
+        if item is None:
+            item = PlaidItem(user_id=user.id, plaid_item_id=response.item_id)
+            db.session.add(item)
+        item.access_token = response.access_token
+        item.institution_id = request.json.get('institution_id')
+        item.institution_name = request.json.get('institution_name')
         db.session.commit()
         
         return jsonify({"status": "success"}), 200
         
+    except PlaidUnavailableError as e:
+        logging.error(f"Plaid unavailable: {str(e)}")
+        return jsonify({"error": "Bank connection service unavailable, please retry"}), 503
     except ApiException as e:
         logging.error(f"Plaid API error: {str(e)}")
         return jsonify({
@@ -250,6 +317,11 @@ def exchange_plaid_token():
         logging.error(f"Token exchange error: {str(e)}")
         return jsonify({"error": "Failed to exchange Plaid token"}), 422
 
+def _rate_limited(response, retry_after):
+    response.status_code = 429
+    response.headers['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
 def _build_cors_preflight_response():
     response = jsonify({'message': 'CORS preflight'})
     response.headers.add("Access-Control-Allow-Origin", "*")
@@ -1,38 +1,32 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from finance_tracker import db
 from finance_tracker.models.savings import SavingsGoal, SavingsRule
 from finance_tracker.utils.auth import login_required
-from datetime import datetime
+from finance_tracker.utils.listing import list_response
+from finance_tracker.utils.money import from_hundredths
+from finance_tracker.utils.versions import conditional_on_user_data
+from finance_tracker.utils.savings_batch import (
+    SavingsValidationError, apply_batch,
+    goal_create_values, goal_update_values, rule_create_values, rule_update_values
+)
 
 savings_bp = Blueprint('savings', __name__)
 
 @savings_bp.route('/goals', methods=['GET'])
 @login_required
+@conditional_on_user_data
 def get_goals(current_user):
-    goals = SavingsGoal.query.filter_by(user_id=current_user.id).all()
-    return jsonify([goal.to_dict() for goal in goals])
+    return list_response(SavingsGoal, current_user.id, SavingsGoal.API_FIELDS)
 
 @savings_bp.route('/goals', methods=['POST'])
 @login_required
 def create_goal(current_user):
-    data = request.get_json()
+    try:
+        values = goal_create_values(request.get_json())
+    except SavingsValidationError as e:
+        return jsonify({'error': str(e)}), 400
     
-    if not data.get('name') or not data.get('target_amount'):
-        return jsonify({'error': 'Name and target amount are required'}), 400
-    
-    deadline = None
-    if data.get('deadline'):
-        try:
-            deadline = datetime.fromisoformat(data['deadline'])
-        except ValueError:
-            return jsonify({'error': 'Invalid deadline format'}), 400
-    
-    goal = SavingsGoal(
-        user_id=current_user.id,
-        name=data['name'],
-        target_amount=float(data['target_amount']),
-        deadline=deadline
-    )
+    goal = SavingsGoal(user_id=current_user.id, **values)
     
     db.session.add(goal)
     db.session.commit()
@@ -42,31 +36,24 @@ def create_goal(current_user):
 @savings_bp.route('/goals/<int:goal_id>', methods=['PUT'])
 @login_required
 def update_goal(current_user, goal_id):
-    goal = SavingsGoal.query.filter_by(id=goal_id, user_id=current_user.id).first()
+    goal = SavingsGoal.owned(goal_id, current_user.id).first()
     if not goal:
         return jsonify({'error': 'Goal not found'}), 404
     
-    data = request.get_json()
-    
-    if data.get('name'):
-        goal.name = data['name']
-    if data.get('target_amount'):
-        goal.target_amount = float(data['target_amount'])
-    if data.get('current_amount'):
-        goal.current_amount = float(data['current_amount'])
-    if data.get('deadline'):
-        try:
-            goal.deadline = datetime.fromisoformat(data['deadline'])
-        except ValueError:
-            return jsonify({'error': 'Invalid deadline format'}), 400
+    try:
+        values = goal_update_values(request.get_json(), goal)
+    except SavingsValidationError as e:
+        return jsonify({'error': str(e)}), 400
     
+    for key, value in values.items():
+        setattr(goal, key, value)
     db.session.commit()
     return jsonify(goal.to_dict())
 
 @savings_bp.route('/goals/<int:goal_id>', methods=['DELETE'])
 @login_required
 def delete_goal(current_user, goal_id):
-    goal = SavingsGoal.query.filter_by(id=goal_id, user_id=current_user.id).first()
+    goal = SavingsGoal.owned(goal_id, current_user.id).first()
     if not goal:
         return jsonify({'error': 'Goal not found'}), 404
     
@@ -74,36 +61,47 @@ def delete_goal(current_user, goal_id):
     db.session.commit()
     return '', 204
 
+@savings_bp.route('/goals/forecast', methods=['GET'])
+@login_required
+def forecast_goals(current_user):
+    from finance_tracker.utils.forecast import forecast_for_user
+
+    goals = SavingsGoal.for_user(current_user.id).all()
+    result = forecast_for_user(current_user.id, goals, current_app.config)
+    return jsonify({
+        'monthly_inflow': result['monthly_inflow'],
+        'forecasts': [result['forecasts'][goal.id] for goal in goals]
+    })
+
+@savings_bp.route('/goals/<int:goal_id>/forecast', methods=['GET'])
+@login_required
+def forecast_goal(current_user, goal_id):
+    from finance_tracker.utils.forecast import forecast_for_user
+
+    goals = SavingsGoal.for_user(current_user.id).all()
+    if not any(goal.id == goal_id for goal in goals):
+        return jsonify({'error': 'Goal not found'}), 404
+
+    # Goals ahead of this one in the funding order use inflow first
+    result = forecast_for_user(current_user.id, goals, current_app.config)
+    forecast = dict(result['forecasts'][goal_id], monthly_inflow=result['monthly_inflow'])
+    return jsonify(forecast)
+
 @savings_bp.route('/rules', methods=['GET'])
 @login_required
+@conditional_on_user_data
 def get_rules(current_user):
-    rules = SavingsRule.query.filter_by(user_id=current_user.id).all()
-    return jsonify([rule.to_dict() for rule in rules])
+    return list_response(SavingsRule, current_user.id, SavingsRule.API_FIELDS)
 
 @savings_bp.route('/rules', methods=['POST'])
 @login_required
 def create_rule(current_user):
-    data = request.get_json()
+    try:
+        values = rule_create_values(request.get_json())
+    except SavingsValidationError as e:
+        return jsonify({'error': str(e)}), 400
     
-    if not data.get('type'):
-        return jsonify({'error': 'Rule type is required'}), 400
-    
-    rule_type = data['type']
-    if rule_type not in ['round-up', 'percentage', 'fixed']:
-        return jsonify({'error': 'Invalid rule type'}), 400
-    
-    if rule_type == 'percentage' and not data.get('percentage'):
-        return jsonify({'error': 'Percentage is required for percentage-based rules'}), 400
-    if rule_type == 'fixed' and not data.get('amount'):
-        return jsonify({'error': 'Amount is required for fixed rules'}), 400
-    
-    rule = SavingsRule(
-        user_id=current_user.id,
-        type=rule_type,
-        amount=float(data['amount']) if rule_type == 'fixed' else None,
-        percentage=float(data['percentage']) if rule_type == 'percentage' else None,
-        is_active=data.get('is_active', True)
-    )
+    rule = SavingsRule(user_id=current_user.id, **values)
     
     db.session.add(rule)
     db.session.commit()
@@ -113,26 +111,24 @@ def create_rule(current_user):
 @savings_bp.route('/rules/<int:rule_id>', methods=['PUT'])
 @login_required
 def update_rule(current_user, rule_id):
-    rule = SavingsRule.query.filter_by(id=rule_id, user_id=current_user.id).first()
+    rule = SavingsRule.owned(rule_id, current_user.id).first()
     if not rule:
         return jsonify({'error': 'Rule not found'}), 404
     
-    data = request.get_json()
-    
-    if data.get('is_active') is not None:
-        rule.is_active = data['is_active']
-    if data.get('amount') and rule.type == 'fixed':
-        rule.amount = float(data['amount'])
-    if data.get('percentage') and rule.type == 'percentage':
-        rule.percentage = float(data['percentage'])
+    try:
+        values = rule_update_values(request.get_json(), rule)
+    except SavingsValidationError as e:
+        return jsonify({'error': str(e)}), 400
     
+    for key, value in values.items():
+        setattr(rule, key, value)
     db.session.commit()
     return jsonify(rule.to_dict())
 
 @savings_bp.route('/rules/<int:rule_id>', methods=['DELETE'])
 @login_required
 def delete_rule(current_user, rule_id):
-    rule = SavingsRule.query.filter_by(id=rule_id, user_id=current_user.id).first()
+    rule = SavingsRule.owned(rule_id, current_user.id).first()
     if not rule:
         return jsonify({'error': 'Rule not found'}), 404
     
@@ -140,28 +136,54 @@ def delete_rule(current_user, rule_id):
     db.session.commit()
     return '', 204
 
+def _batch_response(model, user_id):
+    data = request.get_json(silent=True)
+    try:
+        results = apply_batch(model, user_id, data.get('operations') if isinstance(data, dict) else None)
+    except SavingsValidationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    failed = sum(1 for result in results if result['status'] >= 400)
+    return jsonify({'results': results, 'applied': len(results) - failed, 'failed': failed})
+
+@savings_bp.route('/goals:batch', methods=['POST'])
+@login_required
+def batch_goals(current_user):
+    return _batch_response(SavingsGoal, current_user.id)
+
+@savings_bp.route('/rules:batch', methods=['POST'])
+@login_required
+def batch_rules(current_user):
+    return _batch_response(SavingsRule, current_user.id)
+
 @savings_bp.route('/calculate', methods=['GET'])
 @login_required
 def calculate_savings(current_user):
+    # Contributions as of the last rules run (after each import and Plaid
+    # sync, POST /calculate or `flask savings apply-rules`)
+    return _savings_summary(current_user)
+
+@savings_bp.route('/calculate', methods=['POST'])
+@login_required
+def apply_savings_rules(current_user):
+    from finance_tracker.utils.savings_engine import run_rules
+
+    # Apply active rules to transactions added since the last run
+    run_rules(current_user.id)
+    return _savings_summary(current_user)
+
+def _savings_summary(current_user):
+    from finance_tracker.utils.savings_engine import contribution_totals
+
     # Get user's monthly income and expenses
     monthly_data = current_user.get_monthly_data()
-    
-    # Get active savings rules
-    rules = SavingsRule.query.filter_by(user_id=current_user.id, is_active=True).all()
-    
-    total_savings = 0
-    for rule in rules:
-        if rule.type == 'round-up':
-            # Round up each transaction to nearest dollar
-            rounded_expenses = round(monthly_data['expenses'])
-            total_savings += rounded_expenses - monthly_data['expenses']
-        elif rule.type == 'percentage':
-            total_savings += (monthly_data['income'] * rule.percentage) / 100
-        elif rule.type == 'fixed':
-            total_savings += rule.amount
-    
+    by_rule = contribution_totals(current_user.id, monthly_data['month']) if monthly_data['month'] else {}
+
     return jsonify({
-        'total_savings': total_savings,
+        'total_savings': from_hundredths(sum(by_rule.values())),
+        'lifetime_savings': from_hundredths(sum(contribution_totals(current_user.id).values())),
+        'month': monthly_data['month'],
+        'by_rule': [{'rule_id': rule_id, 'amount': from_hundredths(cents)} for rule_id, cents in by_rule.items()],
         'monthly_income': monthly_data['income'],
         'monthly_expenses': monthly_data['expenses']
-    }) 
\ No newline at end of file
+    })
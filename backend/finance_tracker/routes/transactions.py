@@ -0,0 +1,44 @@
+from flask import Blueprint, jsonify, request
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.utils.auth import login_required
+from finance_tracker.utils.importer import import_transactions, detect_format, StatementImportError
+from finance_tracker.utils.recurring import detect_recurring
+import logging
+
+transactions_bp = Blueprint('transactions', __name__)
+
+@transactions_bp.route('', methods=['GET'])
+@login_required
+def get_transactions(current_user):
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    transactions = Transaction.recent_for_user(current_user.id, limit=limit)
+    return jsonify([transaction.to_dict() for transaction in transactions])
+
+@transactions_bp.route('/import', methods=['POST'])
+@login_required
+def upload_statement(current_user):
+    statement = request.files.get('file')
+    if not statement:
+        return jsonify({'error': 'Statement file is required'}), 400
+
+    try:
+        fmt = request.form.get('format') or detect_format(statement.filename)
+        result = import_transactions(current_user.id, statement.stream, fmt=fmt)
+    except (StatementImportError, KeyError) as e:
+        return jsonify({'error': f'Invalid statement: {e}'}), 400
+    except Exception as e:
+        logging.error(f"Statement import error: {str(e)}")
+        return jsonify({'error': 'Import failed'}), 500
+
+    if result['imported']:
+        from finance_tracker.utils.savings_engine import run_rules
+
+        # The import is committed; a failure here only delays the savings
+        # contributions or recurring series until the next run
+        for update in (run_rules, detect_recurring):
+            try:
+                update(current_user.id)
+            except Exception as e:
+                logging.error(f"{update.__name__} error after import: {str(e)}")
+
+    return jsonify(result), 201
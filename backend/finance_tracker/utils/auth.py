@@ -1,21 +1,79 @@
 from functools import wraps
-from flask import jsonify
+from flask import jsonify, g, has_app_context
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from finance_tracker.extensions import db, user_cache
 from finance_tracker.models.user import User
 
+# What request handlers read from the current user; anything else (the
+# password hash above all) is loaded from the database on first access
+_CACHED_COLUMNS = ('id', 'name', 'email', 'created_at')
+
+def load_user(user_id):
+    """Return the User for a JWT identity without a SELECT on warm paths.
+
+    Lookups are memoized on `g` for the rest of the request and the row's
+    _CACHED_COLUMNS are kept in the process-level user_cache for its TTL.
+    A cached row is attached to the session with merge(load=False), so
+    it behaves like a normally loaded instance.
+    """
+    user_id = int(user_id)
+    users = g.setdefault('_users', {})
+    if user_id in users:
+        return users[user_id]
+
+    columns = user_cache.get(user_id)
+    if columns is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            user_cache.set(user_id, {key: getattr(user, key) for key in _CACHED_COLUMNS})
+    else:
+        user = User(**columns)
+        make_transient_to_detached(user)
+        user = db.session.merge(user, load=False)
+
+    users[user_id] = user
+    return user
+
+def invalidate_user(user_id):
+    user_cache.delete(int(user_id))
+    if has_app_context():
+        g.pop('_users', None)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _user_changed(mapper, connection, target):
+    invalidate_user(target.id)
+    # Drop it again after commit in case a concurrent request re-cached
+    # the old row between this flush and the commit
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_users', set()).add(target.id)
+
+@event.listens_for(Session, 'after_commit')
+def _users_committed(session):
+    for user_id in session.info.pop('changed_users', ()):
+        user_cache.delete(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _users_rolled_back(session):
+    # The changes never happened; don't carry the ids into the next commit
+    session.info.pop('changed_users', None)
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         try:
             verify_jwt_in_request()
             current_user_id = get_jwt_identity()
-            current_user = User.query.get(current_user_id)
-            
+            current_user = load_user(current_user_id)
+
             if not current_user:
                 return jsonify({'error': 'User not found'}), 404
-                
+
             return f(current_user, *args, **kwargs)
         except Exception as e:
             return jsonify({'error': 'Authentication required'}), 401
-            
-    return decorated_function 
\ No newline at end of file
+
+    return decorated_function
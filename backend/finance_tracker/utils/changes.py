@@ -0,0 +1,50 @@
+"""Per-user change notifications.
+
+ORM writes to the models in TRACKED_MODELS are collected during flush and
+announced through `user_data_changed` only once the transaction commits, so
+subscribers (caches, version counters) never react to rolled-back work.
+Bulk Core statements bypass the ORM and must call mark_user_changed().
+"""
+from itertools import chain
+from blinker import Namespace
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from finance_tracker.models.plaid_item import PlaidItem
+from finance_tracker.models.savings import SavingsGoal, SavingsRule
+from finance_tracker.models.transaction import Transaction
+
+_signals = Namespace()
+
+# Sent with the user id as sender after a commit touched that user's data
+user_data_changed = _signals.signal('user-data-changed')
+
+TRACKED_MODELS = (SavingsGoal, SavingsRule, Transaction, PlaidItem)
+
+_PENDING = 'changed_user_ids'
+
+
+def mark_user_changed(session, user_id):
+    session.info.setdefault(_PENDING, set()).add(int(user_id))
+
+
+def pending_user_ids(session):
+    """Users whose data the session's current transaction has changed so far"""
+    return set(session.info.get(_PENDING, ()))
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, TRACKED_MODELS) and obj.user_id is not None:
+            mark_user_changed(session, obj.user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _announce_changes(session):
+    for user_id in session.info.pop(_PENDING, ()):
+        user_data_changed.send(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,235 @@
+"""Streaming exports of a user's transactions, savings goals and rules.
+
+An export is one SELECT of the model's API_FIELDS, read in batches with
+yield_per (the DBAPI cursor stays open and hands rows over a batch at a
+time) and encoded as each batch arrives, so a worker holds one batch,
+never the whole account, however large the account is.
+
+* CSV      - a header row, then RFC 4180 rows; amounts are exact decimal
+             strings ("-12.50") made from the stored cents
+* Parquet  - one row group per ROW_GROUP_ROWS rows, amounts as
+             decimal128 with two decimal places; needs pyarrow, which is
+             imported on the first Parquet export only
+
+``gzip=1`` gzips a CSV on the fly (a .csv.gz download) and switches
+Parquet's column compression from snappy to gzip.
+"""
+import csv
+import io
+import importlib.util
+import zlib
+from datetime import date
+from sqlalchemy import Boolean, Date, DateTime, Integer
+from finance_tracker.extensions import db
+from finance_tracker.models.savings import SavingsGoal, SavingsRule
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.utils.money import FixedPoint
+
+CSV_BATCH = 2000
+ROW_GROUP_ROWS = 20000
+GZIP_LEVEL = 6
+
+EXPORTS = {
+    'transactions': Transaction,
+    'goals': SavingsGoal,
+    'rules': SavingsRule,
+}
+FORMATS = ('csv', 'parquet')
+
+
+class ExportArgsError(ValueError):
+    """Invalid format/gzip query parameters."""
+
+
+def parquet_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def parse_export_args(args):
+    """(format, gzip) from an export's query string"""
+    fmt = args.get('format', 'csv').lower()
+    if fmt not in FORMATS:
+        raise ExportArgsError(f"format must be one of: {', '.join(FORMATS)}")
+    return fmt, args.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+
+def export_statement(model, user_id):
+    columns = [model.__table__.c[name] for name in model.API_FIELDS]
+    return db.select(*columns).where(model.user_id == user_id).order_by(model.id)
+
+
+def export_batches(model, user_id, batch_size):
+    """Yield lists of at most `batch_size` rows (tuples in API_FIELDS order)"""
+    result = db.session.execute(export_statement(model, user_id).execution_options(yield_per=batch_size))
+    try:
+        for batch in result.partitions():
+            yield batch
+    finally:
+        result.close()
+
+
+def download_name(kind, fmt, gzip, today=None):
+    suffix = '.gz' if gzip and fmt == 'csv' else ''
+    return f'finance-tracker-{kind}-{(today or date.today()).isoformat()}.{fmt}{suffix}'
+
+
+def mimetype(fmt, gzip):
+    if fmt == 'parquet':
+        return 'application/vnd.apache.parquet'
+    return 'application/gzip' if gzip else 'text/csv'
+
+
+# CSV
+
+def _hundredths_str(value):
+    """Cents / basis points as an exact two-place decimal string"""
+    if value is None:
+        return None
+    sign = '-' if value < 0 else ''
+    return f'{sign}{abs(value) // 100}.{abs(value) % 100:02d}'
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _bool(value):
+    return None if value is None else ('true' if value else 'false')
+
+
+def _csv_formatters(model):
+    """[(column index, formatter)] for the API_FIELDS that need one"""
+    columns = model.__table__.columns
+    formatters = []
+    for index, name in enumerate(model.API_FIELDS):
+        column_type = columns[name].type
+        if isinstance(column_type, FixedPoint):
+            formatters.append((index, _hundredths_str))
+        elif isinstance(column_type, (Date, DateTime)):
+            formatters.append((index, _iso))
+        elif isinstance(column_type, Boolean):
+            formatters.append((index, _bool))
+    return formatters
+
+
+def csv_chunks(model, batches):
+    """Yield the CSV text for `batches`, one string per batch after the header"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\r\n')
+    writer.writerow(model.API_FIELDS)
+    formatters = _csv_formatters(model)
+    for batch in batches:
+        for row in batch:
+            if formatters:
+                row = list(row)
+                for index, formatter in formatters:
+                    row[index] = formatter(row[index])
+            writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks, level=GZIP_LEVEL):
+    """Gzip a stream of str/bytes chunks, yielding compressed bytes as they fill"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode() if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# Parquet
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands back what's been written since the last drain()"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_schema(model):
+    import pyarrow as pa
+
+    columns = model.__table__.columns
+    fields = []
+    for name in model.API_FIELDS:
+        column = columns[name]
+        if isinstance(column.type, FixedPoint):
+            arrow_type = pa.decimal128(19, 2)
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp('us')
+        elif isinstance(column.type, Date):
+            arrow_type = pa.date32()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(name, arrow_type, nullable=column.nullable))
+    return pa.schema(fields)
+
+
+def _arrow_column(values, field):
+    import pyarrow as pa
+
+    if pa.types.is_decimal(field.type):
+        # Cents are already the decimal's unscaled integer: widen them to
+        # decimal128 at scale 0 and relabel the buffers with scale 2
+        unscaled = pa.array(values, pa.int64()).cast(pa.decimal128(field.type.precision, 0))
+        return pa.Array.from_buffers(field.type, len(unscaled), unscaled.buffers(),
+                                     null_count=unscaled.null_count)
+    return pa.array(values, field.type)
+
+
+def parquet_chunks(model, batches, gzip=False):
+    """Yield a Parquet file for `batches` (one row group each) as it's written"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema(model)
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema, compression='gzip' if gzip else 'snappy')
+    try:
+        for batch in batches:
+            columns = list(zip(*batch))
+            table = pa.Table.from_arrays(
+                [_arrow_column(values, field) for values, field in zip(columns, schema)], schema=schema)
+            writer.write_table(table, row_group_size=len(batch))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_chunks(kind, user_id, fmt, gzip):
+    """The response body of one export, chunk by chunk"""
+    model = EXPORTS[kind]
+    if fmt == 'parquet':
+        return parquet_chunks(model, export_batches(model, user_id, ROW_GROUP_ROWS), gzip=gzip)
+    chunks = csv_chunks(model, export_batches(model, user_id, CSV_BATCH))
+    return gzip_chunks(chunks) if gzip else chunks
+
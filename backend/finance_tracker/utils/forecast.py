@@ -0,0 +1,123 @@
+"""Monte Carlo completion forecasts for savings goals.
+
+A user's monthly net inflow (income - expenses from the rollups, last
+FORECAST_HISTORY_MONTHS completed months; the current month is still
+filling up and would drag the mean down) is modelled as normally distributed with
+the historical mean and standard deviation. simulate_paths() draws
+FORECAST_PATHS paths of FORECAST_HORIZON_MONTHS monthly inflows in one
+NumPy call. Inflow fills the user's unfinished goals one at a time,
+earliest deadline first (goals without a deadline last), so a goal is
+reached once cumulative inflow covers it and every goal ahead of it. The
+single-goal and all-goals endpoints therefore share one simulation.
+
+Because a running maximum of each cumulative path is monotonic, the month
+a goal is reached on a path is just the number of months it stays below
+the goal's threshold, so every goal is answered from the same paths.
+"""
+import calendar
+from datetime import date
+import numpy as np
+from finance_tracker.utils.money import from_hundredths
+from finance_tracker.utils.rollups import month_key, monthly_totals
+
+PERCENTILES = (10, 50, 90)
+
+
+def add_months(day, months):
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def months_until(today, deadline):
+    """Whole months of contributions that land on or before `deadline`"""
+    months = (deadline.year - today.year) * 12 + deadline.month - today.month
+    if deadline.day < today.day:
+        months -= 1
+    return max(months, 0)
+
+
+def inflow_stats(user_id, history_months=12, today=None):
+    """(mean, std, months of history) of monthly net inflow over completed months, in dollars"""
+    totals = monthly_totals(user_id, history_months, before=month_key(today or date.today()))
+    if not totals:
+        return 0.0, 0.0, 0
+    nets = np.array([income - expenses for _, income, expenses in totals], dtype=np.int64)
+    # One month of history says nothing about spread; assume a wide one
+    std = float(nets.std(ddof=1)) if len(nets) > 1 else abs(float(nets[0])) * 0.25
+    return float(nets.mean()) / 100, std / 100, len(nets)
+
+
+def simulate_paths(mean, std, paths, horizon, seed=None):
+    """(paths, horizon) running maximum of cumulative inflow"""
+    rng = np.random.default_rng(seed)
+    inflows = rng.standard_normal((paths, horizon), dtype=np.float32)
+    inflows *= np.float32(std)
+    inflows += np.float32(mean)
+    cumulative = np.cumsum(inflows, axis=1, out=inflows)
+    return np.maximum.accumulate(cumulative, axis=1, out=cumulative)
+
+
+def funding_order(goals):
+    return sorted(goals, key=lambda g: (g.deadline is None, g.deadline or 0, g.id))
+
+
+def forecast_goals(goals, mean, std, today=None, paths=5000, horizon=120, seed=None):
+    """Forecast a user's goals together.
+
+    `goals` is a list of objects with id, target_amount, current_amount (in
+    cents) and deadline; `mean` and `std` are in dollars. Returns
+    {goal_id: forecast dict}.
+    """
+    today = today or date.today()
+    ordered = funding_order(goals)
+    remaining = np.array([max(g.target_amount - (g.current_amount or 0), 0) for g in ordered], dtype=np.int64)
+    # Paths are simulated in dollars
+    thresholds = np.cumsum(remaining) / 100
+    best = simulate_paths(mean, std, paths, horizon, seed) if thresholds[-1] > 0 else None
+
+    results = {}
+    for position, (goal, needed, threshold) in enumerate(zip(ordered, remaining, thresholds)):
+        deadline = goal.deadline.date() if goal.deadline else None
+        if needed <= 0:
+            results[goal.id] = _forecast(goal, needed, deadline, position, 1.0, {p: today for p in PERCENTILES})
+            continue
+
+        months_needed = (best < np.float32(threshold)).sum(axis=1) + 1  # horizon + 1 = never
+        if deadline is not None:
+            probability = float((months_needed <= months_until(today, deadline)).mean())
+        else:
+            probability = float((months_needed <= horizon).mean())
+        dates = {}
+        for pct, months in zip(PERCENTILES, np.percentile(months_needed, PERCENTILES, method='higher')):
+            dates[pct] = add_months(today, int(months)) if months <= horizon else None
+        results[goal.id] = _forecast(goal, needed, deadline, position, probability, dates)
+    return results
+
+
+def _forecast(goal, needed, deadline, position, probability, dates):
+    return {
+        'goal_id': goal.id,
+        'remaining_amount': from_hundredths(int(needed)),
+        'deadline': deadline.isoformat() if deadline else None,
+        'funding_position': position + 1,
+        'completion_probability': round(probability, 4),
+        'completion_dates': {
+            f'p{pct}': day.isoformat() if day else None for pct, day in dates.items()
+        },
+    }
+
+
+def forecast_for_user(user_id, goals, config, today=None):
+    """Forecasts plus the inflow model they were drawn from"""
+    mean, std, history = inflow_stats(user_id, config.get('FORECAST_HISTORY_MONTHS', 12), today)
+    forecasts = forecast_goals(
+        goals, mean, std, today=today,
+        paths=config.get('FORECAST_PATHS', 5000),
+        horizon=config.get('FORECAST_HORIZON_MONTHS', 120),
+        seed=user_id,  # stable answers between requests
+    ) if goals else {}
+    return {
+        'monthly_inflow': {'mean': round(mean, 2), 'std': round(std, 2), 'history_months': history},
+        'forecasts': forecasts,
+    }
@@ -0,0 +1,128 @@
+"""Financial health scoring.
+
+The scalar path here serves /api/insights. utils/health_batch.py computes
+the same components with NumPy for many users at once and reuses the
+insight builders below, so both paths produce identical output.
+
+Payload amounts are in dollars. They are converted to integer cents first,
+so differences such as income - expenses are exact and each ratio is a
+single division.
+"""
+from finance_tracker.utils.money import Money
+
+def savings_insight(savings_rate):
+    return {
+        "type": "savings",
+        "title": "Improve Your Savings Rate",
+        "description": f"Your current savings rate is {savings_rate:.1f}%. Aim for at least 20%.",
+        "severity": "high" if savings_rate < 10 else "medium",
+        "recommendation": "Consider automating your savings and reviewing non-essential expenses."
+    }
+
+
+def category_insight(category, percentage):
+    return {
+        "type": "budget",
+        "title": f"High Spending in {category}",
+        "description": f"Spending in {category} is {percentage}% of your budget.",
+        "severity": "high" if percentage > 40 else "medium",
+        "recommendation": f"Try to reduce {category} expenses to below 30% of your budget."
+    }
+
+
+def health_status(total_score):
+    return "Excellent" if total_score >= 80 else "Good" if total_score >= 60 else "Fair" if total_score >= 40 else "Needs Improvement"
+
+
+def health_insight(total_score):
+    return {
+        "type": "health",
+        "title": "Financial Health Status",
+        "description": f"Your financial health score is {total_score}/100 - {health_status(total_score)}",
+        "severity": "low" if total_score >= 60 else "medium" if total_score >= 40 else "high",
+        "recommendation": "Focus on building emergency savings and maintaining a balanced budget."
+    }
+
+
+def spending_increase_insight(expense_change):
+    return {
+        "type": "budget",
+        "title": "Spending Increase Alert",
+        "description": f"Your monthly expenses increased by {expense_change:.1f}%",
+        "severity": "high" if expense_change > 20 else "medium",
+        "recommendation": "Review your recent expenses and identify areas for reduction."
+    }
+
+
+def analyze_financial_health(data):
+    """Score financial health (0-100) and build insights from a dashboard payload.
+
+    The score is the sum of four rule-based components: savings rate (30),
+    expense ratio (30), category balance (20) and month-over-month income
+    trend (20). Insights flag a savings rate under 20%, categories over 30%
+    of spending and expenses up more than 10% on the previous month. The
+    same payload always gives the same result.
+    """
+
+    # Calculate financial health score (0-100)
+    monthly_data = data['monthlyData']
+    monthly_trend = data['monthlyTrend']
+    categories = data['categoryDistribution']
+
+    # Component 1: Savings Rate (0-30 points)
+    income = Money.parse(monthly_data['income'])
+    expenses = Money.parse(monthly_data['expenses'])
+    savings_rate = ((income - expenses) / income * 100) if income > 0 else 0
+    savings_score = min(30, (savings_rate / 20) * 30)  # 20% savings rate = full score
+
+    # Component 2: Expense Management (0-30 points)
+    expense_ratio = expenses / income if income > 0 else 1
+    expense_score = max(0, 30 * (1 - expense_ratio))
+
+    # Component 3: Category Balance (0-20 points)
+    category_score = 20
+    for category in categories:
+        if category['percentage'] > 40:  # Penalize if any category is over 40%
+            category_score -= 5
+    category_score = max(0, category_score)
+
+    # Component 4: Income Trend (0-20 points)
+    if len(monthly_trend) >= 2:
+        latest_income = Money.parse(monthly_trend[-1]['income'])
+        previous_income = Money.parse(monthly_trend[-2]['income'])
+        income_growth = ((latest_income - previous_income) / previous_income * 100) if previous_income > 0 else 0
+        trend_score = min(20, max(0, 10 + (income_growth / 10) * 10))
+    else:
+        trend_score = 10
+
+    # Calculate total score
+    total_score = round(savings_score + expense_score + category_score + trend_score)
+
+    # Generate insights and recommendations
+    insights = []
+
+    # Savings insights
+    if savings_rate < 20:
+        insights.append(savings_insight(savings_rate))
+
+    # Budget adherence
+    for category in categories:
+        if category['percentage'] > 30:
+            insights.append(category_insight(category['category'], category['percentage']))
+
+    # Financial health status
+    insights.append(health_insight(total_score))
+
+    # Monthly comparison
+    if len(monthly_trend) >= 2:
+        latest_expenses = Money.parse(monthly_trend[-1]['expenses'])
+        previous_expenses = Money.parse(monthly_trend[-2]['expenses'])
+        expense_change = ((latest_expenses - previous_expenses) / previous_expenses * 100) if previous_expenses > 0 else 0
+
+        if expense_change > 10:
+            insights.append(spending_increase_insight(expense_change))
+
+    return {
+        "score": total_score,
+        "insights": insights
+    }
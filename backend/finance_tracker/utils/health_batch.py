@@ -0,0 +1,204 @@
+"""Vectorized financial health scoring for many users at once.
+
+analyze_financial_health_batch() evaluates exactly the same formulas as
+utils.health.analyze_financial_health, in the same operation order, over
+columnar arrays. Amounts are int64 cents, as in the scalar path, so every
+difference is exact and each ratio is one float64 division, which rounds
+the same way as Python's int / int. has_trend marks users with two months
+of history, and category rows are NaN-padded to a common width.
+"""
+import numpy as np
+from sqlalchemy import text
+from finance_tracker.extensions import db
+from finance_tracker.utils.health import (
+    savings_insight, category_insight, health_insight, spending_increase_insight
+)
+from finance_tracker.utils.money import Money
+
+HEALTH_STATUSES = np.array(['Needs Improvement', 'Fair', 'Good', 'Excellent'])
+AMOUNT_COLUMNS = ('income', 'expenses', 'latest_income', 'previous_income', 'latest_expenses', 'previous_expenses')
+
+
+def analyze_financial_health_batch(income, expenses, category_shares,
+                                   latest_income, previous_income,
+                                   latest_expenses, previous_expenses, has_trend):
+    """Score N users in one pass.
+
+    Amount arguments are length-N arrays of cents (the trend ones are
+    ignored where has_trend is False) and category_shares is an (N, K)
+    array of category percentages. Returns a dict of length-N arrays
+    (category masks are (N, K)).
+    """
+    income = np.asarray(income, dtype=np.int64)
+    expenses = np.asarray(expenses, dtype=np.int64)
+    shares = np.asarray(category_shares, dtype=np.float64)
+    # Explicit width: reshape(0, -1) is ambiguous when there are no users
+    shares = shares.reshape(len(income), shares.size // len(income) if len(income) else 0)
+    latest_income = np.asarray(latest_income, dtype=np.int64)
+    previous_income = np.asarray(previous_income, dtype=np.int64)
+    latest_expenses = np.asarray(latest_expenses, dtype=np.int64)
+    previous_expenses = np.asarray(previous_expenses, dtype=np.int64)
+    has_trend = np.asarray(has_trend, dtype=bool)
+
+    # NaN comparisons are False, so padding never trips a threshold
+    with np.errstate(divide='ignore', invalid='ignore'):
+        has_income = income > 0
+
+        # Component 1: Savings Rate (0-30 points)
+        savings_rate = np.where(has_income, (income - expenses) / income * 100, 0.0)
+        savings_score = np.minimum(30, (savings_rate / 20) * 30)
+
+        # Component 2: Expense Management (0-30 points)
+        expense_ratio = np.where(has_income, expenses / income, 1.0)
+        expense_score = np.maximum(0, 30 * (1 - expense_ratio))
+
+        # Component 3: Category Balance (0-20 points)
+        category_score = np.maximum(0, 20 - 5 * np.count_nonzero(shares > 40, axis=1))
+
+        # Component 4: Income Trend (0-20 points)
+        income_growth = np.where(previous_income > 0, (latest_income - previous_income) / previous_income * 100, 0.0)
+        trend_score = np.where(has_trend, np.minimum(20, np.maximum(0, 10 + (income_growth / 10) * 10)), 10.0)
+
+        # np.rint rounds half to even, like round()
+        total_score = np.rint(savings_score + expense_score + category_score + trend_score).astype(np.int64)
+
+        expense_change = np.where(previous_expenses > 0, (latest_expenses - previous_expenses) / previous_expenses * 100, 0.0)
+
+    return {
+        'score': total_score,
+        'savings_score': savings_score,
+        'expense_score': expense_score,
+        'category_score': category_score,
+        'trend_score': trend_score,
+        'savings_rate': savings_rate,
+        'expense_change': expense_change,
+        'health_status': HEALTH_STATUSES[np.searchsorted([40, 60, 80], total_score, side='right')],
+        # Insight triggers
+        'savings_alert': savings_rate < 20,
+        'high_spending': shares > 30,
+        'spending_increase_alert': has_trend & (expense_change > 10),
+        'category_shares': shares,
+    }
+
+
+def batch_insights(result, index, category_names):
+    """Materialize the analyze_financial_health() response for one row."""
+    insights = []
+    savings_rate = result['savings_rate'][index].item()
+    if result['savings_alert'][index]:
+        insights.append(savings_insight(savings_rate))
+    for j in np.flatnonzero(result['high_spending'][index]):
+        insights.append(category_insight(category_names[j], result['category_shares'][index, j].item()))
+    total_score = result['score'][index].item()
+    insights.append(health_insight(total_score))
+    if result['spending_increase_alert'][index]:
+        insights.append(spending_increase_insight(result['expense_change'][index].item()))
+    return {"score": total_score, "insights": insights}
+
+
+def columns_from_payloads(payloads):
+    """Convert /api/insights request bodies into batch columns.
+
+    Returns (columns, category_names) where category_names[i] lists the
+    category labels for row i in column order.
+    """
+    n = len(payloads)
+    width = max((len(p['categoryDistribution']) for p in payloads), default=0)
+    columns = {name: np.zeros(n, dtype=np.int64) for name in AMOUNT_COLUMNS}
+    columns['has_trend'] = np.zeros(n, dtype=bool)
+    columns['category_shares'] = np.full((n, width), np.nan)
+    category_names = []
+    for i, payload in enumerate(payloads):
+        columns['income'][i] = Money.parse(payload['monthlyData']['income'])
+        columns['expenses'][i] = Money.parse(payload['monthlyData']['expenses'])
+        categories = payload['categoryDistribution']
+        columns['category_shares'][i, :len(categories)] = [c['percentage'] for c in categories]
+        category_names.append([c['category'] for c in categories])
+        trend = payload['monthlyTrend']
+        if len(trend) >= 2:
+            columns['has_trend'][i] = True
+            columns['latest_income'][i] = Money.parse(trend[-1]['income'])
+            columns['previous_income'][i] = Money.parse(trend[-2]['income'])
+            columns['latest_expenses'][i] = Money.parse(trend[-1]['expenses'])
+            columns['previous_expenses'][i] = Money.parse(trend[-2]['expenses'])
+    return columns, category_names
+
+
+def columns_from_rollups():
+    """Build batch columns for every user from the monthly rollup table.
+
+    Two grouped scans of monthly_category_rollups; the ledger is never read.
+    Returns (user_ids, columns, category_names).
+    """
+    months = db.session.execute(text("""
+        SELECT user_id, month, income, expenses, rn FROM (
+            SELECT user_id, month, SUM(income) AS income, SUM(expenses) AS expenses,
+                   ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY month DESC) AS rn
+            FROM monthly_category_rollups
+            GROUP BY user_id, month
+        ) WHERE rn <= 2
+        ORDER BY user_id
+    """)).all()
+
+    user_ids = np.array(sorted({row.user_id for row in months}), dtype=np.int64)
+    n = len(user_ids)
+    columns = {name: np.zeros(n, dtype=np.int64) for name in AMOUNT_COLUMNS}
+    # A single month of history is not a trend
+    columns['has_trend'] = np.zeros(n, dtype=bool)
+    for row in months:
+        i = np.searchsorted(user_ids, row.user_id)
+        if row.rn == 1:
+            columns['income'][i] = columns['latest_income'][i] = row.income
+            columns['expenses'][i] = columns['latest_expenses'][i] = row.expenses
+        else:
+            columns['has_trend'][i] = True
+            columns['previous_income'][i] = row.income
+            columns['previous_expenses'][i] = row.expenses
+
+    category_rows = db.session.execute(text("""
+        SELECT r.user_id, r.month, r.category, r.expenses
+        FROM monthly_category_rollups r
+        WHERE r.expenses > 0
+          AND r.month = (SELECT MAX(month) FROM monthly_category_rollups m WHERE m.user_id = r.user_id)
+        ORDER BY r.user_id, r.expenses DESC
+    """)).all()
+    per_user = {}
+    for row in category_rows:
+        per_user.setdefault(row.user_id, []).append((row.category, row.expenses))
+
+    width = max((len(v) for v in per_user.values()), default=0)
+    columns['category_shares'] = np.full((n, width), np.nan)
+    category_names = [[] for _ in range(n)]
+    for user_id, categories in per_user.items():
+        i = np.searchsorted(user_ids, user_id)
+        total = sum(expenses for _, expenses in categories)
+        columns['category_shares'][i, :len(categories)] = [round(e / total * 100, 1) for _, e in categories]
+        category_names[i] = [c for c, _ in categories]
+
+    return user_ids, columns, category_names
+
+
+def random_payloads(n, seed=None):
+    """Random /api/insights bodies covering the scoring edge cases."""
+    rng = np.random.default_rng(seed)
+    payloads = []
+    for _ in range(n):
+        income = float(rng.choice([0.0, round(rng.uniform(0, 20000), 2), float(rng.integers(0, 5000))]))
+        expenses = round(float(rng.uniform(0, 25000)), 2)
+        k = int(rng.integers(0, 8))
+        shares = rng.dirichlet(np.ones(k)) * 100 if k else []
+        trend = [
+            {'month': f'2024-{m + 1:02d}',
+             'income': float(rng.choice([0.0, round(rng.uniform(0, 20000), 2)])),
+             'expenses': float(rng.choice([0.0, round(rng.uniform(0, 20000), 2)]))}
+            for m in range(int(rng.integers(0, 4)))
+        ]
+        payloads.append({
+            'monthlyData': {'income': income, 'expenses': expenses, 'balance': income - expenses},
+            'categoryDistribution': [
+                {'category': f'cat{j}', 'value': 0.0, 'percentage': round(float(s), 1)}
+                for j, s in enumerate(shares)
+            ],
+            'monthlyTrend': trend,
+        })
+    return payloads
@@ -0,0 +1,214 @@
+import csv
+import io
+import re
+from datetime import date, datetime
+from itertools import islice
+from finance_tracker.extensions import db
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.utils.money import Money
+from finance_tracker.utils.rollups import accumulate, apply_deltas
+from finance_tracker.utils.changes import mark_user_changed
+
+# Rows are parsed lazily and written in fixed-size chunks, so memory stays
+# bounded by CHUNK_SIZE no matter how large the statement file is.
+CHUNK_SIZE = 5000
+
+CSV_COLUMN_ALIASES = {
+    'date': ('date', 'transaction date', 'posted date', 'posting date', 'posted'),
+    'amount': ('amount', 'transaction amount'),
+    'debit': ('debit', 'withdrawal', 'withdrawals'),
+    'credit': ('credit', 'deposit', 'deposits'),
+    'description': ('description', 'name', 'memo', 'details', 'narration'),
+    'merchant': ('merchant', 'payee', 'merchant name'),
+    'category': ('category',),
+    'external_id': ('id', 'transaction id', 'reference', 'fitid'),
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d', '%d-%m-%Y')
+
+OFX_TAG = re.compile(r'<(/?)(\w+)>([^<\r\n]*)')
+
+
+class StatementImportError(ValueError):
+    """Raised when a statement file cannot be parsed."""
+
+
+def parse_date(value):
+    value = value.strip()
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    # OFX dates look like 20230515120000[-5:EST]; only the day matters here
+    if len(value) >= 8 and value[:8].isdigit():
+        return datetime.strptime(value[:8], '%Y%m%d').date()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise StatementImportError(f'Unrecognized date: {value!r}')
+
+
+def parse_amount(value):
+    """Cents from a statement amount, read as an exact decimal"""
+    value = value.strip().replace(',', '').replace('$', '')
+    if value.startswith('(') and value.endswith(')'):
+        value = '-' + value[1:-1]
+    return Money.parse(value) if value else Money(0)
+
+
+def _resolve_columns(fieldnames):
+    normalized = {name.strip().lower(): name for name in fieldnames if name}
+    columns = {}
+    for key, aliases in CSV_COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[key] = normalized[alias]
+                break
+    if 'date' not in columns:
+        raise StatementImportError('CSV is missing a date column')
+    if 'amount' not in columns and 'debit' not in columns and 'credit' not in columns:
+        raise StatementImportError('CSV is missing an amount column')
+    return columns
+
+
+def iter_csv_rows(stream):
+    """Yield normalized transaction dicts from a CSV text stream."""
+    reader = csv.DictReader(stream)
+    columns = _resolve_columns(reader.fieldnames or [])
+
+    for line_no, record in enumerate(reader, start=2):
+        try:
+            if 'amount' in columns:
+                amount = parse_amount(record[columns['amount']] or '')
+            else:
+                amount = (parse_amount(record.get(columns.get('credit'), '') or '')
+                          - parse_amount(record.get(columns.get('debit'), '') or ''))
+            row = {
+                'date': parse_date(record[columns['date']] or ''),
+                'amount': amount,
+            }
+        except (ValueError, TypeError) as e:
+            raise StatementImportError(f'Line {line_no}: {e}')
+
+        for key in ('description', 'merchant', 'category', 'external_id'):
+            value = record.get(columns[key]) if key in columns else None
+            row[key] = (value.strip() or None) if value else None
+        yield row
+
+
+def iter_ofx_rows(stream):
+    """Yield normalized transaction dicts from an OFX (SGML or XML) text stream."""
+    current = None
+    for line in stream:
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if not closing:
+                    current = {}
+                elif current is not None:
+                    yield _ofx_row(current)
+                    current = None
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+
+
+def _ofx_row(fields):
+    try:
+        return {
+            'date': parse_date(fields['DTPOSTED']),
+            'amount': parse_amount(fields['TRNAMT']),
+            'description': fields.get('MEMO') or fields.get('NAME'),
+            'merchant': fields.get('NAME') or fields.get('PAYEE'),
+            'category': None,
+            'external_id': fields.get('FITID'),
+        }
+    except KeyError as e:
+        raise StatementImportError(f'OFX transaction is missing {e.args[0]}')
+    except ValueError as e:
+        raise StatementImportError(str(e))
+
+
+PARSERS = {
+    'csv': iter_csv_rows,
+    'ofx': iter_ofx_rows,
+    'qfx': iter_ofx_rows,
+}
+
+
+def detect_format(filename):
+    ext = filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+    if ext not in PARSERS:
+        raise StatementImportError(f'Unsupported statement format: {ext or filename!r}')
+    return ext
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def existing_ids_statement(user_id, external_ids):
+    return db.select(Transaction.external_id).where(
+        Transaction.user_id == user_id,
+        Transaction.external_id.in_(external_ids)
+    )
+
+
+def _existing_external_ids(user_id, external_ids):
+    if not external_ids:
+        return set()
+    rows = db.session.execute(existing_ids_statement(user_id, external_ids))
+    return {row[0] for row in rows}
+
+
+def import_transactions(user_id, stream, fmt='csv', chunk_size=CHUNK_SIZE):
+    """Stream-parse a statement and bulk insert it for a user.
+
+    Each chunk is written with a single executemany INSERT and folded into
+    the monthly rollups with one upsert. Rows whose external_id was already
+    imported are skipped. The whole import runs in one database transaction
+    and is rolled back on any parse error.
+    """
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    parser = PARSERS[fmt]
+    insert = Transaction.__table__.insert()
+    imported = skipped = 0
+    now = datetime.utcnow()
+
+    try:
+        for chunk in chunked(parser(stream), chunk_size):
+            seen = _existing_external_ids(
+                user_id, [row['external_id'] for row in chunk if row['external_id']]
+            )
+            rows = []
+            for row in chunk:
+                external_id = row['external_id']
+                if external_id:
+                    if external_id in seen:
+                        skipped += 1
+                        continue
+                    seen.add(external_id)
+                row['user_id'] = user_id
+                row['created_at'] = now
+                rows.append(row)
+
+            if rows:
+                db.session.execute(insert, rows)
+                apply_deltas(db.session, accumulate(rows))
+                imported += len(rows)
+        if imported:
+            mark_user_changed(db.session, user_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return {'imported': imported, 'skipped': skipped}
@@ -0,0 +1,102 @@
+"""Keyset-paginated, column-projected list responses.
+
+List endpoints accept:
+
+* ``fields=a,b,c`` - only these columns are selected and returned
+* ``limit=N``      - at most N rows (1..MAX_LIMIT); the id to pass as
+                     ``after`` for the next page comes back in the
+                     X-Next-Cursor header and a ``Link: rel="next"`` header
+* ``after=ID``     - rows with id > ID (keyset on the primary key, so pages
+                     stay stable while rows are added or deleted)
+* ``stream=1``     - the JSON array is written out while rows are fetched
+                     in batches of STREAM_BATCH, so memory stays flat
+
+Without any of them the response is the same full JSON array as before.
+"""
+from urllib.parse import urlencode
+from flask import Response, current_app, jsonify, request, stream_with_context
+from finance_tracker.extensions import db
+from finance_tracker.utils.serializers import serialize_rows
+
+MAX_LIMIT = 1000
+STREAM_BATCH = 500
+
+
+class ListArgsError(ValueError):
+    """Invalid fields/limit/after/stream query parameters."""
+
+
+def parse_list_args(allowed_fields):
+    args = request.args
+    fields = list(allowed_fields)
+    if args.get('fields'):
+        fields = [name.strip() for name in args['fields'].split(',') if name.strip()]
+        unknown = [name for name in fields if name not in allowed_fields]
+        if unknown or not fields:
+            raise ListArgsError(f"Unknown fields: {', '.join(unknown) or '(none)'}; "
+                                f"choose from {', '.join(allowed_fields)}")
+
+    limit = args.get('limit', type=int)
+    if 'limit' in args and (limit is None or not 1 <= limit <= MAX_LIMIT):
+        raise ListArgsError(f'limit must be an integer between 1 and {MAX_LIMIT}')
+    after = args.get('after', type=int)
+    if 'after' in args and (after is None or after < 0):
+        raise ListArgsError('after must be a non-negative id')
+    stream = args.get('stream', '').lower() in ('1', 'true', 'yes')
+    return fields, limit, after, stream
+
+
+def list_statements(model, user_id, fields, limit=None, after=None):
+    """(page statement, cursor probe statement or None) for one list request"""
+    columns = [getattr(model, name) for name in fields]
+    conditions = [model.user_id == user_id]
+    if after is not None:
+        conditions.append(model.id > after)
+    stmt = db.select(*columns).where(*conditions).order_by(model.id)
+    if limit is None:
+        return stmt, None
+    # Index-only probe for the page's last id and whether anything follows,
+    # so the cursor is known before any row is sent, even when streaming
+    probe = db.select(model.id).where(*conditions).order_by(model.id).offset(limit - 1).limit(2)
+    return stmt.limit(limit), probe
+
+
+def list_response(model, user_id, allowed_fields):
+    """Respond with the user's `model` rows according to the list query parameters"""
+    try:
+        fields, limit, after, stream = parse_list_args(allowed_fields)
+    except ListArgsError as e:
+        return jsonify({'error': str(e)}), 400
+
+    stmt, probe_stmt = list_statements(model, user_id, fields, limit, after)
+
+    headers = {}
+    if probe_stmt is not None:
+        probe = db.session.scalars(probe_stmt).all()
+        if len(probe) == 2:
+            next_args = request.args.to_dict()
+            next_args['after'] = probe[0]
+            headers['X-Next-Cursor'] = str(probe[0])
+            headers['Link'] = f'<{request.base_url}?{urlencode(next_args)}>; rel="next"'
+
+    if not stream:
+        rows = db.session.execute(stmt)
+        response = jsonify(list(serialize_rows(model, rows, fields)))
+        response.headers.update(headers)
+        return response
+
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield '['
+        first = True
+        result = db.session.execute(stmt.execution_options(yield_per=STREAM_BATCH))
+        for batch in result.partitions():
+            # Encode the batch as one array and drop its brackets; same compact
+            # separators jsonify uses outside debug mode
+            chunk = dumps(list(serialize_rows(model, batch, fields)), separators=(',', ':'))[1:-1]
+            yield chunk if first else ',' + chunk
+            first = False
+        yield ']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json', headers=headers)
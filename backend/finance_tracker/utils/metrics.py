@@ -0,0 +1,270 @@
+"""Per-route request and SQL metrics, exposed at /metrics.
+
+RequestMetrics hooks into the app and its SQLAlchemy engine:
+
+* every request records its latency and the number and total time of the
+  SQL statements it ran, under its URL rule (``/api/savings/goals/<int:goal_id>``,
+  never the raw path) and method; a streamed response (list ``stream=1``,
+  exports) is recorded when its body has been sent, so both cover the
+  statements run while the body was generated
+* statements slower than METRICS_SLOW_QUERY_MS and requests slower than
+  METRICS_SLOW_REQUEST_MS are logged as warnings
+* /metrics serves everything in the Prometheus text format, together with
+  the cache and Plaid gateway counters, to requests that send METRICS_TOKEN
+  as a bearer token; without a METRICS_TOKEN it answers 404
+
+Histograms have fixed buckets and the number of label sets is capped at
+METRICS_MAX_SERIES (anything beyond it is folded into endpoint="other"),
+so memory stays flat however much traffic there is. Metrics are kept per
+process; METRICS_ENABLED=false leaves the app uninstrumented.
+"""
+import bisect
+import hmac
+import logging
+import threading
+import time
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Fixed-bucket histogram: counts[i] is the number of observations <= bounds[i]."""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """[(le label, cumulative count), ...] ending with +Inf"""
+        total, result = 0, []
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            result.append(('+Inf' if bound == float('inf') else repr(float(bound)), total))
+        return result
+
+
+class RouteSeries:
+    __slots__ = ('latency', 'statements', 'sql_seconds', 'statuses')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.sql_seconds = 0.0
+        self.statuses = {}
+
+
+def _label(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+class RequestMetrics:
+    """Thread-safe, bounded per-route latency and SQL statistics."""
+
+    def __init__(self, slow_query_ms=100, slow_request_ms=1000, max_series=500):
+        self.slow_query = slow_query_ms / 1000
+        self.slow_request = slow_request_ms / 1000
+        self.max_series = max_series
+        self.token = None
+        self.sources = {}
+        self._lock = threading.Lock()
+        self.reset()
+
+    def init_app(self, app, sources=None):
+        self.slow_query = app.config.get('METRICS_SLOW_QUERY_MS', self.slow_query * 1000) / 1000
+        self.slow_request = app.config.get('METRICS_SLOW_REQUEST_MS', self.slow_request * 1000) / 1000
+        self.max_series = app.config.get('METRICS_MAX_SERIES', self.max_series)
+        self.token = app.config.get('METRICS_TOKEN')
+        if not self.token:
+            logging.info('METRICS_TOKEN is not set; /metrics is disabled')
+        self.sources = sources or {}
+        self.reset()
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view, methods=['GET'])
+
+    def instrument_engine(self, engine):
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def reset(self):
+        with self._lock:
+            self.routes = {}  # (endpoint, method) -> RouteSeries
+            self.background_statements = 0
+            self.background_sql_seconds = 0.0
+            self.slow_queries = 0
+            self.slow_requests = 0
+
+    # SQLAlchemy engine events
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        if has_request_context():
+            sql = g.get('_metrics_sql')
+            if sql is not None:
+                sql[0] += 1
+                sql[1] += elapsed
+        else:
+            with self._lock:
+                self.background_statements += 1
+                self.background_sql_seconds += elapsed
+        if elapsed >= self.slow_query:
+            with self._lock:
+                self.slow_queries += 1
+            where = f'{request.method} {request.path}' if has_request_context() else 'background'
+            logging.warning(f"Slow query ({elapsed * 1000:.1f} ms, {where}): {' '.join(statement.split())[:500]}")
+
+    # Request hooks
+
+    def _start_request(self):
+        g._metrics_started = time.perf_counter()
+        g._metrics_sql = [0, 0.0]
+
+    def _finish_request(self, response):
+        record = self._take(response.status_code)
+        if record is None:
+            return response
+        if response.is_streamed:
+            # The body is generated after this hook, inside the request context
+            # (stream_with_context), so its SQL still lands in g._metrics_sql;
+            # record once the server has sent it and closed the response
+            g._metrics_streaming = record
+            response.call_on_close(record)
+        else:
+            record()
+        return response
+
+    def _teardown_request(self, exc):
+        if exc is None:
+            return
+        streaming = g.pop('_metrics_streaming', None)
+        if streaming is not None:
+            # The streamed body failed part way; the status already sent is moot
+            streaming.status = 500
+            return
+        # Unhandled exceptions skip after_request
+        record = self._take(500)
+        if record is not None:
+            record()
+
+    def _take(self, status):
+        """A callable that records the current request, or None if it's already taken"""
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return None
+        sql = g.get('_metrics_sql') or [0, 0.0]
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        method, path = request.method, request.path
+
+        def record():
+            self._record(endpoint, method, path, time.perf_counter() - started, sql[0], sql[1], record.status)
+        record.status = status
+        return record
+
+    def _record(self, endpoint, method, path, elapsed, statements, sql_seconds, status):
+        key = (endpoint, method)
+
+        with self._lock:
+            series = self.routes.get(key)
+            if series is None:
+                if len(self.routes) >= self.max_series:
+                    key = ('other', method)
+                    series = self.routes.get(key)
+                if series is None:
+                    series = self.routes[key] = RouteSeries()
+            series.latency.observe(elapsed)
+            series.statements.observe(statements)
+            series.sql_seconds += sql_seconds
+            series.statuses[status] = series.statuses.get(status, 0) + 1
+            if elapsed >= self.slow_request:
+                self.slow_requests += 1
+
+        if elapsed >= self.slow_request:
+            logging.warning(f"Slow request ({elapsed * 1000:.1f} ms, {statements} SQL statements, "
+                            f"{sql_seconds * 1000:.1f} ms in SQL): {method} {path}")
+
+    # Exposition
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            routes = sorted(self.routes.items())
+            lines = []
+
+            def header(name, kind, help_text):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+
+            def histogram(name, help_text, pick):
+                header(name, 'histogram', help_text)
+                for (endpoint, method), series in routes:
+                    labels = f'endpoint="{_label(endpoint)}",method="{method}"'
+                    hist = pick(series)
+                    for le, count in hist.cumulative():
+                        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                    lines.append(f'{name}_sum{{{labels}}} {hist.sum!r}')
+                    lines.append(f'{name}_count{{{labels}}} {hist.count}')
+
+            header('http_requests_total', 'counter', 'Requests handled, by route and status.')
+            for (endpoint, method), series in routes:
+                for status, count in sorted(series.statuses.items()):
+                    lines.append(f'http_requests_total{{endpoint="{_label(endpoint)}",method="{method}",'
+                                 f'status="{status}"}} {count}')
+            histogram('http_request_duration_seconds', 'Request latency by route.', lambda s: s.latency)
+            histogram('http_request_sql_statements', 'SQL statements executed per request.',
+                      lambda s: s.statements)
+            header('http_request_sql_seconds_total', 'counter', 'Time spent in SQL by route.')
+            for (endpoint, method), series in routes:
+                lines.append(f'http_request_sql_seconds_total{{endpoint="{_label(endpoint)}",method="{method}"}} '
+                             f'{series.sql_seconds!r}')
+
+            header('sql_background_statements_total', 'counter', 'SQL statements run outside requests.')
+            lines.append(f'sql_background_statements_total {self.background_statements}')
+            header('sql_background_seconds_total', 'counter', 'Time spent in SQL outside requests.')
+            lines.append(f'sql_background_seconds_total {self.background_sql_seconds!r}')
+            header('sql_slow_queries_total', 'counter', 'Statements slower than METRICS_SLOW_QUERY_MS.')
+            lines.append(f'sql_slow_queries_total {self.slow_queries}')
+            header('http_slow_requests_total', 'counter', 'Requests slower than METRICS_SLOW_REQUEST_MS.')
+            lines.append(f'http_slow_requests_total {self.slow_requests}')
+
+        # Numeric stats() fields of the registered components, as gauges
+        for source, stats in sorted(self.sources.items()):
+            name = f'{source}_stats'
+            header(name, 'gauge', f'{source}.stats() counters.')
+            for key, value in sorted(_flatten(stats())):
+                lines.append(f'{name}{{field="{_label(key)}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        if not self.token:
+            return Response('not found\n', status=404, mimetype='text/plain')
+        if not hmac.compare_digest(request.headers.get('Authorization', '').encode(),
+                                   f'Bearer {self.token}'.encode()):
+            return Response('unauthorized\n', status=401, mimetype='text/plain')
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _flatten(stats, prefix=''):
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f'{prefix}{key}_')
+        elif isinstance(value, bool):
+            yield f'{prefix}{key}', int(value)
+        elif isinstance(value, (int, float)):
+            yield f'{prefix}{key}', value
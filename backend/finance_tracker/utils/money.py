@@ -0,0 +1,103 @@
+"""Fixed-point money.
+
+Amounts are stored and aggregated as integer cents, and percentages as
+integer basis points (hundredths of a percent), so SQL SUMs and NumPy
+reductions over them are exact and nothing needs rounding afterwards.
+
+* Money              - an int of cents; Money.parse() is the way in from
+                       decimal input (API payloads, statements, Plaid)
+* parse_percentage() - the same for percentages, to basis points
+* Cents, BasisPoints - the column types; plain INTEGER in the database,
+                       but they refuse anything that isn't an integer, so a
+                       stray float can't silently land in a money column
+* from_hundredths()  - back to dollars / percent for API responses, which
+                       keep their existing decimal numbers
+"""
+import numbers
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from sqlalchemy import Integer
+from sqlalchemy.types import TypeDecorator
+
+
+def _hundredths(value):
+    """Round a decimal amount to an int of hundredths, half away from zero"""
+    if isinstance(value, bool):
+        raise ValueError(f'Not a number: {value!r}')
+    if isinstance(value, float):
+        # The shortest repr round-trips, so 19.99 is read as 19.99, not 19.989999...
+        value = repr(value)
+    try:
+        amount = value if isinstance(value, Decimal) else Decimal(value)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f'Not a number: {value!r}')
+    if not amount.is_finite():
+        raise ValueError(f'Not a finite number: {value!r}')
+    return int((amount * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+class Money(int):
+    """An amount in integer cents.
+
+    A plain int subclass, so it binds to Cents columns, sums in SQL and
+    fills int64 arrays as is. Arithmetic returns plain ints, which are still
+    cents.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, value):
+        """Money from a decimal amount in dollars (str, int, float or Decimal)
+
+        Rounds to the cent, half away from zero; raises ValueError for
+        anything that isn't a finite number.
+        """
+        return cls(_hundredths(value))
+
+    @property
+    def dollars(self):
+        return self / 100
+
+    def __str__(self):
+        sign = '-' if self < 0 else ''
+        return f'{sign}{abs(self) // 100}.{abs(self) % 100:02d}'
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+
+def parse_percentage(value):
+    """Basis points from a percentage (12.5 -> 1250); raises ValueError like Money.parse"""
+    return _hundredths(value)
+
+
+def from_hundredths(value):
+    """Cents to dollars / basis points to percent, for API responses"""
+    return value / 100 if value is not None else None
+
+
+class FixedPoint(TypeDecorator):
+    """INTEGER column of hundredths (cents or basis points)."""
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or type(value) is int:
+            return value
+        if isinstance(value, numbers.Integral):
+            return int(value)  # Money, NumPy integers
+        raise TypeError(f'{type(self).__name__} columns take integers, got {value!r}; '
+                        f'convert with Money.parse() / parse_percentage()')
+
+
+class Cents(FixedPoint):
+    """Money in integer cents."""
+
+    cache_ok = True
+
+
+class BasisPoints(FixedPoint):
+    """A percentage in hundredths of a percent."""
+
+    cache_ok = True
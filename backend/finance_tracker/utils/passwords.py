@@ -0,0 +1,124 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HashingBusyError(RuntimeError):
+    """Raised when the hashing pool is saturated and the caller should back off."""
+
+
+class PasswordHasher:
+    """Password hashing on a bounded process pool.
+
+    With PASSWORD_HASH_WORKERS = 0 hashing runs inline in the request
+    thread. Otherwise jobs go to a ProcessPoolExecutor, created on first use,
+    and at most workers * PASSWORD_HASH_QUEUE_FACTOR jobs are in flight.
+    Extra callers wait up to PASSWORD_HASH_TIMEOUT seconds for a slot, and
+    a job gets as long again to finish; either wait ending raises
+    HashingBusyError. A job that timed out keeps its slot until it ends.
+    """
+
+    def __init__(self, method='scrypt', workers=0, queue_factor=2, timeout=10):
+        self._executor = None
+        self._lock = threading.Lock()
+        self.configure(method, workers, queue_factor, timeout)
+
+    def init_app(self, app):
+        self.configure(
+            app.config.get('PASSWORD_HASH_METHOD', self.method),
+            app.config.get('PASSWORD_HASH_WORKERS', self.workers),
+            app.config.get('PASSWORD_HASH_QUEUE_FACTOR', self.queue_factor),
+            app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout),
+        )
+
+    def configure(self, method, workers, queue_factor, timeout):
+        self.shutdown()
+        self.method = method
+        self.workers = workers
+        self.queue_factor = queue_factor
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(1, workers * queue_factor))
+        self._prefix = None
+
+    @property
+    def prefix(self):
+        # werkzeug fills in default cost parameters, so derive the stored
+        # prefix (e.g. "scrypt:32768:8:1") from a real hash once
+        if self._prefix is None:
+            self._prefix = generate_password_hash('', method=self.method).split('$', 1)[0]
+        return self._prefix
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True when a stored hash is weaker than the configured method and cost.
+
+        Hashes that are already as strong or stronger (say scrypt while the
+        target is pbkdf2) are left alone; unrecognized methods are upgraded.
+        """
+        stored = pwhash.split('$', 1)[0]
+        if stored == self.prefix:
+            return False
+        stored_strength = hash_strength(stored)
+        if stored_strength is None:
+            return True
+        target_strength = hash_strength(self.prefix)
+        return target_strength is not None and stored_strength < target_strength
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        slots = self._slots
+        if not slots.acquire(timeout=self.timeout):
+            raise HashingBusyError('Password hashing pool is saturated')
+        try:
+            future = self._pool().submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is held until the job itself ends, not until we stop
+        # waiting for it, so timed-out jobs still count against the bound
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HashingBusyError('Password hashing timed out')
+
+
+def hash_strength(prefix):
+    """Comparable (family, work factor) for a hash prefix, or None if unrecognized.
+
+    scrypt ranks above PBKDF2, and PBKDF2-SHA1 below the SHA-2 variants;
+    within a family the cost parameters decide (N * r * p for scrypt).
+    """
+    method, *params = prefix.split(':')
+    try:
+        if method == 'scrypt' and len(params) == 3:
+            n, r, p = map(int, params)
+            return (2, n * r * p)
+        if method == 'pbkdf2' and len(params) == 2:
+            return (0 if params[0] == 'sha1' else 1, int(params[1]))
+    except ValueError:
+        pass
+    return None
+
+
+def default_workers():
+    return min(4, os.cpu_count() or 1)
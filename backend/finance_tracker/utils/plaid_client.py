@@ -0,0 +1,179 @@
+"""Shared Plaid API client.
+
+All Plaid calls go through one PlaidGateway so they share a pooled HTTP
+connection manager and the same protections against a slow or failing
+upstream:
+
+* at most PLAID_MAX_CONCURRENCY calls in flight; callers wait up to
+  PLAID_ACQUIRE_TIMEOUT seconds for a slot, then get PlaidUnavailableError
+* every call carries a PLAID_TIMEOUT (connect, read) timeout
+* connection errors, timeouts, 429s and 5xx responses are retried up to
+  PLAID_RETRIES times with full-jitter exponential backoff; the slot is
+  released while backing off
+* PLAID_BREAKER_THRESHOLD consecutive failures open a circuit breaker and
+  calls fail fast for PLAID_BREAKER_RESET seconds
+
+Plaid's own 4xx errors (bad token, pagination restarts, ...) are raised
+to the caller unchanged and do not count against the breaker.
+"""
+import random
+import threading
+import time
+from finance_tracker.utils.circuit_breaker import CircuitBreaker
+
+PLAID_HOSTS = {
+    'sandbox': 'https://sandbox.plaid.com',
+    'production': 'https://production.plaid.com',
+}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class PlaidUnavailableError(RuntimeError):
+    """Plaid is failing, too slow, or every client slot is busy; retry later."""
+
+
+def create_plaid_client(config):
+    """Build a PlaidApi client from app config.
+
+    PLAID_HOST overrides the PLAID_ENV host, e.g. to point at a local stub.
+    Retries are left to PlaidGateway, so urllib3's own are switched off.
+    """
+    from plaid.api import plaid_api
+    from plaid.api_client import ApiClient
+    from plaid.configuration import Configuration
+
+    configuration = Configuration(
+        host=config.get('PLAID_HOST') or PLAID_HOSTS[config.get('PLAID_ENV', 'sandbox')],
+        api_key={
+            'clientId': config.get('PLAID_CLIENT_ID'),
+            'secret': config.get('PLAID_SECRET'),
+        }
+    )
+    configuration.connection_pool_maxsize = config.get('PLAID_POOL_SIZE', 10)
+    configuration.retries = 0
+    return plaid_api.PlaidApi(ApiClient(configuration))
+
+
+class PlaidGateway:
+    """Pooled, concurrency-limited Plaid client with retries and a circuit breaker."""
+
+    def __init__(self, max_concurrency=10, timeout=(3.05, 10), retries=2, backoff=0.25,
+                 acquire_timeout=2, breaker_threshold=5, breaker_reset=30):
+        self.config = {}
+        self._client = None
+        self._lock = threading.Lock()
+        self._counts_lock = threading.Lock()
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.configure(max_concurrency, timeout, retries, backoff, acquire_timeout)
+
+    def init_app(self, app):
+        self.config = app.config
+        self.breaker.failure_threshold = app.config.get('PLAID_BREAKER_THRESHOLD', self.breaker.failure_threshold)
+        self.breaker.reset_timeout = app.config.get('PLAID_BREAKER_RESET', self.breaker.reset_timeout)
+        self.breaker.reset()
+        self.configure(
+            app.config.get('PLAID_MAX_CONCURRENCY', self.max_concurrency),
+            app.config.get('PLAID_TIMEOUT', self.timeout),
+            app.config.get('PLAID_RETRIES', self.retries),
+            app.config.get('PLAID_RETRY_BACKOFF', self.backoff),
+            app.config.get('PLAID_ACQUIRE_TIMEOUT', self.acquire_timeout),
+        )
+
+    def configure(self, max_concurrency, timeout, retries, backoff, acquire_timeout):
+        self.max_concurrency = max_concurrency
+        self.timeout = tuple(timeout) if isinstance(timeout, (list, tuple)) else timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.acquire_timeout = acquire_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        with self._lock:
+            self._client = None
+        with self._counts_lock:
+            self.calls = self.retried = self.failures = self.busy = self.rejected = 0
+
+    def _count(self, name):
+        with self._counts_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    @property
+    def client(self):
+        """The underlying PlaidApi, created on first use"""
+        with self._lock:
+            if self._client is None:
+                self._client = create_plaid_client(self.config)
+            return self._client
+
+    def call(self, operation, request, **kwargs):
+        """Call PlaidApi.<operation>(request, **kwargs) with the gateway's protections"""
+        kwargs.setdefault('_request_timeout', self.timeout)
+        attempt = 0
+        while True:
+            ok, outcome = self._attempt(operation, request, kwargs, check_breaker=attempt == 0)
+            if ok:
+                return outcome
+            if attempt >= self.retries:
+                self.breaker.record_failure()
+                raise PlaidUnavailableError(f'Plaid request failed: {outcome}') from outcome
+            attempt += 1
+            self._count('retried')
+            # Back off without holding a slot, so other callers can use it meanwhile
+            time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    def _attempt(self, operation, request, kwargs, check_breaker):
+        """One call in a client slot: (True, result) or (False, retryable error).
+
+        Only the first attempt asks the breaker; retries continue the call it
+        already admitted (in half-open state, the single probe), so every way
+        out of a retry records a result, or a half-open breaker would wait on
+        that probe forever.
+        """
+        # Cheap check first so callers don't queue for a slot while Plaid is down
+        if check_breaker and self.breaker.state == CircuitBreaker.OPEN:
+            self._count('rejected')
+            raise PlaidUnavailableError('Plaid circuit breaker is open')
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            self._count('busy')
+            if not check_breaker:
+                self.breaker.record_failure()
+            raise PlaidUnavailableError('All Plaid client slots are busy')
+        try:
+            if check_breaker and not self.breaker.allow():
+                self._count('rejected')
+                raise PlaidUnavailableError('Plaid circuit breaker is open')
+            self._count('calls')
+            try:
+                result = getattr(self.client, operation)(request, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    # Plaid answered; the upstream itself is healthy
+                    self.breaker.record_success()
+                    raise
+                self._count('failures')
+                return False, e
+            except BaseException:
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            return True, result
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        with self._counts_lock:
+            counts = {name: getattr(self, name) for name in ('calls', 'retried', 'failures', 'busy', 'rejected')}
+        return {
+            **counts,
+            'max_concurrency': self.max_concurrency,
+            'breaker': self.breaker.stats(),
+        }
+
+
+def is_retryable(error):
+    """Transport errors, timeouts, rate limits and upstream 5xx"""
+    from plaid.exceptions import ApiException
+    from urllib3.exceptions import HTTPError
+
+    if isinstance(error, ApiException):
+        return error.status in RETRYABLE_STATUS
+    return isinstance(error, (HTTPError, ConnectionError, TimeoutError))
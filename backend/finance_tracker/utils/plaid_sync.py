@@ -0,0 +1,221 @@
+"""Incremental Plaid /transactions/sync worker.
+
+Each PlaidItem keeps the cursor Plaid returned for its last applied page,
+so a run only fetches what changed since then. Every page is applied in
+one database transaction: added/modified rows are upserted by Plaid
+transaction id, removed rows are deleted, the monthly rollups and the savings
+contributions already counted are adjusted by the difference, and the new
+cursor is stored.
+
+Once an item is caught up, the savings rules are applied to the new rows
+and the user's recurring series are brought up to date: new rows are
+folded in incrementally, but a sync that modified or removed rows rebuilds
+them from the ledger, since the detector only reads rows above its
+checkpoint and would never see the change.
+"""
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from finance_tracker.extensions import db, plaid_gateway
+from finance_tracker.models.plaid_item import PlaidItem
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.utils.changes import mark_user_changed
+from finance_tracker.utils.money import Money
+from finance_tracker.utils.recurring import detect_recurring, rebuild_recurring
+from finance_tracker.utils.rollups import accumulate, apply_deltas
+from finance_tracker.utils.savings_engine import revise_contributions, run_rules
+
+MUTATION_DURING_PAGINATION = 'TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION'
+MAX_PAGINATION_RESTARTS = 3
+LOOKUP_BATCH = 500
+
+
+def fetch_page(access_token, cursor, count):
+    from plaid.model.transactions_sync_request import TransactionsSyncRequest
+
+    params = {'access_token': access_token, 'count': count}
+    if cursor:
+        params['cursor'] = cursor
+    # Parse the JSON ourselves; building OpenAPI models for every
+    # transaction costs more than the HTTP round trip
+    response = plaid_gateway.call('transactions_sync', TransactionsSyncRequest(**params),
+                                  _preload_content=False)
+    return json.loads(response.data)
+
+
+def transaction_row(user_id, txn, now):
+    finance_category = txn.get('personal_finance_category') or {}
+    legacy_category = txn.get('category') or [None]
+    return {
+        'user_id': user_id,
+        'external_id': txn['transaction_id'],
+        'date': date.fromisoformat(txn['date']),
+        # Plaid amounts are positive for money leaving the account
+        'amount': -Money.parse(txn['amount']),
+        'description': txn.get('name'),
+        'merchant': txn.get('merchant_name'),
+        'category': finance_category.get('primary') or legacy_category[0],
+        'created_at': now,
+    }
+
+
+def _existing_rows(user_id, external_ids):
+    rows = []
+    for start in range(0, len(external_ids), LOOKUP_BATCH):
+        batch = external_ids[start:start + LOOKUP_BATCH]
+        rows.extend(
+            row._asdict() for row in db.session.execute(
+                db.select(Transaction.id, Transaction.user_id, Transaction.external_id, Transaction.date,
+                          Transaction.amount, Transaction.category)
+                .where(Transaction.user_id == user_id, Transaction.external_id.in_(batch))
+            )
+        )
+    return rows
+
+
+def apply_page(item_id, user_id, page):
+    """Apply one /transactions/sync page and its cursor atomically"""
+    now = datetime.utcnow()
+    upserts = {}
+    for txn in page.get('added', []) + page.get('modified', []):
+        row = transaction_row(user_id, txn, now)
+        upserts[row['external_id']] = row
+    removed = [txn['transaction_id'] for txn in page.get('removed', [])]
+
+    try:
+        # Back the previous version of every touched row out of the rollups
+        previous = _existing_rows(user_id, list(upserts) + removed)
+        deltas = accumulate(previous, sign=-1)
+        accumulate(upserts.values(), deltas=deltas)
+        # Upserts keep the row's id; the savings rules already counted some
+        revise_contributions(user_id, previous, [
+            {**upserts[row['external_id']], 'id': row['id']} for row in previous if row['external_id'] in upserts
+        ])
+
+        if upserts:
+            table = Transaction.__table__
+            stmt = sqlite_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.external_id],
+                set_={name: stmt.excluded[name]
+                      for name in ('date', 'amount', 'description', 'merchant', 'category')}
+            )
+            db.session.execute(stmt, list(upserts.values()))
+        for start in range(0, len(removed), LOOKUP_BATCH):
+            db.session.execute(
+                db.delete(Transaction).where(
+                    Transaction.user_id == user_id,
+                    Transaction.external_id.in_(removed[start:start + LOOKUP_BATCH]))
+            )
+        apply_deltas(db.session, deltas)
+        db.session.execute(
+            db.update(PlaidItem).where(PlaidItem.id == item_id)
+            .values(transactions_cursor=page['next_cursor'], last_synced_at=now)
+        )
+        if upserts or removed:
+            mark_user_changed(db.session, user_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return len(page.get('added', [])), len(page.get('modified', [])), len(removed)
+
+
+def _error_code(api_exception):
+    try:
+        return json.loads(api_exception.body).get('error_code')
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def sync_item(item_id, page_size=500):
+    """Pull every pending page for one item; returns per-item counters"""
+    from plaid.exceptions import ApiException
+
+    item = db.session.get(PlaidItem, item_id)
+    user_id, access_token = item.user_id, item.access_token
+    start_cursor = cursor = item.transactions_cursor
+    stats = {'item_id': item_id, 'added': 0, 'modified': 0, 'removed': 0, 'pages': 0}
+    restarts = 0
+    db.session.rollback()  # don't hold a read transaction across HTTP calls
+
+    while True:
+        try:
+            page = fetch_page(access_token, cursor, page_size)
+        except ApiException as e:
+            if _error_code(e) == MUTATION_DURING_PAGINATION and restarts < MAX_PAGINATION_RESTARTS:
+                # Plaid requires restarting from the cursor the loop began with;
+                # re-applied pages are idempotent upserts
+                restarts += 1
+                cursor = start_cursor
+                continue
+            raise
+
+        added, modified, removed = apply_page(item_id, user_id, page)
+        stats['added'] += added
+        stats['modified'] += modified
+        stats['removed'] += removed
+        stats['pages'] += 1
+        cursor = page['next_cursor']
+        if not page.get('has_more'):
+            refresh_derived(user_id, stats)
+            return stats
+
+
+def refresh_derived(user_id, stats):
+    """Update the user's savings contributions and recurring series for one item's sync"""
+    if not (stats['added'] or stats['modified'] or stats['removed']):
+        return
+    # The pages are committed; on failure the next sync, or the CLI, catches up
+    try:
+        run_rules(user_id)
+    except Exception as e:
+        logging.error(f"Savings rules error for user {user_id}: {str(e)}")
+    try:
+        if stats['modified'] or stats['removed']:
+            rebuild_recurring(user_id)
+        else:
+            detect_recurring(user_id)
+    except Exception as e:
+        logging.error(f"Recurring detection error for user {user_id}: {str(e)}")
+
+
+def sync_items(app, item_ids=None, concurrency=None, page_size=None):
+    """Sync items concurrently, at most `concurrency` at a time.
+
+    Returns a list of per-item stats; failed items carry an 'error' key.
+    """
+    concurrency = concurrency or app.config.get('PLAID_SYNC_CONCURRENCY', 4)
+    page_size = page_size or app.config.get('PLAID_SYNC_PAGE_SIZE', 500)
+    if item_ids is None:
+        with app.app_context():
+            item_ids = [row[0] for row in db.session.execute(db.select(PlaidItem.id).order_by(PlaidItem.id))]
+
+    def run(item_id):
+        with app.app_context():
+            try:
+                return sync_item(item_id, page_size)
+            except Exception as e:
+                logging.error(f"Plaid sync error for item {item_id}: {str(e)}")
+                return {'item_id': item_id, 'error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(run, item_ids))
+
+
+def run_sync_worker(app, interval, concurrency=None, iterations=None):
+    """Background loop: sync every item, then sleep `interval` seconds"""
+    completed = 0
+    while iterations is None or completed < iterations:
+        started = time.monotonic()
+        results = sync_items(app, concurrency=concurrency)
+        elapsed = time.monotonic() - started
+        failed = sum(1 for result in results if 'error' in result)
+        logging.info(f"Plaid sync: {len(results)} items ({failed} failed) in {elapsed:.1f}s")
+        completed += 1
+        if iterations is None or completed < iterations:
+            time.sleep(max(0, interval - elapsed))
@@ -0,0 +1,101 @@
+"""EXPLAIN QUERY PLAN checks for the queries behind each route.
+
+Every statement is built by the same helper the route (or the engine it
+calls) executes, with placeholder values for the binds, so a change to a
+route's query changes what is checked here. check_query_plans() runs them
+through SQLite's planner and reports any that fall back to a full table
+scan, so a dropped or mismatched index fails `flask query-plans check` and
+tests/test_query_plans.py.
+"""
+import re
+from datetime import date
+from sqlalchemy.orm import with_parent
+from finance_tracker.extensions import db
+from finance_tracker.models.user import User
+from finance_tracker.models.savings import SavingsGoal, SavingsRule
+from finance_tracker.models.plaid_item import PlaidItem
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.utils import importer, recurring, rollups, savings_engine
+from finance_tracker.utils.export import EXPORTS, export_statement
+from finance_tracker.utils.listing import list_statements
+from finance_tracker.utils.savings_batch import BATCH_MODELS, owned_statement
+from finance_tracker.utils.search import INDEXES, search_params, search_statement
+
+_FTS_MATCH = re.compile(r'VIRTUAL TABLE INDEX \d+:M')
+_SUBQUERY = re.compile(r'^(?:CO-ROUTINE|MATERIALIZE) (\S+)')
+
+
+def _list_queries(name, model):
+    page, probe = list_statements(model, 1, model.API_FIELDS, limit=50, after=100)
+    return [
+        (name, list_statements(model, 1, model.API_FIELDS)[0]),
+        (f'{name}: keyset page', page),
+        (f'{name}: next cursor probe', probe),
+    ]
+
+
+def route_queries():
+    """(name, statement) pairs, with placeholder values for the binds"""
+    month = date.today().strftime('%Y-%m')
+    return [
+        ('auth.register / auth.login: User.by_email', User.by_email('someone@example.com').statement),
+        # utils.auth.load_user is db.session.get(User, id), which emits this
+        ('utils.auth.load_user: user by id', db.select(User).where(User.id == 1)),
+        ('auth.exchange_plaid_token: PlaidItem.by_plaid_item_id',
+         PlaidItem.by_plaid_item_id('item-sandbox-1').statement),
+        ('auth.get_dashboard: User.plaid_items',
+         db.select(PlaidItem).where(with_parent(User(id=1), User.plaid_items))),
+        ('Transaction.recent_for_user', Transaction.recent_query(1).statement),
+        *_list_queries('savings.get_goals', SavingsGoal),
+        *_list_queries('savings.get_rules', SavingsRule),
+        ('savings.forecast_goals: SavingsGoal.for_user', SavingsGoal.for_user(1).statement),
+        ('savings.update_goal / delete_goal: SavingsGoal.owned', SavingsGoal.owned(1, 1).statement),
+        ('savings.update_rule / delete_rule: SavingsRule.owned', SavingsRule.owned(1, 1).statement),
+        *[(f'savings.batch_{label.lower()}s: owned rows', owned_statement(model, 1, [1, 2], columns))
+          for model, (label, _, _, columns) in BATCH_MODELS.items()],
+        ('importer: existing external ids', importer.existing_ids_statement(1, ['a', 'b'])),
+        ('savings_engine: checkpoint', savings_engine.checkpoint_statement(1)),
+        ('savings_engine: active rules', savings_engine.active_rules_statement(1)),
+        ('savings_engine: transactions since checkpoint', savings_engine.transactions_since_statement(1, 100)),
+        ('savings_engine.contribution_totals: month', savings_engine.contribution_totals_statement(1, month)),
+        ('savings_engine.contribution_totals: lifetime', savings_engine.contribution_totals_statement(1)),
+        ('recurring: checkpoint', recurring.checkpoint_statement(1)),
+        ('recurring: transactions since checkpoint', recurring.transactions_since_statement(1, 100)),
+        ('recurring: series for new transactions', recurring.series_statement(1, ['netflix', 'employer'])),
+        ('recurring.recurring_series', recurring.recurring_series_statement(1)),
+        *[(f'api.search: {kind}', search_statement(kind).bindparams(**search_params(1, ['coffee'])))
+          for kind in INDEXES],
+        *[(f'api.export: {kind}', export_statement(model, 1)) for kind, model in EXPORTS.items()],
+        ('rollups.monthly_totals', rollups.monthly_totals_statement(1)),
+        ('forecast.inflow_stats: completed months', rollups.monthly_totals_statement(1, 12, before=month)),
+        ('rollups.category_distribution', rollups.category_distribution_statement(1, month)),
+        ('rollups.total_balance', rollups.total_balance_statement(1)),
+    ]
+
+
+def explain(statement):
+    engine = db.engine
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+    with engine.connect() as connection:
+        return [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+
+
+def is_full_scan(detail, subqueries=()):
+    # "SCAN <table>" walks every row (or every index entry); route queries
+    # should all be "SEARCH ... USING INDEX / INTEGER PRIMARY KEY" lookups.
+    # An FTS5 MATCH shows up as "SCAN <fts> VIRTUAL TABLE INDEX <n>:M..",
+    # which is a lookup in the full-text index, and "SCAN <subquery>" reads
+    # rows a subquery of the same plan produced, whose own lines are checked
+    if not detail.startswith('SCAN ') or _FTS_MATCH.search(detail):
+        return False
+    return detail.split()[1] not in subqueries
+
+
+def check_query_plans():
+    """Return [(name, plan_lines, ok)] for every route query"""
+    results = []
+    for name, statement in route_queries():
+        plan = explain(statement)
+        subqueries = {match.group(1) for match in map(_SUBQUERY.match, plan) if match}
+        results.append((name, plan, not any(is_full_scan(line, subqueries) for line in plan)))
+    return results
@@ -0,0 +1,211 @@
+"""Token-bucket rate limiting for the credential endpoints.
+
+/auth/login and /auth/register each run a password hash and a user query,
+so a credential-stuffing burst can occupy every worker. RateLimiter.check()
+is called at the top of those views, before any hashing or database work,
+and charges one token from two buckets per attempt:
+
+* ``<scope>:ip:<remote addr>``, RATELIMIT_IP_BURST attempts at once,
+  refilling at RATELIMIT_IP_PER_MINUTE
+* ``<scope>:email:<normalized email>``, RATELIMIT_EMAIL_BURST attempts,
+  refilling at RATELIMIT_EMAIL_PER_MINUTE
+
+A bucket is just (tokens, last update); it is refilled lazily when it is
+next charged, so a check is O(1) and nothing runs in the background.
+
+By default buckets live in this process, in an LRU bounded at
+RATELIMIT_MAX_KEYS entries, so every worker enforces its own limits and
+memory stays flat however many addresses show up (an evicted bucket starts
+full again). Setting RATELIMIT_STORAGE_URL to a SQLite file
+(``sqlite:////var/run/finance-tracker/ratelimit.db``) keeps the buckets in
+that file instead, so all workers on the host share them. That file is
+scratch state, separate from the application database, and is created on
+first use; each check is a single UPSERT on it.
+
+The client address is request.remote_addr; behind a reverse proxy, wrap
+the app in werkzeug's ProxyFix so that is the real client. The email
+bucket also limits attempts against one account from many addresses, at
+the cost of letting someone slow down logins to an account they don't own.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+PRUNE_INTERVAL = 60  # seconds between sweeps of full buckets out of the SQLite store
+
+
+class MemoryBuckets:
+    """Token buckets in a thread-safe, bounded LRU."""
+
+    def __init__(self, max_keys=100000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets = OrderedDict()  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def take(self, key, burst, rate):
+        """Charge one token; returns 0 if allowed, else seconds until one is available"""
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(burst), now]
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteBuckets:
+    """Token buckets in a SQLite file shared by every worker on the host."""
+
+    # Refill and charge in one statement, so concurrent workers can't both
+    # spend the last token. In DO UPDATE SET the bare column names are the
+    # stored row, so `allowed` and `tokens` are both computed from it.
+    TAKE = """
+        INSERT INTO rate_limit_buckets (key, tokens, updated_at, allowed)
+        VALUES (:key, :burst - 1, :now, 1)
+        ON CONFLICT (key) DO UPDATE SET
+            allowed = min(:burst, tokens + max(:now - updated_at, 0) * :rate) >= 1,
+            tokens = min(:burst, tokens + max(:now - updated_at, 0) * :rate)
+                     - (min(:burst, tokens + max(:now - updated_at, 0) * :rate) >= 1),
+            updated_at = max(updated_at, :now)
+        RETURNING allowed, tokens
+    """
+
+    def __init__(self, path, timeout=5, clock=time.time):
+        self.path = path
+        self.timeout = timeout
+        # Wall clock, not monotonic: the timestamps are compared across processes
+        self._clock = clock
+        self._local = threading.local()
+        self._pruned_at = 0.0
+        self._ensure_schema()
+        self.evictions = 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')  # losing a few buckets in a crash is harmless
+            self._local.conn = conn
+        return conn
+
+    def _ensure_schema(self):
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS rate_limit_buckets ('
+            'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, '
+            'allowed INTEGER NOT NULL) WITHOUT ROWID'
+        )
+
+    def take(self, key, burst, rate):
+        now = self._clock()
+        conn = self._connection()
+        allowed, tokens = conn.execute(self.TAKE, {'key': key, 'burst': burst, 'rate': rate, 'now': now}).fetchone()
+        if now - self._pruned_at >= PRUNE_INTERVAL:
+            self._prune(conn, now)
+        return 0 if allowed else (1 - tokens) / rate
+
+    def _prune(self, conn, now):
+        # A bucket untouched for an hour has refilled under any sane limit,
+        # and a missing bucket behaves exactly like a full one
+        self._pruned_at = now
+        self.evictions += conn.execute(
+            'DELETE FROM rate_limit_buckets WHERE updated_at < ?', (now - 3600,)
+        ).rowcount
+
+    def clear(self):
+        self._connection().execute('DELETE FROM rate_limit_buckets')
+
+    def __len__(self):
+        return self._connection().execute('SELECT count(*) FROM rate_limit_buckets').fetchone()[0]
+
+
+class RateLimiter:
+    """Per-IP and per-email attempt limits for the auth endpoints."""
+
+    def __init__(self, ip_burst=20, ip_per_minute=10, email_burst=10, email_per_minute=5,
+                 max_keys=100000, storage_url=None, enabled=True):
+        self.enabled = enabled
+        self.configure(ip_burst, ip_per_minute, email_burst, email_per_minute, max_keys, storage_url)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', self.enabled)
+        self.configure(
+            app.config.get('RATELIMIT_IP_BURST', self.ip_burst),
+            app.config.get('RATELIMIT_IP_PER_MINUTE', self.ip_rate * 60),
+            app.config.get('RATELIMIT_EMAIL_BURST', self.email_burst),
+            app.config.get('RATELIMIT_EMAIL_PER_MINUTE', self.email_rate * 60),
+            app.config.get('RATELIMIT_MAX_KEYS', self.max_keys),
+            app.config.get('RATELIMIT_STORAGE_URL', self.storage_url),
+        )
+
+    def configure(self, ip_burst, ip_per_minute, email_burst, email_per_minute, max_keys, storage_url):
+        self.ip_burst = ip_burst
+        self.ip_rate = ip_per_minute / 60
+        self.email_burst = email_burst
+        self.email_rate = email_per_minute / 60
+        self.max_keys = max_keys
+        self.storage_url = storage_url
+        if storage_url:
+            if not storage_url.startswith('sqlite:///'):
+                raise ValueError(f'RATELIMIT_STORAGE_URL must be a sqlite:/// URL, got {storage_url!r}')
+            self.buckets = SQLiteBuckets(storage_url[len('sqlite:///'):])
+        else:
+            self.buckets = MemoryBuckets(max_keys)
+        self.allowed = self.rejected = self.errors = 0
+
+    def check(self, scope, ip, email=None):
+        """None if the attempt may proceed, else the number of seconds to wait
+
+        Attempts rejected on the address don't charge the email bucket.
+        """
+        if not self.enabled:
+            return None
+        try:
+            retry_after = self.buckets.take(f'{scope}:ip:{ip}', self.ip_burst, self.ip_rate)
+            if not retry_after and email:
+                retry_after = self.buckets.take(f'{scope}:email:{email}', self.email_burst, self.email_rate)
+        except sqlite3.Error as e:
+            # A broken shared store shouldn't lock everyone out of their accounts
+            self.errors += 1
+            logging.error(f"Rate limit store failed: {str(e)}")
+            return None
+        if retry_after:
+            self.rejected += 1
+            return retry_after
+        self.allowed += 1
+        return None
+
+    def reset(self):
+        self.buckets.clear()
+        self.allowed = self.rejected = self.errors = 0
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'shared': bool(self.storage_url),
+            'buckets': len(self.buckets),
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+            'evictions': self.buckets.evictions,
+            'errors': self.errors,
+        }
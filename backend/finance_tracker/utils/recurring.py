@@ -0,0 +1,407 @@
+"""Incremental recurring charge and income detection.
+
+Transactions are grouped into series by (normalized merchant, direction):
+merchant_key() strips card-processor prefixes, store numbers, phone
+numbers and the like, so 'SQ *NETFLIX.COM 866-579-7172 CA' and 'Netflix.com'
+land in the same series. A series keeps its last HISTORY_SIZE occurrences,
+and its cadence is read from the gaps between their dates: when at least
+three quarters of the gaps sit within a cadence's tolerance, the series is
+recurring at that cadence and the next occurrence is predicted one median
+gap after the last.
+
+Recurring series are further classified:
+
+* ``payroll``      - income at a weekly, biweekly or monthly cadence
+* ``income``       - any other recurring income
+* ``rent``         - a monthly expense whose merchant or category says so
+* ``subscription`` - an expense whose amount rarely changes (price changes
+                     are reported as insights)
+* ``bill``         - an expense whose amount varies (utilities, phone)
+
+Like the savings rule engine, every user has a checkpoint: the highest
+transaction id already processed. A run reads only transactions above it,
+sorts them by (series, date), merges each group into its series' stored
+history and re-classifies just the touched series, so the work is
+O(n log n) in the new transactions and never rereads the ledger.
+Backdated transactions are merged into place by date. Edits and deletions
+of processed transactions are not backed out; rebuild_recurring() starts a
+user over from the ledger when that matters (the Plaid sync does so when a
+sync modified or removed rows).
+
+Detection writes, so it runs on the ingest side: after a statement import,
+after a Plaid sync and from `flask recurring detect`. The read side
+(recurring_series, recurring_insights) only reads the stored series.
+"""
+import heapq
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import groupby
+from statistics import median, median_low
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from finance_tracker.extensions import db
+from finance_tracker.models.recurring import RecurringCheckpoint, RecurringSeries
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+from finance_tracker.utils.changes import mark_user_changed
+from finance_tracker.utils.money import from_hundredths
+
+BATCH_SIZE = 50000
+HISTORY_SIZE = 24
+MIN_OCCURRENCES = 3
+LOOKUP_BATCH = 500
+UPCOMING_DAYS = 7
+
+# (name, period in days, tolerance in days); biweekly's tolerance also
+# covers semimonthly pay on the 15th and the last day of the month
+CADENCES = (
+    ('weekly', 7, 1),
+    ('biweekly', 14, 3),
+    ('monthly', 30.44, 4),
+    ('quarterly', 91.31, 8),
+    ('yearly', 365.25, 12),
+)
+_CADENCE_PERIODS = {name: (period, tolerance) for name, period, tolerance in CADENCES}
+PAYROLL_CADENCES = ('weekly', 'biweekly', 'monthly')
+AVERAGE_MONTH_DAYS = 30.44
+
+_PROCESSOR_PREFIX = re.compile(
+    r'^(?:sq|tst|sp|pp|paypal|google|apl|amzn mktp us)\s*\*\s*'
+    r'|^(?:pos|ach|debit card purchase|recurring payment|preauthorized debit)\s+'
+)
+_TOKEN_SEPARATOR = re.compile(r'[^a-z0-9&]+')
+_NOISE_TOKENS = frozenset((
+    'inc', 'llc', 'ltd', 'co', 'com', 'net', 'org', 'www', 'the', 'purchase', 'payment', 'pmt',
+    'debit', 'credit', 'card', 'online', 'recurring', 'autopay', 'ach',
+))
+_RENT = re.compile(r'\b(?:rent|mortgage|landlord|lease|apartments?|housing|property management)\b')
+
+
+@lru_cache(maxsize=65536)  # ledgers repeat the same few hundred merchant strings
+def merchant_key(merchant, description=None):
+    """Grouping key for a counterparty: 'NETFLIX.COM 866-579-7172 CA' -> 'netflix'"""
+    text = _PROCESSOR_PREFIX.sub('', (merchant or description or '').strip().lower())
+    tokens = [
+        token for token in _TOKEN_SEPARATOR.split(text)
+        if len(token) > 1 and token not in _NOISE_TOKENS and not any(c.isdigit() for c in token)
+    ]
+    # A trailing two-letter token is nearly always a state or country code
+    if len(tokens) > 1 and len(tokens[-1]) == 2:
+        tokens.pop()
+    return ' '.join(tokens[:3])[:100]
+
+
+def _amount_tolerance(cents):
+    # Tax and currency conversion move "the same" charge by a few percent
+    return max(abs(cents) * 5 // 100, 100)
+
+
+def detect_cadence(dates):
+    """(cadence, median gap in days) for sorted dates, or (None, None) if they aren't regular"""
+    gaps = [(later - earlier).days for earlier, later in zip(dates, dates[1:]) if later > earlier]
+    if len(gaps) < MIN_OCCURRENCES - 1:
+        return None, None
+    interval = median(gaps)
+    for name, period, tolerance in CADENCES:
+        if abs(interval - period) <= tolerance:
+            regular = sum(1 for gap in gaps if abs(gap - period) <= tolerance)
+            if regular >= MIN_OCCURRENCES - 1 and regular >= 0.75 * len(gaps):
+                return name, round(interval)
+            break
+    return None, None
+
+
+def classify(history, direction, key, category):
+    """Detected fields for a series from its (ISO date, cents) history, oldest first"""
+    dates = [date.fromisoformat(day) for day, _ in history]
+    amounts = [abs(cents) for _, cents in history]
+    cadence, interval = detect_cadence(dates)
+    fields = {
+        'kind': None,
+        'cadence': cadence,
+        'interval_days': interval,
+        'typical_amount': median_low(amounts[-12:]),
+        'last_amount': amounts[-1],
+        'previous_amount': amounts[-2] if len(amounts) > 1 else None,
+        'next_date': None,
+    }
+    if cadence is None:
+        return fields
+
+    fields['next_date'] = dates[-1] + timedelta(days=interval)
+    if direction == 'income':
+        fields['kind'] = 'payroll' if cadence in PAYROLL_CADENCES else 'income'
+    elif cadence == 'monthly' and _RENT.search(f"{key} {(category or '').lower().replace('_', ' ')}"):
+        fields['kind'] = 'rent'
+    else:
+        # A subscription changes price now and then; a utility bill changes every time
+        recent = amounts[-12:]
+        changes = sum(1 for a, b in zip(recent, recent[1:]) if abs(b - a) > _amount_tolerance(a))
+        fields['kind'] = 'subscription' if changes <= 2 else 'bill'
+    return fields
+
+
+def series_statement(user_id, keys):
+    return (
+        db.select(RecurringSeries.__table__)
+        .where(RecurringSeries.user_id == user_id, RecurringSeries.merchant_key.in_(keys))
+    )
+
+
+def _existing_series(user_id, keys):
+    found = {}
+    keys = sorted({key for key, _ in keys})
+    for start in range(0, len(keys), LOOKUP_BATCH):
+        for series in db.session.execute(series_statement(user_id, keys[start:start + LOOKUP_BATCH])).mappings():
+            found[(series['merchant_key'], series['direction'])] = series
+    return found
+
+
+def _fold(user_id, rows):
+    """Merge transaction rows into their series and upsert the ones touched"""
+    occurrences = []
+    for row in rows:
+        key = merchant_key(row.merchant, row.description)
+        if key and row.amount:
+            occurrences.append((key, 'income' if row.amount > 0 else 'expense', row.date.isoformat(), row))
+    occurrences.sort(key=lambda occurrence: occurrence[:3])
+    if not occurrences:
+        return
+
+    existing = _existing_series(user_id, {occurrence[:2] for occurrence in occurrences})
+    now = datetime.utcnow()
+    upserts = []
+    for (key, direction), group in groupby(occurrences, key=lambda occurrence: occurrence[:2]):
+        group = list(group)
+        latest = group[-1][3]
+        new = [(day, int(row.amount)) for _, _, day, row in group]
+        series = existing.get((key, direction))
+        if series is None:
+            history = new[-HISTORY_SIZE:]
+            count, first_date = len(new), group[0][3].date
+            name, category = latest.merchant or latest.description, latest.category
+        else:
+            history = list(heapq.merge((tuple(entry) for entry in series['history']), new))[-HISTORY_SIZE:]
+            count, first_date = series['occurrences'] + len(new), min(series['first_date'], group[0][3].date)
+            if latest.date >= series['last_date']:
+                name, category = latest.merchant or latest.description, latest.category
+            else:
+                name, category = series['name'], series['category']
+        upserts.append({
+            'user_id': user_id,
+            'merchant_key': key,
+            'direction': direction,
+            'name': name,
+            'category': category,
+            'occurrences': count,
+            'first_date': first_date,
+            'last_date': date.fromisoformat(history[-1][0]),
+            'history': [list(entry) for entry in history],
+            'updated_at': now,
+            **classify(history, direction, key, category),
+        })
+
+    table = RecurringSeries.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.merchant_key, table.c.direction],
+        set_={name: stmt.excluded[name] for name in upserts[0] if name not in ('user_id', 'merchant_key', 'direction')}
+    )
+    db.session.execute(stmt, upserts)
+
+
+def checkpoint_statement(user_id):
+    return db.select(RecurringCheckpoint.last_transaction_id).where(RecurringCheckpoint.user_id == user_id)
+
+
+def transactions_since_statement(user_id, last_id, batch_size=BATCH_SIZE):
+    return (
+        db.select(Transaction.id, Transaction.date, Transaction.amount, Transaction.merchant,
+                  Transaction.description, Transaction.category)
+        .where(Transaction.user_id == user_id, Transaction.id > last_id)
+        .order_by(Transaction.id)
+        .limit(batch_size)
+    )
+
+
+def _checkpoint(user_id):
+    db.session.execute(
+        sqlite_insert(RecurringCheckpoint.__table__)
+        .values(user_id=user_id, last_transaction_id=0, updated_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=['user_id'])
+    )
+    return db.session.scalar(checkpoint_statement(user_id))
+
+
+def detect_recurring(user_id, batch_size=BATCH_SIZE):
+    """Fold every transaction since the user's checkpoint into their series; returns the count processed"""
+    try:
+        last_id = _checkpoint(user_id)
+        processed = 0
+
+        while True:
+            rows = db.session.execute(transactions_since_statement(user_id, last_id, batch_size)).all()
+            if not rows:
+                break
+            _fold(user_id, rows)
+
+            # Compare-and-set so two concurrent runs can't both count a batch
+            moved = db.session.execute(
+                db.update(RecurringCheckpoint)
+                .where(RecurringCheckpoint.user_id == user_id,
+                       RecurringCheckpoint.last_transaction_id == last_id)
+                .values(last_transaction_id=rows[-1].id, updated_at=datetime.utcnow())
+            ).rowcount
+            if not moved:
+                db.session.rollback()
+                break
+            # Cached insights include the recurring ones
+            mark_user_changed(db.session, user_id)
+            db.session.commit()
+            last_id = rows[-1].id
+            processed += len(rows)
+            if len(rows) < batch_size:
+                break
+
+        db.session.commit()
+        return processed
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def rebuild_recurring(user_id, batch_size=BATCH_SIZE):
+    """Drop a user's series and detect them again from the whole ledger"""
+    try:
+        db.session.execute(db.delete(RecurringSeries).where(RecurringSeries.user_id == user_id))
+        db.session.execute(db.delete(RecurringCheckpoint).where(RecurringCheckpoint.user_id == user_id))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return detect_recurring(user_id, batch_size)
+
+
+def detect_all(batch_size=BATCH_SIZE, rebuild=False):
+    """Run the detector for every user; returns {user_id: processed}"""
+    run = rebuild_recurring if rebuild else detect_recurring
+    user_ids = db.session.scalars(db.select(User.id).order_by(User.id)).all()
+    return {user_id: run(user_id, batch_size) for user_id in user_ids}
+
+
+# Read side
+
+def _is_active(series, today):
+    _, tolerance = _CADENCE_PERIODS[series.cadence]
+    return series.next_date + timedelta(days=round(tolerance) + 1) >= today
+
+
+def monthly_amount(series):
+    """A recurring series' typical amount spread over an average month, in cents"""
+    period, _ = _CADENCE_PERIODS[series.cadence]
+    return round(series.typical_amount * AVERAGE_MONTH_DAYS / period)
+
+
+def recurring_series_statement(user_id):
+    return db.select(RecurringSeries).where(RecurringSeries.user_id == user_id, RecurringSeries.kind.is_not(None))
+
+
+def recurring_series(user_id, today=None, include_inactive=False):
+    """The user's recurring series, soonest next occurrence first.
+
+    A series is active until its next occurrence is overdue by more than
+    its cadence's tolerance (a cancelled subscription stops being listed).
+    """
+    today = today or date.today()
+    series = db.session.scalars(recurring_series_statement(user_id)).all()
+    found = []
+    for entry in sorted(series, key=lambda entry: (entry.next_date, entry.merchant_key)):
+        active = _is_active(entry, today)
+        if active or include_inactive:
+            found.append((entry, active))
+    return found
+
+
+def series_dict(series, active):
+    return {**series.to_dict(), 'monthly_amount': from_hundredths(monthly_amount(series)), 'active': active}
+
+
+def subscriptions_insight(count, monthly_total):
+    return {
+        "type": "recurring",
+        "title": "Recurring Subscriptions",
+        "description": f"You have {count} active subscription{'s' if count != 1 else ''} "
+                       f"costing about ${monthly_total:,.2f} a month.",
+        "severity": "low",
+        "recommendation": "Review them regularly and cancel any you no longer use."
+    }
+
+
+def price_increase_insight(name, previous, latest):
+    change = (latest - previous) / previous * 100
+    return {
+        "type": "recurring",
+        "title": f"{name} Price Increase",
+        "description": f"Your {name} charge went up from ${previous:,.2f} to ${latest:,.2f} ({change:.1f}%).",
+        "severity": "medium",
+        "recommendation": "Check whether the new price is still worth it, or look for a cheaper plan."
+    }
+
+
+def upcoming_payments_insight(payments, total):
+    """payments: [(name, due date, kind), ...]"""
+    listed = ', '.join(f"{name} ({due.strftime('%b')} {due.day})" for name, due, _ in payments)
+    return {
+        "type": "recurring",
+        "title": "Upcoming Recurring Payments",
+        "description": f"{len(payments)} recurring payment{'s' if len(payments) != 1 else ''} totalling "
+                       f"about ${total:,.2f} {'are' if len(payments) != 1 else 'is'} due in the next "
+                       f"{UPCOMING_DAYS} days: {listed}.",
+        "severity": "medium" if any(kind == 'rent' for _, _, kind in payments) else "low",
+        "recommendation": "Make sure your account balance covers them before they are charged."
+    }
+
+
+def payroll_insight(name, cadence, next_date):
+    return {
+        "type": "income",
+        "title": "Income Schedule",
+        "description": f"You are paid {cadence} by {name}; the next payment is expected around "
+                       f"{next_date.isoformat()}.",
+        "severity": "low",
+        "recommendation": "Schedule bill payments and automatic savings transfers for just after payday."
+    }
+
+
+def recurring_insights(user_id, today=None):
+    """Insight entries (the shape analyze_financial_health returns) from the detected series"""
+    today = today or date.today()
+    active = [series for series, _ in recurring_series(user_id, today)]
+    insights = []
+
+    subscriptions = [series for series in active if series.kind == 'subscription']
+    if subscriptions:
+        insights.append(subscriptions_insight(
+            len(subscriptions), from_hundredths(sum(monthly_amount(series) for series in subscriptions))))
+
+    for series in subscriptions:
+        previous = series.previous_amount
+        # previous_amount is the charge before the latest, so this lasts until
+        # the next charge at the new price
+        if previous and series.last_amount - previous > _amount_tolerance(previous):
+            insights.append(price_increase_insight(
+                series.name, from_hundredths(previous), from_hundredths(series.last_amount)))
+
+    due = [series for series in active
+           if series.direction == 'expense' and today <= series.next_date <= today + timedelta(days=UPCOMING_DAYS)]
+    if due:
+        insights.append(upcoming_payments_insight(
+            [(series.name, series.next_date, series.kind) for series in due],
+            from_hundredths(sum(series.typical_amount for series in due))))
+
+    payroll = [series for series in active if series.kind == 'payroll']
+    if payroll:
+        main = max(payroll, key=monthly_amount)
+        insights.append(payroll_insight(main.name, main.cadence, main.next_date))
+
+    return insights
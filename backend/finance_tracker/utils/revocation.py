@@ -0,0 +1,258 @@
+"""Access token revocation (logout and revoke-all) without a query per request.
+
+Revocations are persisted in revoked_tokens (one row per logged-out jti,
+kept until the token would have expired) and token_cutoffs (revoke-all:
+every token a user was issued at or before a point in time). Each process
+keeps a Bloom filter of the revoked jtis, an exact set of recently revoked
+ones and the cutoffs in memory, so the common case of a token that was
+never revoked is answered with no I/O:
+
+1. a token issued at or before its user's cutoff is revoked
+2. a jti the Bloom filter has never seen is not revoked
+3. a jti in the exact set is revoked
+4. otherwise (a false positive, at JWT_DENYLIST_ERROR_RATE, or an older
+   revocation) the table is asked, and the answer is remembered
+
+The filter is built from the table on first use in each process and
+refreshed from it every JWT_DENYLIST_REFRESH seconds, which is how a
+logout on one worker reaches the others. Expired rows are pruned whenever
+it is rebuilt. Tokens are checked through flask-jwt-extended's blocklist
+hook, so jwt_required and login_required both honour revocations.
+
+Token iat claims have one-second resolution, so revoke-all also rejects a
+token issued later in the same second.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+REFRESH_OVERLAP = timedelta(seconds=5)  # re-read rows committed late by other processes
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing of one blake2b digest)."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def _epoch(moment):
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+class TokenDenylist:
+    """Bloom-filter-fronted view of the persisted token revocations."""
+
+    def __init__(self, capacity=100000, error_rate=0.001, exact_size=10000, refresh_interval=30,
+                 token_lifetime=timedelta(days=1), clock=time.monotonic):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.exact_size = exact_size
+        self.refresh_interval = refresh_interval
+        self.token_lifetime = token_lifetime
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def init_app(self, app, jwt):
+        self.capacity = app.config.get('JWT_DENYLIST_CAPACITY', self.capacity)
+        self.error_rate = app.config.get('JWT_DENYLIST_ERROR_RATE', self.error_rate)
+        self.exact_size = app.config.get('JWT_DENYLIST_EXACT_SIZE', self.exact_size)
+        self.refresh_interval = app.config.get('JWT_DENYLIST_REFRESH', self.refresh_interval)
+        self.token_lifetime = app.config.get('JWT_ACCESS_TOKEN_EXPIRES', self.token_lifetime)
+        self.reset()
+        jwt.token_in_blocklist_loader(self._check_payload)
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._exact = OrderedDict()
+            self._cutoffs = {}
+            self._watermark = None
+            self._refreshed_at = None
+            self.checks = self.bloom_misses = self.exact_hits = self.lookups = 0
+            self.false_positives = self.refreshes = self.rebuilds = 0
+
+    def _check_payload(self, jwt_header, jwt_payload):
+        return self.is_revoked(jwt_payload.get('jti'), int(jwt_payload['sub']), jwt_payload.get('iat'))
+
+    def is_revoked(self, jti, user_id, issued_at):
+        self._ensure_fresh()
+        self.checks += 1
+        cutoff = self._cutoffs.get(user_id)
+        if cutoff is not None and issued_at is not None and issued_at <= cutoff:
+            return True
+        if jti is None or jti not in self._bloom:
+            self.bloom_misses += 1
+            return False
+        if jti in self._exact:
+            self.exact_hits += 1
+            return True
+
+        from finance_tracker.extensions import db
+        from finance_tracker.models.revoked_token import RevokedToken
+
+        self.lookups += 1
+        try:
+            with db.engine.connect() as conn:
+                revoked = conn.scalar(
+                    db.select(RevokedToken.jti).where(RevokedToken.jti == jti)
+                ) is not None
+        except Exception as e:
+            # The filter says it may be revoked; don't let a failing lookup let it through
+            logging.error(f"Token denylist lookup failed: {str(e)}")
+            return True
+        if revoked:
+            with self._lock:
+                self._remember(jti)
+        else:
+            self.false_positives += 1
+        return revoked
+
+    def revoke(self, jti, user_id, expires_at):
+        """Persist a single token's revocation (logout)"""
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        from finance_tracker.extensions import db
+        from finance_tracker.models.revoked_token import RevokedToken
+
+        db.session.execute(
+            sqlite_insert(RevokedToken.__table__)
+            .values(jti=jti, user_id=user_id, expires_at=expires_at, revoked_at=datetime.utcnow())
+            .on_conflict_do_nothing(index_elements=['jti'])
+        )
+        db.session.commit()
+        self._ensure_fresh()
+        with self._lock:
+            self._bloom.add(jti)
+            self._remember(jti)
+
+    def revoke_all(self, user_id):
+        """Revoke every token issued to the user up to now; returns the cutoff"""
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        from finance_tracker.extensions import db
+        from finance_tracker.models.revoked_token import TokenCutoff
+
+        now = datetime.utcnow()
+        table = TokenCutoff.__table__
+        stmt = sqlite_insert(table).values(user_id=user_id, revoked_before=now, updated_at=now)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={'revoked_before': stmt.excluded.revoked_before, 'updated_at': stmt.excluded.updated_at}
+        ))
+        db.session.commit()
+        self._ensure_fresh()
+        with self._lock:
+            self._cutoffs[user_id] = _epoch(now)
+        return now
+
+    def _remember(self, jti):
+        self._exact[jti] = True
+        self._exact.move_to_end(jti)
+        while len(self._exact) > self.exact_size:
+            self._exact.popitem(last=False)
+
+    def _ensure_fresh(self):
+        if self._bloom is None:
+            with self._lock:
+                if self._bloom is None:
+                    self._rebuild()
+            return
+        if self._clock() - self._refreshed_at < self.refresh_interval:
+            return
+        # One thread refreshes; the others keep using the current filter meanwhile
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._refresh()
+        except Exception as e:
+            logging.error(f"Token denylist refresh failed: {str(e)}")
+        finally:
+            self._lock.release()
+
+    def _rebuild(self):
+        """Prune expired rows and rebuild the filter and cutoffs from the tables"""
+        from finance_tracker.extensions import db
+        from finance_tracker.models.revoked_token import RevokedToken, TokenCutoff
+
+        # Own connection, so the caller's session and transaction are left alone
+        now = datetime.utcnow()
+        with db.engine.begin() as conn:
+            conn.execute(db.delete(RevokedToken).where(RevokedToken.expires_at < now))
+            conn.execute(db.delete(TokenCutoff).where(TokenCutoff.revoked_before < now - self.token_lifetime))
+            jtis = conn.scalars(db.select(RevokedToken.jti)).all()
+            cutoffs = conn.execute(db.select(TokenCutoff.user_id, TokenCutoff.revoked_before)).all()
+
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        self._cutoffs = {user_id: _epoch(revoked_before) for user_id, revoked_before in cutoffs}
+        self._bloom = bloom
+        self._exact.clear()
+        self._watermark = now
+        self._refreshed_at = self._clock()
+        self.rebuilds += 1
+
+    def _refresh(self):
+        """Fold in revocations other processes made since the last refresh"""
+        from finance_tracker.extensions import db
+        from finance_tracker.models.revoked_token import RevokedToken, TokenCutoff
+
+        now = datetime.utcnow()
+        since = self._watermark - REFRESH_OVERLAP
+        with db.engine.connect() as conn:
+            jtis = conn.scalars(db.select(RevokedToken.jti).where(RevokedToken.revoked_at >= since)).all()
+            cutoffs = conn.execute(
+                db.select(TokenCutoff.user_id, TokenCutoff.revoked_before).where(TokenCutoff.updated_at >= since)
+            ).all()
+
+        if self._bloom.count + len(jtis) > self._bloom.capacity:
+            self._rebuild()
+            return
+        for jti in jtis:
+            if jti not in self._exact:
+                self._bloom.add(jti)
+                self._remember(jti)
+        for user_id, revoked_before in cutoffs:
+            self._cutoffs[user_id] = _epoch(revoked_before)
+        self._watermark = now
+        self._refreshed_at = self._clock()
+        self.refreshes += 1
+
+    def stats(self):
+        bloom = self._bloom
+        return {
+            'checks': self.checks,
+            'bloom_misses': self.bloom_misses,
+            'exact_hits': self.exact_hits,
+            'lookups': self.lookups,
+            'false_positives': self.false_positives,
+            'refreshes': self.refreshes,
+            'rebuilds': self.rebuilds,
+            'revoked_tokens': bloom.count if bloom else 0,
+            'bloom_bytes': len(bloom.bits) if bloom else 0,
+            'cutoffs': len(self._cutoffs),
+            'exact_size': len(self._exact),
+        }
@@ -0,0 +1,192 @@
+from datetime import datetime
+from sqlalchemy import event, func, inspect
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from finance_tracker.extensions import db
+from finance_tracker.models.rollup import MonthlyCategoryRollup
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.utils.money import from_hundredths
+
+UNCATEGORIZED = 'Uncategorized'
+
+
+def month_key(day):
+    return f'{day.year:04d}-{day.month:02d}'
+
+
+def accumulate(rows, sign=1, deltas=None):
+    """Fold transaction rows into {(user_id, month, category): [income, expenses, count]}.
+
+    Amounts are integer cents, so the totals are exact. Use sign=-1 to back
+    rows out of the rollups (deletes, old side of an update).
+    """
+    deltas = {} if deltas is None else deltas
+    for row in rows:
+        key = (row['user_id'], month_key(row['date']), row['category'] or UNCATEGORIZED)
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = [0, 0, 0]
+        amount = row['amount']
+        if amount >= 0:
+            delta[0] += sign * amount
+        else:
+            delta[1] -= sign * amount
+        delta[2] += sign
+    return deltas
+
+
+def apply_deltas(bind, deltas):
+    """Upsert accumulated deltas with a single executemany statement."""
+    if not deltas:
+        return
+    table = MonthlyCategoryRollup.__table__
+    now = datetime.utcnow()
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.month, table.c.category],
+        set_={
+            'income': table.c.income + stmt.excluded.income,
+            'expenses': table.c.expenses + stmt.excluded.expenses,
+            'transaction_count': table.c.transaction_count + stmt.excluded.transaction_count,
+            'updated_at': stmt.excluded.updated_at,
+        }
+    )
+    bind.execute(stmt, [
+        {
+            'user_id': user_id,
+            'month': month,
+            'category': category,
+            'income': income,
+            'expenses': expenses,
+            'transaction_count': count,
+            'updated_at': now,
+        }
+        for (user_id, month, category), (income, expenses, count) in deltas.items()
+    ])
+
+
+def _row(target, **overrides):
+    row = {
+        'user_id': target.user_id,
+        'date': target.date,
+        'amount': target.amount,
+        'category': target.category,
+    }
+    row.update(overrides)
+    return row
+
+
+@event.listens_for(Transaction, 'after_insert')
+def _transaction_inserted(mapper, connection, target):
+    apply_deltas(connection, accumulate([_row(target)]))
+
+
+@event.listens_for(Transaction, 'after_delete')
+def _transaction_deleted(mapper, connection, target):
+    apply_deltas(connection, accumulate([_row(target)], sign=-1))
+
+
+@event.listens_for(Transaction, 'after_update')
+def _transaction_updated(mapper, connection, target):
+    state = inspect(target)
+    previous = {}
+    for name in ('user_id', 'date', 'amount', 'category'):
+        history = state.attrs[name].history
+        if history.deleted:
+            previous[name] = history.deleted[0]
+    if not previous:
+        return
+    deltas = accumulate([_row(target, **previous)], sign=-1)
+    apply_deltas(connection, accumulate([_row(target)], deltas=deltas))
+
+
+# Read side: every query below is bounded by the number of (month, category)
+# buckets for one user and is served by the rollup primary key. Sums are
+# exact integer cents; they become dollars only in the returned dicts.
+
+def monthly_totals_statement(user_id, months=12, before=None):
+    R = MonthlyCategoryRollup
+    conditions = [R.user_id == user_id]
+    if before is not None:
+        conditions.append(R.month < before)
+    return (
+        db.select(R.month, func.sum(R.income), func.sum(R.expenses))
+        .where(*conditions)
+        .group_by(R.month)
+        .order_by(R.month.desc())
+        .limit(months)
+    )
+
+
+def monthly_totals(user_id, months=12, before=None):
+    """[(month, income cents, expenses cents), ...] for the latest `months` months, oldest first
+
+    `before` ('YYYY-MM') leaves out that month and any later one.
+    """
+    rows = db.session.execute(monthly_totals_statement(user_id, months, before)).all()
+    return [tuple(row) for row in reversed(rows)]
+
+
+def _trend_entry(month, income, expenses):
+    return {'month': month, 'income': from_hundredths(income), 'expenses': from_hundredths(expenses)}
+
+
+def monthly_trend(user_id, months=12):
+    return [_trend_entry(*row) for row in monthly_totals(user_id, months)]
+
+
+def category_distribution_statement(user_id, month):
+    R = MonthlyCategoryRollup
+    return (
+        db.select(R.category, R.expenses)
+        .where(R.user_id == user_id, R.month == month, R.expenses > 0)
+        .order_by(R.expenses.desc())
+    )
+
+
+def category_distribution(user_id, month):
+    rows = db.session.execute(category_distribution_statement(user_id, month)).all()
+    total = sum(expenses for _, expenses in rows)
+    return [
+        {
+            'category': category,
+            'value': from_hundredths(expenses),
+            'percentage': round(expenses / total * 100, 1)
+        }
+        for category, expenses in rows
+    ]
+
+
+def total_balance_statement(user_id):
+    R = MonthlyCategoryRollup
+    return (
+        db.select(func.coalesce(func.sum(R.income), 0), func.coalesce(func.sum(R.expenses), 0))
+        .where(R.user_id == user_id)
+    )
+
+
+def total_balance(user_id):
+    income, expenses = db.session.execute(total_balance_statement(user_id)).one()
+    return from_hundredths(income - expenses)
+
+
+def latest_month(user_id):
+    """Income/expenses for the most recent month with activity."""
+    trend = monthly_trend(user_id, months=1)
+    if not trend:
+        return {'month': None, 'income': 0, 'expenses': 0}
+    return trend[0]
+
+
+def financial_summary(user_id, months=12):
+    """Server-side equivalent of the payload the dashboard posts to /api/insights."""
+    totals = monthly_totals(user_id, months=months)
+    month, income, expenses = totals[-1] if totals else (None, 0, 0)
+    return {
+        'monthlyData': {
+            'income': from_hundredths(income),
+            'expenses': from_hundredths(expenses),
+            'balance': from_hundredths(income - expenses)
+        },
+        'monthlyTrend': [_trend_entry(*row) for row in totals],
+        'categoryDistribution': category_distribution(user_id, month) if month else []
+    }
@@ -0,0 +1,209 @@
+"""Validation and bulk application of savings goal/rule operations.
+
+The single-row routes and the :batch routes share the validators here, so
+both accept exactly the same payloads. A batch is a list of
+
+    {"op": "create", "data": {...}}
+    {"op": "update", "id": 7, "data": {...}}
+    {"op": "delete", "id": 7}
+
+Every operation is validated first and reported on individually. The valid
+ones are then written in one transaction with one statement per kind:
+an executemany INSERT ... RETURNING, a bulk UPDATE by primary key and a
+single DELETE ... WHERE id IN (...).
+"""
+from datetime import datetime
+from finance_tracker.extensions import db
+from finance_tracker.models.savings import SavingsGoal, SavingsRule
+from finance_tracker.utils.changes import mark_user_changed
+from finance_tracker.utils.money import Money, parse_percentage
+from finance_tracker.utils.serializers import serialize_rows
+
+MAX_BATCH = 500
+RULE_TYPES = ('round-up', 'percentage', 'fixed')
+
+
+class SavingsValidationError(ValueError):
+    """A goal/rule payload that can't be applied; the message is client-facing."""
+
+
+def _money(data, key):
+    """Cents from a decimal amount in the payload"""
+    try:
+        return Money.parse(data[key])
+    except ValueError:
+        raise SavingsValidationError(f'{key} must be a number')
+
+
+def _percentage(data, key):
+    try:
+        return parse_percentage(data[key])
+    except ValueError:
+        raise SavingsValidationError(f'{key} must be a number')
+
+
+def _deadline(data):
+    try:
+        return datetime.fromisoformat(data['deadline'])
+    except (TypeError, ValueError):
+        raise SavingsValidationError('Invalid deadline format')
+
+
+def goal_create_values(data):
+    if not data.get('name') or not data.get('target_amount'):
+        raise SavingsValidationError('Name and target amount are required')
+    return {
+        'name': data['name'],
+        'target_amount': _money(data, 'target_amount'),
+        'current_amount': Money(0),
+        'deadline': _deadline(data) if data.get('deadline') else None,
+    }
+
+
+def goal_update_values(data, existing=None):
+    values = {}
+    if data.get('name'):
+        values['name'] = data['name']
+    if data.get('target_amount'):
+        values['target_amount'] = _money(data, 'target_amount')
+    if data.get('current_amount'):
+        values['current_amount'] = _money(data, 'current_amount')
+    if data.get('deadline'):
+        values['deadline'] = _deadline(data)
+    return values
+
+
+def rule_create_values(data):
+    rule_type = data.get('type')
+    if not rule_type:
+        raise SavingsValidationError('Rule type is required')
+    if rule_type not in RULE_TYPES:
+        raise SavingsValidationError('Invalid rule type')
+    if rule_type == 'percentage' and not data.get('percentage'):
+        raise SavingsValidationError('Percentage is required for percentage-based rules')
+    if rule_type == 'fixed' and not data.get('amount'):
+        raise SavingsValidationError('Amount is required for fixed rules')
+    return {
+        'type': rule_type,
+        'amount': _money(data, 'amount') if rule_type == 'fixed' else None,
+        'percentage': _percentage(data, 'percentage') if rule_type == 'percentage' else None,
+        'is_active': bool(data.get('is_active', True)),
+    }
+
+
+def rule_update_values(data, existing):
+    """`existing` is the stored rule (anything with a .type)"""
+    values = {}
+    if data.get('is_active') is not None:
+        values['is_active'] = bool(data['is_active'])
+    if data.get('amount') and existing.type == 'fixed':
+        values['amount'] = _money(data, 'amount')
+    if data.get('percentage') and existing.type == 'percentage':
+        values['percentage'] = _percentage(data, 'percentage')
+    return values
+
+
+BATCH_MODELS = {
+    SavingsGoal: ('Goal', goal_create_values, goal_update_values, [SavingsGoal.id]),
+    SavingsRule: ('Rule', rule_create_values, rule_update_values, [SavingsRule.id, SavingsRule.type]),
+}
+
+
+def owned_statement(model, user_id, ids, columns):
+    return db.select(*columns).where(model.user_id == user_id, model.id.in_(ids))
+
+
+def _owned(model, user_id, ids, columns):
+    if not ids:
+        return {}
+    rows = db.session.execute(owned_statement(model, user_id, ids, columns))
+    return {row.id: row for row in rows}
+
+
+def apply_batch(model, user_id, operations):
+    """Validate and apply `operations`; returns one result dict per operation, in order.
+
+    Raises SavingsValidationError if the batch itself is malformed.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise SavingsValidationError('operations must be a non-empty list')
+    if len(operations) > MAX_BATCH:
+        raise SavingsValidationError(f'At most {MAX_BATCH} operations per batch')
+
+    label, create_values, update_values, lookup_columns = BATCH_MODELS[model]
+    ids = {op.get('id') for op in operations if isinstance(op, dict) and isinstance(op.get('id'), int)}
+    owned = _owned(model, user_id, ids, lookup_columns)
+
+    results = [None] * len(operations)
+    creates, updates, deletes, seen = [], [], [], set()
+    for index, op in enumerate(operations):
+        try:
+            if not isinstance(op, dict):
+                raise SavingsValidationError('Each operation must be an object')
+            kind, data = op.get('op'), op.get('data') or {}
+            if not isinstance(data, dict):
+                raise SavingsValidationError('data must be an object')
+            if kind == 'create':
+                creates.append((index, create_values(data)))
+                continue
+            if kind not in ('update', 'delete'):
+                raise SavingsValidationError("op must be 'create', 'update' or 'delete'")
+            target = op.get('id')
+            if target not in owned:
+                results[index] = {'index': index, 'status': 404, 'error': f'{label} not found'}
+                continue
+            if target in seen:
+                raise SavingsValidationError(f'{label} {target} appears more than once in this batch')
+            seen.add(target)
+            if kind == 'delete':
+                deletes.append((index, target))
+            else:
+                updates.append((index, target, update_values(data, owned[target])))
+        except SavingsValidationError as e:
+            results[index] = {'index': index, 'status': 400, 'error': str(e)}
+
+    now = datetime.utcnow()
+    try:
+        if creates:
+            # sort_by_parameter_order would make SQLAlchemy insert row by row on
+            # SQLite. Rows are inserted in VALUES order and SQLite hands each new
+            # row max(rowid) + 1, so the sorted ids line up with the parameters.
+            new_ids = sorted(db.session.scalars(
+                db.insert(model).returning(model.id),
+                [dict(values, user_id=user_id, created_at=now, updated_at=now) for _, values in creates]
+            ).all())
+            for (index, _), new_id in zip(creates, new_ids):
+                results[index] = {'index': index, 'status': 201, 'id': new_id}
+        changed = [(index, target, values) for index, target, values in updates if values]
+        if changed:
+            db.session.execute(db.update(model), [
+                dict(values, id=target, updated_at=now) for _, target, values in changed
+            ])
+        for index, target, _ in updates:
+            results[index] = {'index': index, 'status': 200, 'id': target}
+        if deletes:
+            db.session.execute(
+                db.delete(model).where(model.user_id == user_id, model.id.in_([t for _, t in deletes]))
+            )
+            for index, target in deletes:
+                results[index] = {'index': index, 'status': 204, 'id': target}
+
+        # Return created/updated rows as the single-row endpoints would
+        written = [r['id'] for r in results if r['status'] in (200, 201)]
+        if written:
+            fields = model.API_FIELDS
+            rows = db.session.execute(
+                db.select(*[getattr(model, name) for name in fields]).where(model.id.in_(written))
+            )
+            items = {item['id']: item for item in serialize_rows(model, rows, fields)}
+            for result in results:
+                if result['status'] in (200, 201):
+                    result['item'] = items[result['id']]
+
+        if creates or changed or deletes:
+            mark_user_changed(db.session, user_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return results
@@ -0,0 +1,230 @@
+"""Incremental savings rule engine.
+
+Rules apply to individual transactions:
+
+* ``round-up``   - each expense is rounded up to the next whole dollar and
+                   the spare change is saved (whole-dollar expenses save 0)
+* ``percentage`` - `percentage`% of each income transaction, to the
+                   nearest cent (half a cent rounds up)
+* ``fixed``      - `amount` for each expense
+
+Every user has a checkpoint: the highest transaction id already processed.
+A run reads only transactions above it, evaluates all active rules at once
+over NumPy arrays, adds the results to the per-(rule, month) totals in
+savings_contributions and moves the checkpoint, in one database
+transaction per batch. A rule applies to whatever is processed while it
+is active; transactions already behind the checkpoint are not re-evaluated
+when rules are added or changed. While a user has no active rule nothing
+is processed and the checkpoint stays put, so their first rule applies to
+the transactions they already have.
+
+Transaction ids are never reused (AUTOINCREMENT), so a transaction added
+later always lands above the checkpoint. When the Plaid sync modifies or
+removes a transaction already behind the checkpoint, revise_contributions()
+backs its old version out and counts the new one, with the rules active
+at that time.
+"""
+from datetime import datetime
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from finance_tracker.extensions import db
+from finance_tracker.models.savings import SavingsCheckpoint, SavingsContribution, SavingsRule
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.utils.rollups import month_key
+
+BATCH_SIZE = 50000
+RULE_TYPES = ('round-up', 'percentage', 'fixed')
+
+
+def rule_contributions(rules, amounts):
+    """(R, N) int64 array: the cents each of R rules saves from each of N transactions.
+
+    `rules` is a sequence of (type, amount cents, percentage basis points)
+    tuples and `amounts` are ledger cents (negative = expense). Everything
+    is integer arithmetic, so results don't depend on float rounding.
+    """
+    cents = np.asarray(amounts, dtype=np.int64)
+    kinds = np.array([RULE_TYPES.index(rule[0]) for rule in rules]).reshape(-1, 1)
+    fixed = np.array([rule[1] or 0 for rule in rules], dtype=np.int64).reshape(-1, 1)
+    basis_points = np.array([rule[2] or 0 for rule in rules], dtype=np.int64).reshape(-1, 1)
+
+    is_expense = cents < 0
+    spare_change = np.where(is_expense, (100 - (-cents) % 100) % 100, 0)
+    income = np.where(is_expense, 0, cents)
+
+    return np.select(
+        [kinds == 0, kinds == 1, kinds == 2],
+        [spare_change, (income * basis_points + 5000) // 10000, is_expense * fixed],
+    )
+
+
+def monthly_totals(contributions, months):
+    """Sum an (R, N) cents array into (R, M) cent totals per distinct month.
+
+    Returns (month_labels, totals, counts) where counts is the number of
+    transactions that contributed a non-zero amount.
+    """
+    labels, month_index = np.unique(np.asarray(months), return_inverse=True)
+    n_rules, n_months = contributions.shape[0], len(labels)
+    flat = (np.arange(n_rules).reshape(-1, 1) * n_months + month_index).ravel()
+    size = n_rules * n_months
+    # Integer scatter-add; bincount would go through float64 weights
+    totals = np.zeros(size, dtype=np.int64)
+    np.add.at(totals, flat, contributions.ravel())
+    counts = np.bincount(flat, weights=(contributions.ravel() != 0), minlength=size)
+    return labels, totals.reshape(n_rules, n_months), counts.reshape(n_rules, n_months).astype(np.int64)
+
+
+def _save_contributions(user_id, rule_ids, labels, totals, counts):
+    table = SavingsContribution.__table__
+    now = datetime.utcnow()
+    rows = [
+        {
+            'user_id': user_id,
+            'rule_id': rule_id,
+            'month': str(labels[m]),
+            'amount': int(totals[r, m]),
+            'transaction_count': int(counts[r, m]),
+            'updated_at': now,
+        }
+        for r, rule_id in enumerate(rule_ids)
+        for m in range(len(labels))
+        if counts[r, m]
+    ]
+    if not rows:
+        return
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.rule_id, table.c.month],
+        set_={
+            'amount': table.c.amount + stmt.excluded.amount,
+            'transaction_count': table.c.transaction_count + stmt.excluded.transaction_count,
+            'updated_at': stmt.excluded.updated_at,
+        }
+    )
+    db.session.execute(stmt, rows)
+
+
+def checkpoint_statement(user_id):
+    return db.select(SavingsCheckpoint.last_transaction_id).where(SavingsCheckpoint.user_id == user_id)
+
+
+def active_rules_statement(user_id):
+    return (
+        db.select(SavingsRule.id, SavingsRule.type, SavingsRule.amount, SavingsRule.percentage)
+        .where(SavingsRule.user_id == user_id, SavingsRule.is_active == True)
+        .order_by(SavingsRule.id)
+    )
+
+
+def transactions_since_statement(user_id, last_id, batch_size=BATCH_SIZE):
+    return (
+        db.select(Transaction.id, func.substr(Transaction.date, 1, 7), Transaction.amount)
+        .where(Transaction.user_id == user_id, Transaction.id > last_id)
+        .order_by(Transaction.id)
+        .limit(batch_size)
+    )
+
+
+def contribution_totals_statement(user_id, month=None):
+    stmt = (db.select(SavingsContribution.rule_id, func.sum(SavingsContribution.amount))
+            .where(SavingsContribution.user_id == user_id)
+            .group_by(SavingsContribution.rule_id))
+    if month is not None:
+        stmt = stmt.where(SavingsContribution.month == month)
+    return stmt
+
+
+def _active_rules(user_id):
+    rules = db.session.execute(active_rules_statement(user_id)).all()
+    return [rule for rule in rules if rule.type in RULE_TYPES]
+
+
+def _checkpoint(user_id):
+    db.session.execute(
+        sqlite_insert(SavingsCheckpoint.__table__)
+        .values(user_id=user_id, last_transaction_id=0, updated_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=['user_id'])
+    )
+    return db.session.scalar(checkpoint_statement(user_id))
+
+
+def run_rules(user_id, batch_size=BATCH_SIZE):
+    """Process every transaction since the user's checkpoint; returns the count processed"""
+    try:
+        last_id = _checkpoint(user_id)
+        rules = _active_rules(user_id)
+        if not rules:
+            db.session.commit()
+            return 0
+        processed = 0
+
+        while True:
+            rows = db.session.execute(transactions_since_statement(user_id, last_id, batch_size)).all()
+            if not rows:
+                break
+            ids, months, amounts = zip(*rows)
+
+            contributions = rule_contributions([rule[1:] for rule in rules], amounts)
+            labels, totals, counts = monthly_totals(contributions, months)
+            _save_contributions(user_id, [rule.id for rule in rules], labels, totals, counts)
+
+            # Compare-and-set so two concurrent runs can't both count a batch
+            moved = db.session.execute(
+                db.update(SavingsCheckpoint)
+                .where(SavingsCheckpoint.user_id == user_id,
+                       SavingsCheckpoint.last_transaction_id == last_id)
+                .values(last_transaction_id=ids[-1], updated_at=datetime.utcnow())
+            ).rowcount
+            if not moved:
+                db.session.rollback()
+                break
+            db.session.commit()
+            last_id = ids[-1]
+            processed += len(ids)
+            if len(rows) < batch_size:
+                break
+
+        db.session.commit()
+        return processed
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def revise_contributions(user_id, previous, revised):
+    """Re-count processed transactions that were modified or removed.
+
+    `previous` are the stored versions (dicts with id, date, amount) of the
+    touched transactions and `revised` the new versions of the modified
+    ones. Those at or below the checkpoint were counted already: the old
+    version is backed out and the new one added, in the caller's database
+    transaction. Newer ones are left to the next run.
+    """
+    last_id = db.session.scalar(checkpoint_statement(user_id))
+    previous = [row for row in previous if last_id and row['id'] <= last_id]
+    revised = [row for row in revised if last_id and row['id'] <= last_id]
+    rules = _active_rules(user_id) if previous or revised else []
+    if not rules:
+        return
+    rule_ids = [rule.id for rule in rules]
+    for sign, rows in ((-1, previous), (1, revised)):
+        if not rows:
+            continue
+        contributions = rule_contributions([rule[1:] for rule in rules], [row['amount'] for row in rows])
+        labels, totals, counts = monthly_totals(contributions, [month_key(row['date']) for row in rows])
+        _save_contributions(user_id, rule_ids, labels, sign * totals, sign * counts)
+
+
+def run_all(batch_size=BATCH_SIZE):
+    """Run the engine for every user with an active rule; returns {user_id: processed}"""
+    user_ids = db.session.scalars(
+        db.select(SavingsRule.user_id).where(SavingsRule.is_active == True).distinct()
+    ).all()
+    return {user_id: run_rules(user_id, batch_size) for user_id in user_ids}
+
+
+def contribution_totals(user_id, month=None):
+    """{rule_id: cents} saved in `month` (or all time when month is None)"""
+    return dict(db.session.execute(contribution_totals_statement(user_id, month)).all())
@@ -0,0 +1,165 @@
+"""Full-text search over transactions (description, merchant) and savings goal names.
+
+Each searchable table has an FTS5 index next to it, kept in sync by
+triggers on the table itself, so every write path (ORM, the statement
+importer's bulk INSERTs, Plaid upserts, deletes) updates it in the same
+transaction without any application code.
+
+The indexes are contentless (content=''): they store only the inverted
+index, not a second copy of the text, and a search joins the matches back
+to the table. An entry's rowid is ``user_id << 32 | id``, so one user's
+entries are a contiguous rowid range and a query seeks straight to it
+instead of matching everyone's rows and filtering afterwards.
+
+Queries are made of plain words, each matched as a prefix ("cof" finds
+"Coffee"), and all of them must match. Prefixes of up to PREFIX_INDEX
+characters are served by FTS5 prefix indexes; a longer word is matched
+through the index's terms that start with it.
+
+Ranking: every match is scored by FTS5's bm25(), per column, merchant and
+goal names weighted above descriptions, newest first among equal scores,
+and pages are LIMIT/OFFSET slices of that order, so any match can be
+reached however old it is. Scoring is done on the index alone and only the
+page's rows are read from the table, but every match is still scored, so a
+query costs time in proportion to how many of the user's rows it matches: a
+couple of milliseconds for a merchant, ~20 ms for a two-letter prefix that
+matches all of a 30k-row ledger.
+
+The schema is created by migration d9c3e7a1f5b2 and, for databases made
+with create_all() (the benchmarks), by DDL hooks on the tables below.
+"""
+import re
+import unicodedata
+from sqlalchemy import DDL, event, text
+from finance_tracker.extensions import db
+from finance_tracker.models.savings import SavingsGoal
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.utils.serializers import serialize_rows
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MAX_TERMS = 8
+PREFIX_INDEX = 6
+ID_BITS = 32
+
+# kind: (model, FTS table, {indexed column: ranking weight})
+INDEXES = {
+    'transactions': (Transaction, 'transactions_fts', {'description': 1.0, 'merchant': 2.0}),
+    'goals': (SavingsGoal, 'savings_goals_fts', {'name': 1.0}),
+}
+
+# Words as FTS5's unicode61 tokenizer sees them: runs of letters and digits
+_TOKEN = re.compile(r'[^\W_]+')
+
+
+class SearchArgsError(ValueError):
+    """Invalid q/type/limit/offset query parameters."""
+
+
+def schema_statements(table, fts, columns):
+    """DDL for `table`'s FTS index and the triggers that maintain it"""
+    names = ', '.join(columns)
+    rowid = '(new.user_id << 32) | new.id'
+    old_rowid = '(old.user_id << 32) | old.id'
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    prefixes = ' '.join(str(length) for length in range(2, PREFIX_INDEX + 1))
+    # Contentless tables are told exactly what to remove
+    delete = f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', {old_rowid}, {old});"
+    insert = f'INSERT INTO {fts} (rowid, {names}) VALUES ({rowid}, {new});'
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='', prefix='{prefixes}', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f'CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END',
+        f'CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END',
+        f'CREATE TRIGGER {fts}_update AFTER UPDATE OF id, user_id, {names} ON {table} '
+        f'BEGIN {delete} {insert} END',
+    ]
+
+
+def _install_schema_hooks():
+    for model, fts, columns in INDEXES.values():
+        table = model.__table__
+        for statement in schema_statements(table.name, fts, columns):
+            event.listen(table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+        event.listen(table, 'before_drop', DDL(f'DROP TABLE IF EXISTS {fts}').execute_if(dialect='sqlite'))
+
+
+_install_schema_hooks()
+
+
+def tokens(value):
+    """Lowercased words of `value` with diacritics removed, like the FTS tokenizer"""
+    if not value:
+        return []
+    if not value.isascii():
+        value = ''.join(c for c in unicodedata.normalize('NFKD', value) if not unicodedata.combining(c))
+    return _TOKEN.findall(value.lower())
+
+
+def match_expression(terms):
+    """FTS5 MATCH string requiring every term as a prefix"""
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _int_arg(args, name, default, low, high=None):
+    value = args.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise SearchArgsError(f'{name} must be an integer')
+    if value < low or (high is not None and value > high):
+        bounds = f'between {low} and {high}' if high is not None else f'at least {low}'
+        raise SearchArgsError(f'{name} must be {bounds}')
+    return value
+
+
+def parse_search_args(args):
+    """(query, kinds, limit, offset) from /api/search's query string"""
+    query = (args.get('q') or '').strip()
+    if not query:
+        raise SearchArgsError('q is required')
+    kind = args.get('type')
+    if kind and kind not in INDEXES:
+        raise SearchArgsError(f"type must be one of: {', '.join(INDEXES)}")
+    kinds = [kind] if kind else list(INDEXES)
+    limit = _int_arg(args, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+    offset = _int_arg(args, 'offset', 0, 0)
+    return query, kinds, limit, offset
+
+
+def search_statement(kind):
+    """One ranked page of `kind` rows for the :expression in rowids :first..:last"""
+    model, fts, columns = INDEXES[kind]
+    table = model.__table__.name
+    weights = ', '.join(str(columns[name]) for name in columns)
+    # Ranked on the index alone; only the page's rows are read from the table
+    return text(
+        f"SELECT {', '.join(f'{table}.{name}' for name in model.API_FIELDS)} "
+        f'FROM (SELECT rowid, bm25({fts}, {weights}) AS score FROM {fts} '
+        f'WHERE {fts} MATCH :expression AND rowid BETWEEN :first AND :last '
+        f'ORDER BY score, rowid DESC LIMIT :limit OFFSET :offset) AS ranked '
+        f'JOIN {table} ON {table}.id = (ranked.rowid & {(1 << ID_BITS) - 1}) '
+        f'ORDER BY ranked.score, ranked.rowid DESC'
+    ).columns(*(model.__table__.c[name] for name in model.API_FIELDS))
+
+
+def search_params(user_id, terms, limit=DEFAULT_LIMIT, offset=0):
+    first = int(user_id) << ID_BITS
+    return {'expression': match_expression(terms), 'first': first, 'last': first + (1 << ID_BITS) - 1,
+            'limit': limit, 'offset': offset}
+
+
+def search(user_id, query, kind, limit=DEFAULT_LIMIT, offset=0):
+    """One page of the user's `kind` rows matching `query`, best match first.
+
+    Returns (rows as API dicts, offset of the next page or None).
+    """
+    model = INDEXES[kind][0]
+    terms = tokens(query)[:MAX_TERMS]
+    if not terms:
+        return [], None
+    # One extra row says whether another page follows
+    rows = db.session.execute(search_statement(kind), search_params(user_id, terms, limit + 1, offset)).all()
+    next_offset = offset + limit if len(rows) > limit else None
+    return list(serialize_rows(model, rows[:limit], model.API_FIELDS)), next_offset
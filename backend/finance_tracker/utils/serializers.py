@@ -0,0 +1,95 @@
+"""Shared model serialization.
+
+Each model lists its public keys in API_FIELDS. field_plan() turns a
+(model, fields) pair into a cached tuple of (name, formatter) steps, where
+only date/datetime columns (ISO strings) and fixed-point columns (cents to
+dollars, basis points to percent) get a formatter, so serializing is a dict
+build with no per-field type checks.
+
+* serialize(obj)                     - an ORM instance (what to_dict() uses)
+* serialize_rows(model, rows, names) - column-projected Core rows, with no
+                                       ORM hydration at all
+
+FastJSONProvider replaces Flask's JSON provider. It encodes with orjson
+when installed, keeping jsonify's output (sorted keys, Flask's handling of
+dates and other non-JSON types), and falls back to the stdlib encoder.
+"""
+from functools import lru_cache
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import Date, DateTime
+from finance_tracker.utils.money import FixedPoint, from_hundredths
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+@lru_cache(maxsize=None)
+def field_plan(model, fields=None):
+    """((name, formatter or None), ...) for `fields` of `model` (default API_FIELDS)"""
+    columns = model.__table__.columns
+    plan = []
+    for name in fields or model.API_FIELDS:
+        column_type = columns[name].type
+        if isinstance(column_type, (Date, DateTime)):
+            plan.append((name, _isoformat))
+        elif isinstance(column_type, FixedPoint):
+            plan.append((name, from_hundredths))
+        else:
+            plan.append((name, None))
+    return tuple(plan)
+
+
+def serialize(obj, fields=None):
+    return {
+        name: formatter(getattr(obj, name)) if formatter else getattr(obj, name)
+        for name, formatter in field_plan(type(obj), fields)
+    }
+
+
+def serialize_rows(model, rows, fields):
+    """Yield dicts from rows whose columns are exactly `fields`, in order"""
+    plan = field_plan(model, tuple(fields))
+    names = [name for name, _ in plan]
+    formatted = [(index, formatter) for index, (_, formatter) in enumerate(plan) if formatter]
+    if not formatted:
+        for row in rows:
+            yield dict(zip(names, row))
+        return
+    for row in rows:
+        values = list(row)
+        for index, formatter in formatted:
+            values[index] = formatter(values[index])
+        yield dict(zip(names, values))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify()/current_app.json backed by orjson when it's available"""
+
+    def dumps(self, obj, **kwargs):
+        # Pretty-printing (debug mode) and custom encoder options stay on the stdlib path
+        if orjson is None or set(kwargs) - {'separators'}:
+            return super().dumps(obj, **kwargs)
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=self.default, option=options).decode()
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # The stdlib parser also accepts NaN/Infinity, or raises the usual error
+            return super().loads(s, **kwargs)
+
@@ -0,0 +1,73 @@
+"""SQLite engine profiles.
+
+DATABASE_PROFILE picks how the engine is tuned:
+
+* ``default``    - stock pysqlite/SQLAlchemy settings (rollback journal,
+                   5s lock timeout, default pool).
+* ``production`` - WAL journaling plus per-connection pragmas that let
+                   readers run alongside a writer, with a sized pool.
+
+The app only runs on SQLite: upserts use its INSERT .. ON CONFLICT, search
+uses FTS5 and the migrations rely on sqlite_sequence, so engine_options()
+rejects any other DATABASE_URL instead of failing on the first commit.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+PROFILES = {
+    'default': {
+        'pragmas': {},
+        'engine_options': {},
+    },
+    'production': {
+        'pragmas': {
+            'journal_mode': 'WAL',         # readers never block the writer
+            'synchronous': 'NORMAL',       # fsync on checkpoint, safe with WAL
+            'busy_timeout': 5000,          # ms to wait on a locked database
+            'cache_size': -65536,          # 64 MiB page cache per connection
+            'mmap_size': 268435456,        # 256 MiB memory-mapped reads
+            'temp_store': 'MEMORY',
+        },
+        'engine_options': {
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_timeout': 30,
+            'pool_recycle': 3600,
+            'connect_args': {'timeout': 5, 'check_same_thread': False},
+        },
+    },
+}
+
+
+def is_sqlite_file(uri):
+    return uri.startswith('sqlite:///') and ':memory:' not in uri and 'mode=memory' not in uri
+
+
+def engine_options(profile, uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for a profile (pool sizing only applies to file databases)"""
+    if profile not in PROFILES:
+        raise ValueError(f'Unknown DATABASE_PROFILE {profile!r}; choose from {", ".join(PROFILES)}')
+    if make_url(uri).get_backend_name() != 'sqlite':
+        raise ValueError(f'DATABASE_URL must be a sqlite: URL, got {uri!r}')
+    if not is_sqlite_file(uri):
+        return {}
+    options = dict(PROFILES[profile]['engine_options'])
+    if 'connect_args' in options:
+        options['connect_args'] = dict(options['connect_args'])
+    return options
+
+
+def install_pragmas(engine, profile):
+    """Run the profile's PRAGMA statements on every new DBAPI connection"""
+    pragmas = PROFILES[profile]['pragmas']
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
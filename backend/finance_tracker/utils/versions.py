@@ -0,0 +1,94 @@
+"""Per-user data versions and conditional GETs.
+
+Every commit that changes a user's data (anything that reaches
+finance_tracker.utils.changes) bumps that user's row in user_data_versions
+inside the same transaction, so the counter can never run ahead of, or
+behind, the data it describes.
+
+Views decorated with conditional_on_user_data() answer GET/HEAD with a
+weak ETag and Last-Modified derived from the counter. The ETag also
+carries a digest of the path and query string, since ?fields=, ?after=,
+?q= and friends select different bodies from the same data. A request whose
+If-None-Match (or, without one, If-Modified-Since) still matches gets a
+304 after a single primary-key lookup, before the view loads anything.
+"""
+import hashlib
+import json
+from datetime import datetime
+from functools import wraps
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from werkzeug.http import is_resource_modified
+from finance_tracker.extensions import db
+from finance_tracker.models.data_version import UserDataVersion
+from finance_tracker.utils.changes import pending_user_ids
+
+
+@event.listens_for(Session, 'before_commit')
+def _bump_versions(session):
+    # Flush first so changes still pending in the unit of work are collected too
+    session.flush()
+    user_ids = pending_user_ids(session)
+    if not user_ids:
+        return
+    table = UserDataVersion.__table__
+    now = datetime.utcnow()
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={'version': table.c.version + 1, 'updated_at': stmt.excluded.updated_at}
+    )
+    session.execute(stmt, [
+        {'user_id': user_id, 'version': 1, 'updated_at': now} for user_id in sorted(user_ids)
+    ])
+
+
+def data_version(user_id):
+    """(version, last change time or None) for the user's data"""
+    row = db.session.execute(
+        db.select(UserDataVersion.version, UserDataVersion.updated_at)
+        .where(UserDataVersion.user_id == user_id)
+    ).first()
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def request_variant():
+    """Short digest of the request path and its query args, in sorted order"""
+    key = json.dumps([request.path, sorted(request.args.items(multi=True))])
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def conditional_on_user_data(view):
+    """Add validators to a JWT-protected GET view and answer 304 when they match.
+
+    Goes below @login_required/@jwt_required. The version is read before
+    the view runs, so a response is never tagged newer than its body.
+    """
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(*args, **kwargs)
+
+        user_id = int(get_jwt_identity())
+        version, last_modified = data_version(user_id)
+        etag = f'{user_id}.{version}.{request_variant()}'
+
+        if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag, weak=True)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        # Per-user data: clients may keep it but must revalidate each time
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+    return decorated_function
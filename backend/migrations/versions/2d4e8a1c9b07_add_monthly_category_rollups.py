@@ -0,0 +1,48 @@
+"""Add monthly category rollups
+
+Revision ID: 2d4e8a1c9b07
+Revises: 6fbcfe307a4c
+Create Date: 2026-10-17 10:02:17.584112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d4e8a1c9b07'
+down_revision = '6fbcfe307a4c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('monthly_category_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('income', sa.Float(), nullable=False),
+    sa.Column('expenses', sa.Float(), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'month', 'category')
+    )
+    # Backfill from any ledger rows imported before the rollups existed
+    op.execute("""
+        INSERT INTO monthly_category_rollups
+            (user_id, month, category, income, expenses, transaction_count, updated_at)
+        SELECT user_id,
+               substr(date, 1, 7),
+               COALESCE(category, 'Uncategorized'),
+               SUM(CASE WHEN amount >= 0 THEN amount ELSE 0 END),
+               SUM(CASE WHEN amount < 0 THEN -amount ELSE 0 END),
+               COUNT(*),
+               CURRENT_TIMESTAMP
+        FROM transactions
+        GROUP BY user_id, substr(date, 1, 7), COALESCE(category, 'Uncategorized')
+    """)
+
+
+def downgrade():
+    op.drop_table('monthly_category_rollups')
@@ -0,0 +1,78 @@
+"""Add savings and plaid tables with user_id access-path indexes
+
+Revision ID: 4a7d2c6e8f10
+Revises: 9c1f5e2ab7d3
+Create Date: 2026-10-17 12:40:51.220614
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a7d2c6e8f10'
+down_revision = '9c1f5e2ab7d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing databases may already have these tables from db.create_all(),
+    # so only create what is missing and always add the indexes.
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('savings_goals'):
+        op.create_table('savings_goals',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('target_amount', sa.Float(), nullable=False),
+        sa.Column('current_amount', sa.Float(), nullable=True),
+        sa.Column('deadline', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not inspector.has_table('savings_rules'):
+        op.create_table('savings_rules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=True),
+        sa.Column('percentage', sa.Float(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not inspector.has_table('plaid_items'):
+        op.create_table('plaid_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('plaid_item_id', sa.String(length=255), nullable=False),
+        sa.Column('access_token', sa.String(length=255), nullable=False),
+        sa.Column('institution_id', sa.String(length=255), nullable=True),
+        sa.Column('institution_name', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('access_token'),
+        sa.UniqueConstraint('plaid_item_id')
+        )
+
+    op.create_index('ix_savings_goals_user_id_id', 'savings_goals', ['user_id', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_savings_rules_user_id_is_active', 'savings_rules', ['user_id', 'is_active'], unique=False, if_not_exists=True)
+    op.create_index('ix_plaid_items_user_id', 'plaid_items', ['user_id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_plaid_items_user_id', table_name='plaid_items')
+    op.drop_index('ix_savings_rules_user_id_is_active', table_name='savings_rules')
+    op.drop_index('ix_savings_goals_user_id_id', table_name='savings_goals')
+    op.drop_table('plaid_items')
+    op.drop_table('savings_rules')
+    op.drop_table('savings_goals')
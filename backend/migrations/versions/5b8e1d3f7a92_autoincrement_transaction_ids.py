@@ -0,0 +1,64 @@
+"""Never reuse transaction ids
+
+Revision ID: 5b8e1d3f7a92
+Revises: d9c3e7a1f5b2
+Create Date: 2026-10-18 09:12:44.180365
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e1d3f7a92'
+down_revision = 'd9c3e7a1f5b2'
+branch_labels = None
+depends_on = None
+
+# The savings rule engine and the recurring detector checkpoint on the
+# highest transaction id they have processed. Without AUTOINCREMENT SQLite
+# hands out max(id) + 1, so a row inserted after the newest one was deleted
+# (Plaid "removed") could get an id at or below a checkpoint and never be
+# processed. The table is rebuilt with AUTOINCREMENT; the rebuild drops the
+# full-text search triggers (d9c3e7a1f5b2), which are recreated, and the
+# existing index entries stay valid since every row keeps its id. The id
+# sequence starts above every checkpoint, in case the rows they reached
+# were deleted before this migration.
+FTS = 'transactions_fts'
+FTS_COLUMNS = ('description', 'merchant')
+
+
+def _recreate_search_triggers():
+    names = ', '.join(FTS_COLUMNS)
+    new = ', '.join(f'new.{column}' for column in FTS_COLUMNS)
+    old = ', '.join(f'old.{column}' for column in FTS_COLUMNS)
+    delete = f"INSERT INTO {FTS} ({FTS}, rowid, {names}) VALUES ('delete', (old.user_id << 32) | old.id, {old});"
+    insert = f'INSERT INTO {FTS} (rowid, {names}) VALUES ((new.user_id << 32) | new.id, {new});'
+    op.execute(f'CREATE TRIGGER {FTS}_insert AFTER INSERT ON transactions BEGIN {insert} END')
+    op.execute(f'CREATE TRIGGER {FTS}_delete AFTER DELETE ON transactions BEGIN {delete} END')
+    op.execute(f'CREATE TRIGGER {FTS}_update AFTER UPDATE OF id, user_id, {names} ON transactions '
+               f'BEGIN {delete} {insert} END')
+
+
+def _rebuild(autoincrement):
+    with op.batch_alter_table('transactions', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': autoincrement}) as batch_op:
+        pass
+    _recreate_search_triggers()
+
+
+def upgrade():
+    _rebuild(True)
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'transactions'")
+    op.execute("""
+        INSERT INTO sqlite_sequence (name, seq)
+        SELECT 'transactions', MAX(
+            (SELECT COALESCE(MAX(id), 0) FROM transactions),
+            (SELECT COALESCE(MAX(last_transaction_id), 0) FROM savings_checkpoints),
+            (SELECT COALESCE(MAX(last_transaction_id), 0) FROM recurring_checkpoints)
+        )
+    """)
+
+
+def downgrade():
+    _rebuild(False)
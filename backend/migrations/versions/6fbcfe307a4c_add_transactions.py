@@ -0,0 +1,39 @@
+"""Add transactions ledger
+
+Revision ID: 6fbcfe307a4c
+Revises: b18bf93069de
+Create Date: 2026-10-17 09:12:44.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6fbcfe307a4c'
+down_revision = 'b18bf93069de'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('transactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('external_id', sa.String(length=255), nullable=True),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('merchant', sa.String(length=255), nullable=True),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'external_id', name='uq_transactions_user_id_external_id')
+    )
+    op.create_index('ix_transactions_user_id_date', 'transactions', ['user_id', 'date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_transactions_user_id_date', table_name='transactions')
+    op.drop_table('transactions')
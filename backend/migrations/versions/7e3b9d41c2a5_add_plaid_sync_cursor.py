@@ -0,0 +1,28 @@
+"""Add transactions sync cursor to plaid items
+
+Revision ID: 7e3b9d41c2a5
+Revises: 4a7d2c6e8f10
+Create Date: 2026-10-17 13:58:26.771049
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e3b9d41c2a5'
+down_revision = '4a7d2c6e8f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('plaid_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('transactions_cursor', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('last_synced_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('plaid_items', schema=None) as batch_op:
+        batch_op.drop_column('last_synced_at')
+        batch_op.drop_column('transactions_cursor')
@@ -0,0 +1,32 @@
+"""Widen users.password_hash for scrypt and high-cost pbkdf2 hashes
+
+Revision ID: 9c1f5e2ab7d3
+Revises: 2d4e8a1c9b07
+Create Date: 2026-10-17 11:25:03.907431
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c1f5e2ab7d3'
+down_revision = '2d4e8a1c9b07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=128),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=128),
+               existing_nullable=False)
@@ -0,0 +1,71 @@
+"""Store money as integer cents and percentages as basis points
+
+Revision ID: a7d9e3f1c2b8
+Revises: 0b6e4f2a9d35
+Create Date: 2026-10-17 21:14:52.301877
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d9e3f1c2b8'
+down_revision = '0b6e4f2a9d35'
+branch_labels = None
+depends_on = None
+
+# (table, column, nullable); every one is scaled by 100, cents or basis points
+FIXED_POINT_COLUMNS = (
+    ('transactions', 'amount', False),
+    ('savings_goals', 'target_amount', False),
+    ('savings_goals', 'current_amount', True),
+    ('savings_rules', 'amount', True),
+    ('savings_rules', 'percentage', True),
+    ('savings_contributions', 'amount', False),
+)
+
+ROLLUP_COLUMNS = (
+    ('monthly_category_rollups', 'income', False),
+    ('monthly_category_rollups', 'expenses', False),
+)
+
+
+def _alter(columns, from_type, to_type):
+    tables = {}
+    for table, column, nullable in columns:
+        tables.setdefault(table, []).append((column, nullable))
+    for table, table_columns in tables.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column, nullable in table_columns:
+                batch_op.alter_column(column, existing_type=from_type, type_=to_type,
+                                      existing_nullable=nullable)
+
+
+def upgrade():
+    for table, column, _ in FIXED_POINT_COLUMNS:
+        op.execute(f'UPDATE {table} SET {column} = ROUND({column} * 100)')
+    _alter(FIXED_POINT_COLUMNS + ROLLUP_COLUMNS, sa.Float(), sa.Integer())
+
+    # Rebuild the rollups from the converted ledger rather than scaling the
+    # float totals, so they start out exact
+    op.execute('DELETE FROM monthly_category_rollups')
+    op.execute("""
+        INSERT INTO monthly_category_rollups
+            (user_id, month, category, income, expenses, transaction_count, updated_at)
+        SELECT user_id,
+               substr(date, 1, 7),
+               COALESCE(category, 'Uncategorized'),
+               SUM(CASE WHEN amount >= 0 THEN amount ELSE 0 END),
+               SUM(CASE WHEN amount < 0 THEN -amount ELSE 0 END),
+               COUNT(*),
+               CURRENT_TIMESTAMP
+        FROM transactions
+        GROUP BY user_id, substr(date, 1, 7), COALESCE(category, 'Uncategorized')
+    """)
+
+
+def downgrade():
+    _alter(FIXED_POINT_COLUMNS + ROLLUP_COLUMNS, sa.Integer(), sa.Float())
+    for table, column, _ in FIXED_POINT_COLUMNS + ROLLUP_COLUMNS:
+        op.execute(f'UPDATE {table} SET {column} = {column} / 100.0')
@@ -0,0 +1,44 @@
+"""Add savings contributions and rule engine checkpoints
+
+Revision ID: c5a8f2d6e391
+Revises: 7e3b9d41c2a5
+Create Date: 2026-10-17 15:12:40.318274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a8f2d6e391'
+down_revision = '7e3b9d41c2a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('savings_contributions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('rule_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'rule_id', 'month')
+    )
+    op.create_table('savings_checkpoints',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('last_transaction_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_transactions_user_id_id', 'transactions', ['user_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_transactions_user_id_id', table_name='transactions')
+
+    op.drop_table('savings_checkpoints')
+    op.drop_table('savings_contributions')
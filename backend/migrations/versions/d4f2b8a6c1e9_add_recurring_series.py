@@ -0,0 +1,52 @@
+"""Add recurring series and detector checkpoints
+
+Revision ID: d4f2b8a6c1e9
+Revises: a7d9e3f1c2b8
+Create Date: 2026-10-17 22:41:09.506213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f2b8a6c1e9'
+down_revision = 'a7d9e3f1c2b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('recurring_series',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('merchant_key', sa.String(length=100), nullable=False),
+    sa.Column('direction', sa.String(length=7), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('kind', sa.String(length=20), nullable=True),
+    sa.Column('cadence', sa.String(length=20), nullable=True),
+    sa.Column('interval_days', sa.Integer(), nullable=True),
+    sa.Column('typical_amount', sa.Integer(), nullable=True),
+    sa.Column('last_amount', sa.Integer(), nullable=False),
+    sa.Column('previous_amount', sa.Integer(), nullable=True),
+    sa.Column('occurrences', sa.Integer(), nullable=False),
+    sa.Column('first_date', sa.Date(), nullable=False),
+    sa.Column('last_date', sa.Date(), nullable=False),
+    sa.Column('next_date', sa.Date(), nullable=True),
+    sa.Column('history', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'merchant_key', 'direction')
+    )
+    op.create_table('recurring_checkpoints',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('last_transaction_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('recurring_checkpoints')
+    op.drop_table('recurring_series')
@@ -0,0 +1,50 @@
+"""Add FTS5 search indexes for transactions and savings goals
+
+Revision ID: d9c3e7a1f5b2
+Revises: d4f2b8a6c1e9
+Create Date: 2026-10-17 23:27:35.840129
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9c3e7a1f5b2'
+down_revision = 'd4f2b8a6c1e9'
+branch_labels = None
+depends_on = None
+
+# (table, FTS table, indexed columns); see finance_tracker.utils.search.
+# Entries are keyed by user_id << 32 | id. batch_alter_table rebuilds a
+# table and drops its triggers, so a later migration that batch-alters one
+# of these tables must recreate them.
+INDEXES = (
+    ('transactions', 'transactions_fts', ('description', 'merchant')),
+    ('savings_goals', 'savings_goals_fts', ('name',)),
+)
+
+
+def upgrade():
+    for table, fts, columns in INDEXES:
+        names = ', '.join(columns)
+        new = ', '.join(f'new.{column}' for column in columns)
+        old = ', '.join(f'old.{column}' for column in columns)
+        delete = f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', (old.user_id << 32) | old.id, {old});"
+        insert = f'INSERT INTO {fts} (rowid, {names}) VALUES ((new.user_id << 32) | new.id, {new});'
+
+        op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='', prefix='2 3 4 5 6', "
+                   f"tokenize='unicode61 remove_diacritics 2')")
+        op.execute(f'CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END')
+        op.execute(f'CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END')
+        op.execute(f'CREATE TRIGGER {fts}_update AFTER UPDATE OF id, user_id, {names} ON {table} '
+                   f'BEGIN {delete} {insert} END')
+        op.execute(f'INSERT INTO {fts} (rowid, {names}) '
+                   f'SELECT (user_id << 32) | id, {names} FROM {table}')
+        op.execute(f"INSERT INTO {fts} ({fts}) VALUES ('optimize')")
+
+
+def downgrade():
+    for table, fts, _ in INDEXES:
+        for event in ('insert', 'delete', 'update'):
+            op.execute(f'DROP TRIGGER IF EXISTS {fts}_{event}')
+        op.execute(f'DROP TABLE IF EXISTS {fts}')
@@ -0,0 +1,24 @@
+"""Add (user_id, id) index on savings_rules for keyset pagination
+
+Revision ID: e2b7c49d0a16
+Revises: c5a8f2d6e391
+Create Date: 2026-10-17 16:40:03.512907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7c49d0a16'
+down_revision = 'c5a8f2d6e391'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_savings_rules_user_id_id', 'savings_rules', ['user_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_savings_rules_user_id_id', table_name='savings_rules')
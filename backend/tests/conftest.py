@@ -0,0 +1,27 @@
+from pathlib import Path
+import pytest
+from flask_migrate import upgrade
+from finance_tracker import create_app
+
+MIGRATIONS = Path(__file__).resolve().parent.parent / 'migrations'
+
+
+@pytest.fixture
+def app_config():
+    """Config overrides for the `app` fixture; override it in a test module"""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    """An app on a fresh SQLite file built by the migrations, as deployed"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}',
+        'RATELIMIT_ENABLED': False,
+        'METRICS_ENABLED': False,
+        **app_config,
+    })
+    with app.app_context():
+        upgrade(directory=str(MIGRATIONS))
+        yield app
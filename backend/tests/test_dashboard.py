@@ -0,0 +1,26 @@
+from datetime import date
+from flask_jwt_extended import create_access_token
+from finance_tracker.extensions import db
+from finance_tracker.models.plaid_item import PlaidItem
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+
+
+def test_dashboard_reports_only_real_figures(app):
+    user = User(name='Dash', email='dash@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add_all([
+        PlaidItem(user_id=user.id, plaid_item_id='item-1', access_token='access-1'),
+        Transaction(user_id=user.id, date=date(2024, 5, 1), amount=250000, category='Income', description='Salary'),
+        Transaction(user_id=user.id, date=date(2024, 5, 3), amount=-4050, category='Food', description='Groceries'),
+    ])
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+    response = app.test_client().get('/api/dashboard', headers=headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['stats'] == {'total_balance': 2459.5, 'monthly_income': 2500, 'monthly_expenses': 40.5}
+    assert 'accounts' not in body
+    assert [t['description'] for t in body['recent_transactions']] == ['Groceries', 'Salary']
@@ -0,0 +1,64 @@
+import csv
+import gzip
+import io
+from datetime import date
+import pytest
+from flask_jwt_extended import create_access_token
+from finance_tracker.extensions import db
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+from finance_tracker.utils import export
+
+
+@pytest.fixture
+def client(app, monkeypatch):
+    # Small batches, so the export spans several chunks
+    monkeypatch.setattr(export, 'CSV_BATCH', 2)
+    user = User(name='Export', email='export@example.com', password_hash='x')
+    other = User(name='Other', email='other@example.com', password_hash='x')
+    db.session.add_all([user, other])
+    db.session.flush()
+    db.session.add_all([Transaction(user_id=user.id, date=date(2024, 1, day), amount=-1050 * day,
+                                    description=f'Shop, "{day}"', category='Food') for day in range(1, 6)])
+    db.session.add(Transaction(user_id=other.id, date=date(2024, 1, 1), amount=1, description='Not mine'))
+    db.session.commit()
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity=str(user.id))}'
+    return client
+
+
+def rows(text):
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def test_csv_is_streamed_in_batches(client):
+    response = client.get('/api/export/transactions', buffered=False)
+    assert response.status_code == 200 and response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert 'attachment; filename="finance-tracker-transactions-' in response.headers['Content-Disposition']
+    chunks = list(response.response)
+    # Header and two rows, two rows, one row
+    assert len([chunk for chunk in chunks if chunk]) == 3
+    exported = rows(b''.join(chunks).decode())
+    assert [row['amount'] for row in exported] == ['-10.50', '-21.00', '-31.50', '-42.00', '-52.50']
+    assert exported[0]['description'] == 'Shop, "1"' and exported[0]['date'] == '2024-01-01'
+
+
+def test_gzip_csv(client):
+    response = client.get('/api/export/transactions?gzip=1')
+    assert response.mimetype == 'application/gzip'
+    assert response.headers['Content-Disposition'].endswith('.csv.gz"')
+    assert len(rows(gzip.decompress(response.data).decode())) == 5
+
+
+def test_parquet(client):
+    pq = pytest.importorskip('pyarrow.parquet')
+    response = client.get('/api/export/transactions?format=parquet')
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.data))
+    assert [str(value) for value in table.column('amount').to_pylist()][:2] == ['-10.50', '-21.00']
+
+
+@pytest.mark.parametrize('path, status', [('/api/export/accounts', 404), ('/api/export/goals?format=xml', 400)])
+def test_bad_requests(client, path, status):
+    assert client.get(path).status_code == status
@@ -0,0 +1,81 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+import pytest
+from flask_jwt_extended import create_access_token
+from finance_tracker.extensions import db
+from finance_tracker.models.savings import SavingsGoal
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+from finance_tracker.utils.forecast import add_months, forecast_goals, inflow_stats, months_until
+
+TODAY = date(2024, 6, 15)
+
+
+def goal(goal_id, target, current=0, deadline=None):
+    return SimpleNamespace(id=goal_id, target_amount=target, current_amount=current, deadline=deadline)
+
+
+def test_steady_inflow_fills_goals_in_deadline_order():
+    goals = [goal(1, 50000), goal(2, 25000, deadline=datetime(2024, 9, 30))]
+    # $100 a month, no spread: goal 2 ($250) comes first and takes 3 months
+    forecasts = forecast_goals(goals, 100, 0, today=TODAY, paths=100, horizon=24, seed=1)
+    assert forecasts[2]['funding_position'] == 1
+    assert forecasts[2]['completion_dates'] == {'p10': '2024-09-15', 'p50': '2024-09-15', 'p90': '2024-09-15'}
+    assert forecasts[2]['completion_probability'] == 1.0
+    # Goal 1 needs $500 more after goal 2's $250: 8 months
+    assert forecasts[1]['completion_dates']['p50'] == '2025-02-15'
+
+
+def test_unreachable_and_finished_goals():
+    forecasts = forecast_goals([goal(1, 1000, current=1000), goal(2, 10**9)], 10, 0, today=TODAY,
+                               paths=10, horizon=12, seed=1)
+    assert forecasts[1]['remaining_amount'] == 0 and forecasts[1]['completion_probability'] == 1.0
+    assert forecasts[2]['completion_probability'] == 0.0
+    assert forecasts[2]['completion_dates']['p50'] is None
+
+
+def test_month_arithmetic():
+    assert add_months(date(2024, 1, 31), 1) == date(2024, 2, 29)
+    assert months_until(TODAY, date(2024, 9, 14)) == 2
+    assert months_until(TODAY, date(2024, 9, 15)) == 3
+    assert months_until(TODAY, date(2024, 1, 1)) == 0
+
+
+@pytest.fixture
+def user(app):
+    user = User(name='Forecast', email='forecast@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    # Two complete past months of +$300 and +$100
+    db.session.add_all([
+        Transaction(user_id=user.id, date=date(2024, 1, 10), amount=30000, category='Income'),
+        Transaction(user_id=user.id, date=date(2024, 2, 10), amount=20000, category='Income'),
+        Transaction(user_id=user.id, date=date(2024, 2, 11), amount=-10000, category='Rent'),
+    ])
+    db.session.add_all([SavingsGoal(user_id=user.id, name='Trip', target_amount=100000),
+                        SavingsGoal(user_id=user.id, name='Fund', target_amount=50000)])
+    db.session.commit()
+    return user
+
+
+def test_forecast_routes(app, user):
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity=str(user.id))}'
+    body = client.get('/api/savings/goals/forecast').get_json()
+    assert body['monthly_inflow']['mean'] == 200.0 and body['monthly_inflow']['history_months'] == 2
+    goal_ids = [goal.id for goal in SavingsGoal.for_user(user.id).all()]
+    assert [forecast['goal_id'] for forecast in body['forecasts']] == goal_ids
+
+    single = client.get(f'/api/savings/goals/{goal_ids[1]}/forecast').get_json()
+    assert single == dict(body['forecasts'][1], monthly_inflow=body['monthly_inflow'])
+    assert client.get('/api/savings/goals/999/forecast').status_code == 404
+
+
+def test_current_partial_month_is_left_out(app, user):
+    # March has only just started: one small expense so far
+    db.session.add(Transaction(user_id=user.id, date=date(2024, 3, 2), amount=-5000, category='Food'))
+    db.session.commit()
+    assert inflow_stats(user.id, today=date(2024, 3, 5)) == (200.0, pytest.approx(141.42, abs=0.01), 2)
+    # Once March is over it counts like any other month
+    mean, _, history = inflow_stats(user.id, today=date(2024, 4, 1))
+    assert (mean, history) == (pytest.approx(116.67, abs=0.01), 3)
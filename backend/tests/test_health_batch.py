@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from finance_tracker.utils.health import analyze_financial_health
+from finance_tracker.utils.health_batch import (
+    analyze_financial_health_batch, batch_insights, columns_from_payloads, random_payloads
+)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_batch_matches_scalar(seed):
+    payloads = random_payloads(2000, seed=seed)
+    columns, category_names = columns_from_payloads(payloads)
+    result = analyze_financial_health_batch(**columns)
+    for i, payload in enumerate(payloads):
+        assert batch_insights(result, i, category_names[i]) == analyze_financial_health(payload), payload
+
+
+def test_batch_without_categories_matches_scalar():
+    payloads = [payload for payload in random_payloads(500, seed=3) if not payload['categoryDistribution']]
+    assert payloads
+    columns, category_names = columns_from_payloads(payloads)
+    assert columns['category_shares'].shape == (len(payloads), 0)
+    result = analyze_financial_health_batch(**columns)
+    for i, payload in enumerate(payloads):
+        assert batch_insights(result, i, category_names[i]) == analyze_financial_health(payload)
+
+
+@pytest.mark.parametrize('category_shares', [np.empty((0, 0)), np.empty(0), []])
+def test_empty_batch(category_shares):
+    columns, _ = columns_from_payloads([])
+    columns['category_shares'] = category_shares
+    result = analyze_financial_health_batch(**columns)
+    assert result['score'].shape == (0,)
+    assert result['high_spending'].shape == (0, 0)
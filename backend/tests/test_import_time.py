@@ -0,0 +1,13 @@
+from benchmarks.import_time import BUDGET_MS, LAZY_MODULES, cold_start
+
+RUNS = 3
+
+
+def test_cold_start_within_budget(tmp_path):
+    runs = [cold_start(f'sqlite:///{tmp_path / "import.db"}') for _ in range(RUNS)]
+    # Other load on the machine only ever adds time, so the fastest run is
+    # the closest to what the imports themselves cost
+    wall = min(ms for ms, _ in runs)
+    eager = [name for name in LAZY_MODULES if name in runs[-1][1]]
+    assert not eager, f'imported at startup but should load on first use: {eager}'
+    assert wall <= BUDGET_MS, f'wsgi:app cold start took {wall:.0f} ms (budget {BUDGET_MS} ms)'
@@ -0,0 +1,84 @@
+import io
+from datetime import date
+import pytest
+from flask_jwt_extended import create_access_token
+from finance_tracker.extensions import db
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+from finance_tracker.utils import rollups
+from finance_tracker.utils.importer import StatementImportError, import_transactions, parse_amount
+
+CSV = (
+    'Posted Date,Description,Debit,Credit,Reference\n'
+    '05/01/2024,Salary,,"2,500.00",ref-1\n'
+    '05/03/2024,Groceries,40.10,,ref-2\n'
+    '05/04/2024,Coffee,3.30,,\n'
+)
+
+OFX = '''<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240506120000[-5:EST]<TRNAMT>-12.00<FITID>fit-1<NAME>Cinema</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240507<TRNAMT>-8.25<FITID>fit-2<NAME>Bakery<MEMO>Bread</STMTTRN>
+</BANKTRANLIST></OFX>'''
+
+
+@pytest.fixture
+def user_id(app):
+    user = User(name='Importer', email='importer@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def upload(app, user_id, content, filename):
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+    data = {'file': (io.BytesIO(content.encode()), filename)}
+    return app.test_client().post('/api/transactions/import', data=data, headers=headers,
+                                  content_type='multipart/form-data')
+
+
+def amounts(user_id):
+    return db.session.scalars(db.select(Transaction.amount).filter_by(user_id=user_id).order_by(Transaction.id)).all()
+
+
+def test_csv_import_and_reimport(app, user_id):
+    response = upload(app, user_id, CSV, 'statement.csv')
+    assert response.status_code == 201 and response.get_json() == {'imported': 3, 'skipped': 0}
+    assert amounts(user_id) == [250000, -4010, -330]
+    assert rollups.monthly_totals(user_id) == [('2024-05', 250000, 4340)]
+
+    # Rows with a reference are recognized; the one without is imported again
+    assert upload(app, user_id, CSV, 'statement.csv').get_json() == {'imported': 1, 'skipped': 2}
+
+
+def test_ofx_import(app, user_id):
+    assert upload(app, user_id, OFX, 'statement.qfx').get_json() == {'imported': 2, 'skipped': 0}
+    rows = db.session.execute(db.select(Transaction.date, Transaction.description, Transaction.merchant)
+                              .filter_by(user_id=user_id).order_by(Transaction.id)).all()
+    assert rows == [(date(2024, 5, 6), 'Cinema', 'Cinema'), (date(2024, 5, 7), 'Bread', 'Bakery')]
+
+
+def test_bad_line_rolls_back_the_whole_import(app, user_id):
+    bad = CSV + 'not a date,Refund,,1.00,ref-9\n'
+    response = upload(app, user_id, bad, 'statement.csv')
+    assert response.status_code == 400 and 'Line 5' in response.get_json()['error']
+    assert amounts(user_id) == []
+    assert rollups.monthly_totals(user_id) == []
+
+
+def test_chunks_are_deduplicated_across_boundaries(app, user_id):
+    statement = 'date,amount,id\n' + ''.join(f'2024-05-0{i},-1.00,dup\n' for i in range(1, 4))
+    assert import_transactions(user_id, io.BytesIO(statement.encode()), chunk_size=1) == {'imported': 1, 'skipped': 2}
+
+
+def test_unsupported_format(app, user_id):
+    assert upload(app, user_id, CSV, 'statement.pdf').status_code == 400
+
+
+@pytest.mark.parametrize('value, cents', [('12.5', 1250), ('(3.10)', -310), ('$1,000.01', 100001), ('', 0)])
+def test_parse_amount(value, cents):
+    assert parse_amount(value) == cents
+
+
+def test_missing_amount_column(app, user_id):
+    with pytest.raises(StatementImportError, match='amount column'):
+        import_transactions(user_id, io.BytesIO(b'date,description\n2024-05-01,x\n'))
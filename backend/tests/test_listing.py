@@ -0,0 +1,58 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from finance_tracker.extensions import db
+from finance_tracker.models.savings import SavingsGoal
+from finance_tracker.models.user import User
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def goal_ids(app, client):
+    user = User(name='Lists', email='lists@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    goals = [SavingsGoal(user_id=user.id, name=f'Goal {i}', target_amount=1000 * i) for i in range(1, 6)]
+    db.session.add_all(goals)
+    db.session.commit()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity=str(user.id))}'
+    return [goal.id for goal in goals]
+
+
+def get(client, query=''):
+    return client.get(f'/api/savings/goals{query}')
+
+
+def test_keyset_pages_cover_every_row_once(client, goal_ids):
+    seen, query = [], '?limit=2'
+    while query:
+        response = get(client, query)
+        assert response.status_code == 200
+        page = [goal['id'] for goal in response.get_json()]
+        seen += page
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor:
+            assert cursor == str(page[-1])
+            assert 'rel="next"' in response.headers['Link'] and f'after={cursor}' in response.headers['Link']
+        query = f'?limit=2&after={cursor}' if cursor else None
+    assert seen == goal_ids
+
+
+def test_no_cursor_when_the_page_ends_exactly_at_the_last_row(client, goal_ids):
+    response = get(client, f'?limit=2&after={goal_ids[2]}')
+    assert [goal['id'] for goal in response.get_json()] == goal_ids[3:]
+    assert 'X-Next-Cursor' not in response.headers and 'Link' not in response.headers
+    assert get(client, f'?limit=2&after={goal_ids[-1]}').get_json() == []
+
+
+def test_fields_and_streaming(client, goal_ids):
+    assert get(client, '?fields=id,name&limit=1').get_json() == [{'id': goal_ids[0], 'name': 'Goal 1'}]
+    assert get(client, '?stream=1').get_json() == get(client).get_json()
+
+
+@pytest.mark.parametrize('query', ['?limit=0', '?limit=x', '?after=-1', '?fields=password'])
+def test_invalid_arguments(client, goal_ids, query):
+    assert get(client, query).status_code == 400
@@ -0,0 +1,77 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from finance_tracker.extensions import db, metrics
+from finance_tracker.models.savings import SavingsGoal
+from finance_tracker.models.user import User
+
+TOKEN = 'scrape-token'
+
+
+@pytest.fixture
+def app_config():
+    return {'METRICS_ENABLED': True, 'METRICS_TOKEN': TOKEN}
+
+
+@pytest.fixture
+def headers(app):
+    user = User(name='Metrics', email='metrics@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add_all([SavingsGoal(user_id=user.id, name=f'Goal {i}', target_amount=1000) for i in range(3)])
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+
+@pytest.fixture
+def statements(app):
+    """Number of SQL statements the engine has run so far"""
+    count = [0]
+
+    def executed(*args):
+        count[0] += 1
+    event.listen(db.engine, 'after_cursor_execute', executed)
+    yield count
+    event.remove(db.engine, 'after_cursor_execute', executed)
+
+
+def test_streamed_response_is_recorded_after_its_body(app, headers, statements):
+    client = app.test_client()
+    response = client.get('/api/savings/goals?stream=1', headers=headers, buffered=False)
+    assert ('/api/savings/goals', 'GET') not in metrics.routes
+
+    assert len(response.get_json()) == 3
+    response.close()
+    series = metrics.routes['/api/savings/goals', 'GET']
+    assert series.latency.count == 1
+    assert series.statuses == {200: 1}
+    # Including the SELECT that ran while the body was generated
+    assert series.statements.sum == statements[0]
+
+
+def test_buffered_response_is_recorded(app, headers, statements):
+    app.test_client().get('/api/savings/goals', headers=headers)
+    series = metrics.routes['/api/savings/goals', 'GET']
+    assert series.latency.count == 1
+    assert series.statements.sum == statements[0]
+
+
+def test_metrics_requires_the_token(app):
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': f'Bearer {TOKEN}'})
+    assert response.status_code == 200
+    assert b'http_requests_total' in response.data
+
+
+@pytest.mark.parametrize('app_config', [{'METRICS_ENABLED': True, 'METRICS_TOKEN': None}])
+def test_metrics_is_disabled_without_a_token(app):
+    assert app.test_client().get('/metrics').status_code == 404
+
+
+def test_cache_stats_are_only_on_metrics(app, headers):
+    client = app.test_client()
+    assert client.get('/api/insights/cache', headers=headers).status_code == 404
+    response = client.get('/metrics', headers={'Authorization': f'Bearer {TOKEN}'})
+    assert b'insights_cache' in response.data
@@ -0,0 +1,53 @@
+import pytest
+from werkzeug.security import generate_password_hash
+from finance_tracker.utils.passwords import HashingBusyError, PasswordHasher, hash_strength
+
+
+def stored(method):
+    return generate_password_hash('benchmark-password', method=method)
+
+
+def test_hash_strength_ordering():
+    assert hash_strength('pbkdf2:sha1:600000') < hash_strength('pbkdf2:sha256:1000')
+    assert hash_strength('pbkdf2:sha256:1000') < hash_strength('pbkdf2:sha256:600000')
+    assert hash_strength('pbkdf2:sha256:1000000') < hash_strength('scrypt:16384:8:1')
+    assert hash_strength('scrypt:16384:8:1') < hash_strength('scrypt:32768:8:1')
+    assert hash_strength('md5') is None
+
+
+@pytest.mark.parametrize('target, method, expected', [
+    ('scrypt', 'scrypt', False),
+    ('scrypt', 'pbkdf2:sha256:600000', True),
+    ('scrypt', 'scrypt:16384:8:1', True),
+    # Never downgrade a stronger hash to the configured method
+    ('pbkdf2:sha256:600000', 'scrypt', False),
+    ('pbkdf2:sha256:1000', 'pbkdf2:sha256:2000', False),
+    ('pbkdf2:sha256:2000', 'pbkdf2:sha256:1000', True),
+])
+def test_needs_rehash(target, method, expected):
+    assert PasswordHasher(method=target).needs_rehash(stored(method)) is expected
+
+
+def test_unrecognized_hash_is_upgraded():
+    assert PasswordHasher(method='pbkdf2:sha256:1000').needs_rehash('legacy$salt$digest')
+
+
+def test_slow_hash_raises_busy():
+    hasher = PasswordHasher(method='pbkdf2:sha256:2000000', workers=1, timeout=0.05)
+    try:
+        with pytest.raises(HashingBusyError):
+            hasher.hash('benchmark-password')
+    finally:
+        hasher.shutdown()
+
+
+def test_timed_out_job_keeps_its_slot():
+    hasher = PasswordHasher(method='pbkdf2:sha256:2000000', workers=1, queue_factor=1, timeout=0.05)
+    try:
+        with pytest.raises(HashingBusyError, match='timed out'):
+            hasher.hash('benchmark-password')
+        # The first job is still running, so there is no slot to take
+        with pytest.raises(HashingBusyError, match='saturated'):
+            hasher.hash('benchmark-password')
+    finally:
+        hasher.shutdown()
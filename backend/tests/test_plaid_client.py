@@ -0,0 +1,43 @@
+import pytest
+from finance_tracker.utils import plaid_client
+from finance_tracker.utils.circuit_breaker import CircuitBreaker
+from finance_tracker.utils.plaid_client import PlaidGateway, PlaidUnavailableError
+
+
+class FakeClient:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+
+    def transactions_sync(self, request, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def gateway(client, **kwargs):
+    gateway = PlaidGateway(**{'max_concurrency': 1, 'retries': 1, 'backoff': 0, 'acquire_timeout': 0.01,
+                              'breaker_threshold': 1, 'breaker_reset': 0, **kwargs})
+    gateway._client = client
+    return gateway
+
+
+def test_retries_then_succeeds():
+    plaid = gateway(FakeClient(ConnectionError('reset'), 'page'))
+    assert plaid.call('transactions_sync', {}) == 'page'
+    assert plaid.stats()['calls'] == 2 and plaid.stats()['retried'] == 1
+
+
+def test_probe_without_a_slot_for_its_retry_reopens_the_breaker(monkeypatch):
+    plaid = gateway(FakeClient(ConnectionError('reset'), 'page'))
+    plaid.breaker.record_failure()
+    assert plaid.breaker.state == CircuitBreaker.HALF_OPEN
+    # Someone else takes the only slot while the probe backs off
+    monkeypatch.setattr(plaid_client.time, 'sleep', lambda seconds: plaid._slots.acquire())
+    with pytest.raises(PlaidUnavailableError, match='slots are busy'):
+        plaid.call('transactions_sync', {})
+    plaid._slots.release()
+    # The abandoned probe counted as a failure, so the next call may probe again
+    assert plaid.call('transactions_sync', {}) == 'page'
+    assert plaid.breaker.state == CircuitBreaker.CLOSED
+
@@ -0,0 +1,96 @@
+import json
+import pytest
+from plaid.exceptions import ApiException
+from finance_tracker.extensions import db
+from finance_tracker.models.plaid_item import PlaidItem
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+from finance_tracker.utils import plaid_sync, rollups
+
+
+@pytest.fixture
+def item(app):
+    user = User(name='Sync', email='sync@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    item = PlaidItem(user_id=user.id, plaid_item_id='item-1', access_token='access-1')
+    db.session.add(item)
+    db.session.commit()
+    return item.id, user.id
+
+
+def txn(transaction_id, amount, day='2024-05-02', name='Corner Store'):
+    return {'transaction_id': transaction_id, 'date': day, 'amount': amount, 'name': name,
+            'merchant_name': name, 'personal_finance_category': {'primary': 'FOOD_AND_DRINK'}}
+
+
+def serve(monkeypatch, *pages):
+    requests = []
+    pages = iter(pages)
+
+    def fetch_page(access_token, cursor, count):
+        requests.append(cursor)
+        page = next(pages)
+        if isinstance(page, Exception):
+            raise page
+        return page
+    monkeypatch.setattr(plaid_sync, 'fetch_page', fetch_page)
+    return requests
+
+
+def ledger(user_id):
+    return db.session.execute(db.select(Transaction.external_id, Transaction.amount)
+                              .filter_by(user_id=user_id).order_by(Transaction.external_id)).all()
+
+
+def test_pages_are_applied_with_their_cursor(app, item, monkeypatch):
+    item_id, user_id = item
+    requests = serve(monkeypatch,
+                     {'added': [txn('a', '10.00'), txn('b', '-2500.00', name='Payroll')],
+                      'next_cursor': 'c1', 'has_more': True},
+                     {'added': [txn('c', '4.50')], 'next_cursor': 'c2', 'has_more': False})
+    stats = plaid_sync.sync_item(item_id)
+    assert (stats['added'], stats['pages']) == (3, 2)
+    assert requests == [None, 'c1']
+    # Plaid's positive amounts are money leaving the account
+    assert ledger(user_id) == [('a', -1000), ('b', 250000), ('c', -450)]
+    assert db.session.get(PlaidItem, item_id).transactions_cursor == 'c2'
+    assert rollups.monthly_totals(user_id) == [('2024-05', 250000, 1450)]
+
+
+def test_modified_and_removed_rows_update_the_rollups(app, item, monkeypatch):
+    item_id, user_id = item
+    serve(monkeypatch,
+          {'added': [txn('a', '10.00'), txn('b', '20.00')], 'next_cursor': 'c1', 'has_more': False},
+          {'modified': [txn('a', '12.00')], 'removed': [{'transaction_id': 'b'}],
+           'next_cursor': 'c2', 'has_more': False})
+    plaid_sync.sync_item(item_id)
+    stats = plaid_sync.sync_item(item_id)
+    assert (stats['modified'], stats['removed']) == (1, 1)
+    assert ledger(user_id) == [('a', -1200)]
+    assert rollups.monthly_totals(user_id) == [('2024-05', 0, 1200)]
+
+
+def test_mutation_during_pagination_restarts_from_the_first_cursor(app, item, monkeypatch):
+    item_id, user_id = item
+    mutation = ApiException(status=400)
+    mutation.body = json.dumps({'error_code': plaid_sync.MUTATION_DURING_PAGINATION})
+    requests = serve(monkeypatch,
+                     {'added': [txn('a', '10.00')], 'next_cursor': 'c1', 'has_more': True},
+                     mutation,
+                     {'added': [txn('a', '10.00')], 'next_cursor': 'c1', 'has_more': True},
+                     {'added': [txn('b', '5.00')], 'next_cursor': 'c2', 'has_more': False})
+    plaid_sync.sync_item(item_id)
+    assert requests == [None, 'c1', None, 'c1']
+    # The re-applied page is an idempotent upsert
+    assert ledger(user_id) == [('a', -1000), ('b', -500)]
+    assert rollups.monthly_totals(user_id) == [('2024-05', 0, 1500)]
+
+
+def test_a_failed_page_leaves_the_cursor(app, item, monkeypatch):
+    item_id, user_id = item
+    serve(monkeypatch, {'added': [txn('a', 'not a number')], 'next_cursor': 'c1', 'has_more': False})
+    with pytest.raises(ValueError):
+        plaid_sync.sync_item(item_id)
+    assert db.session.get(PlaidItem, item_id).transactions_cursor is None
+    assert ledger(user_id) == []
@@ -0,0 +1,14 @@
+from finance_tracker.utils.query_plans import check_query_plans, is_full_scan
+
+
+def test_route_queries_use_an_index(app):
+    scans = {name: plan for name, plan, ok in check_query_plans() if not ok}
+    assert not scans
+
+
+def test_is_full_scan():
+    assert is_full_scan('SCAN transactions')
+    assert not is_full_scan('SEARCH transactions USING INDEX ix_transactions_user_id_id (user_id=? AND id>?)')
+    assert not is_full_scan('SCAN transactions_fts VIRTUAL TABLE INDEX 192:M2><')
+    assert not is_full_scan('SCAN ranked', {'ranked'})
+    assert is_full_scan('SCAN transactions', {'ranked'})
@@ -0,0 +1,57 @@
+import pytest
+from finance_tracker.utils.ratelimit import MemoryBuckets
+
+
+@pytest.fixture
+def app_config():
+    return {'RATELIMIT_ENABLED': True, 'RATELIMIT_IP_BURST': 3, 'RATELIMIT_IP_PER_MINUTE': 1,
+            'RATELIMIT_EMAIL_BURST': 2, 'RATELIMIT_EMAIL_PER_MINUTE': 1}
+
+
+def login(client, email, ip='10.0.0.1'):
+    return client.post('/auth/login', json={'email': email, 'password': 'not-the-password'},
+                       environ_base={'REMOTE_ADDR': ip})
+
+
+def test_ip_burst_then_429_with_retry_after(app):
+    client = app.test_client()
+    for i in range(3):
+        assert login(client, f'user{i}@example.com').status_code == 401
+    response = login(client, 'user9@example.com')
+    assert response.status_code == 429
+    assert response.get_json()['error'] == 'rate_limited'
+    # One token a minute: the next attempt is about a minute away
+    assert 1 <= int(response.headers['Retry-After']) <= 60
+    # Another address is unaffected
+    assert login(client, 'user9@example.com', ip='10.0.0.2').status_code == 401
+
+
+def test_email_bucket_spans_addresses(app):
+    client = app.test_client()
+    assert login(client, 'target@example.com', ip='10.0.0.1').status_code == 401
+    assert login(client, 'target@example.com', ip='10.0.0.2').status_code == 401
+    response = login(client, 'target@example.com', ip='10.0.0.3')
+    assert response.status_code == 429 and 'Retry-After' in response.headers
+
+
+def test_register_is_limited_too(app):
+    client = app.test_client()
+    statuses = [client.post('/auth/register', json={'name': 'N', 'email': f'r{i}@example.com', 'password': 'short'},
+                            environ_base={'REMOTE_ADDR': '10.0.0.9'}).status_code for i in range(4)]
+    assert statuses == [400, 400, 400, 429]
+
+
+def test_buckets_refill_with_time():
+    now = [0.0]
+    buckets = MemoryBuckets(clock=lambda: now[0])
+    assert buckets.take('k', 1, 0.5) == 0
+    assert buckets.take('k', 1, 0.5) == pytest.approx(2)
+    now[0] = 2.0
+    assert buckets.take('k', 1, 0.5) == 0
+
+
+def test_lru_bounds_the_number_of_buckets():
+    buckets = MemoryBuckets(max_keys=2)
+    for key in 'abc':
+        buckets.take(key, 1, 1)
+    assert len(buckets) == 2 and buckets.evictions == 1
@@ -0,0 +1,83 @@
+import io
+from datetime import date, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from finance_tracker.extensions import db
+from finance_tracker.models.plaid_item import PlaidItem
+from finance_tracker.models.recurring import RecurringCheckpoint, RecurringSeries
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+from finance_tracker.utils import plaid_sync
+
+TODAY = date.today()
+NETFLIX_DATES = [TODAY - timedelta(days=30 * months) for months in range(4, -1, -1)]
+
+
+@pytest.fixture
+def user_id(app):
+    user = User(name='Recurring', email='recurring@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+@pytest.fixture
+def headers(user_id):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+
+
+def statement():
+    rows = ''.join(f'{day.isoformat()},-15.99,NETFLIX.COM\n' for day in NETFLIX_DATES)
+    return io.BytesIO(f'date,amount,description\n{rows}'.encode())
+
+
+def netflix(user_id):
+    db.session.expire_all()
+    return db.session.get(RecurringSeries, (user_id, 'netflix', 'expense'))
+
+
+def test_import_runs_detection(app, user_id, headers):
+    client = app.test_client()
+    response = client.post('/api/transactions/import', headers=headers,
+                           data={'file': (statement(), 'statement.csv')}, content_type='multipart/form-data')
+    assert response.status_code == 201
+    assert netflix(user_id).cadence == 'monthly'
+    listed = client.get('/api/recurring', headers=headers).get_json()
+    assert [series['merchant_key'] for series in listed] == ['netflix']
+
+
+def test_reads_do_not_run_detection(app, user_id, headers):
+    db.session.add_all([Transaction(user_id=user_id, date=day, amount=-1599, description='NETFLIX.COM')
+                        for day in NETFLIX_DATES])
+    db.session.commit()
+    client = app.test_client()
+    assert client.post('/api/insights', headers=headers, json={}).status_code == 200
+    assert client.get('/api/recurring', headers=headers).get_json() == []
+    assert db.session.get(RecurringCheckpoint, user_id) is None
+
+
+def plaid_txn(day, amount, transaction_id):
+    return {'transaction_id': transaction_id, 'date': day.isoformat(), 'amount': amount,
+            'name': 'NETFLIX.COM', 'merchant_name': 'Netflix', 'category': ['Entertainment']}
+
+
+def test_plaid_modification_reaches_detected_series(app, user_id, monkeypatch):
+    db.session.add(PlaidItem(user_id=user_id, plaid_item_id='item-1', access_token='access-1'))
+    db.session.commit()
+    item_id = db.session.scalar(db.select(PlaidItem.id))
+    pages = iter([
+        {'added': [plaid_txn(day, '15.99', f'txn-{i}') for i, day in enumerate(NETFLIX_DATES)],
+         'next_cursor': 'c1', 'has_more': False},
+        # The latest charge was pending at 15.99 and posted at 17.99
+        {'modified': [plaid_txn(NETFLIX_DATES[-1], '17.99', f'txn-{len(NETFLIX_DATES) - 1}')],
+         'next_cursor': 'c2', 'has_more': False},
+    ])
+    monkeypatch.setattr(plaid_sync, 'fetch_page', lambda access_token, cursor, count: next(pages))
+
+    plaid_sync.sync_item(item_id)
+    assert netflix(user_id).last_amount == 1599
+
+    stats = plaid_sync.sync_item(item_id)
+    assert stats['modified'] == 1
+    series = netflix(user_id)
+    assert (series.last_amount, series.previous_amount) == (1799, 1599)
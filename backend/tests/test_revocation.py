@@ -0,0 +1,55 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from finance_tracker.extensions import db, token_denylist
+from finance_tracker.models.user import User
+from finance_tracker.utils.revocation import BloomFilter
+
+
+@pytest.fixture
+def user_id(app):
+    user = User(name='Revoke', email='revoke@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_logout_revokes_only_that_token(app, user_id):
+    client = app.test_client()
+    token, other = create_access_token(identity=str(user_id)), create_access_token(identity=str(user_id))
+    assert client.get('/api/protected', headers=bearer(token)).status_code == 200
+
+    assert client.post('/auth/logout', headers=bearer(token)).status_code == 200
+    response = client.get('/api/protected', headers=bearer(token))
+    assert response.status_code == 401
+    assert client.get('/api/savings/goals', headers=bearer(token)).status_code == 401
+    assert client.get('/api/protected', headers=bearer(other)).status_code == 200
+
+
+def test_revoked_token_is_rejected_after_a_rebuild(app, user_id):
+    client = app.test_client()
+    token = create_access_token(identity=str(user_id))
+    client.post('/auth/logout', headers=bearer(token))
+    # A fresh process (or worker) learns revocations from the table
+    token_denylist.reset()
+    assert client.get('/api/protected', headers=bearer(token)).status_code == 401
+
+
+def test_logout_all_revokes_every_token(app, user_id):
+    client = app.test_client()
+    tokens = [create_access_token(identity=str(user_id)) for _ in range(3)]
+    assert client.post('/auth/logout-all', headers=bearer(tokens[0])).status_code == 200
+    assert [client.get('/api/protected', headers=bearer(t)).status_code for t in tokens] == [401, 401, 401]
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f'jti-{i}' for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+    assert false_positives < 300
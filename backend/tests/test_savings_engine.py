@@ -0,0 +1,88 @@
+from datetime import date
+import pytest
+from flask_jwt_extended import create_access_token
+from finance_tracker.extensions import db
+from finance_tracker.models.plaid_item import PlaidItem
+from finance_tracker.models.savings import SavingsCheckpoint, SavingsRule
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+from finance_tracker.utils import plaid_sync
+from finance_tracker.utils.savings_engine import contribution_totals, run_rules
+
+
+@pytest.fixture
+def user(app):
+    user = User(name='Saver', email='saver@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def test_first_rule_applies_to_existing_transactions(user):
+    db.session.add_all([Transaction(user_id=user.id, date=date(2026, 9, day), amount=amount)
+                        for day, amount in ((1, -1250), (2, -399), (3, -500))])
+    db.session.commit()
+
+    assert run_rules(user.id) == 0
+    assert db.session.get(SavingsCheckpoint, user.id).last_transaction_id == 0
+
+    rule = SavingsRule(user_id=user.id, type='round-up', is_active=True)
+    db.session.add(rule)
+    db.session.commit()
+    assert run_rules(user.id) == 3
+    # 12.50 -> 0.50, 3.99 -> 0.01, 5.00 -> 0
+    assert contribution_totals(user.id) == {rule.id: 51}
+
+
+def test_transaction_ids_are_not_reused(user):
+    rows = [Transaction(user_id=user.id, date=date(2026, 9, 1), amount=-100) for _ in range(3)]
+    db.session.add_all(rows)
+    db.session.commit()
+    newest = rows[-1].id
+    db.session.delete(rows[-1])
+    db.session.commit()
+
+    later = Transaction(user_id=user.id, date=date(2026, 9, 2), amount=-199)
+    db.session.add(later)
+    db.session.commit()
+    assert later.id > newest
+
+
+def plaid_txn(transaction_id, amount):
+    return {'transaction_id': transaction_id, 'date': '2026-09-01', 'amount': amount, 'name': 'Coffee'}
+
+
+def test_plaid_changes_revise_counted_contributions(user, monkeypatch):
+    rule = SavingsRule(user_id=user.id, type='round-up', is_active=True)
+    item = PlaidItem(user_id=user.id, plaid_item_id='item-1', access_token='access-1')
+    db.session.add_all([rule, item])
+    db.session.commit()
+    pages = iter([
+        {'added': [plaid_txn('a', '12.50'), plaid_txn('b', '3.99')], 'next_cursor': 'c1', 'has_more': False},
+        {'modified': [plaid_txn('a', '12.75')], 'removed': [{'transaction_id': 'b'}],
+         'next_cursor': 'c2', 'has_more': False},
+    ])
+    monkeypatch.setattr(plaid_sync, 'fetch_page', lambda access_token, cursor, count: next(pages))
+
+    # Each sync applies the rules to what it added
+    plaid_sync.sync_item(item.id)
+    assert contribution_totals(user.id) == {rule.id: 51}
+
+    plaid_sync.sync_item(item.id)
+    # 12.75 -> 0.25; the removed 3.99 no longer counts
+    assert contribution_totals(user.id) == {rule.id: 25}
+
+
+def test_calculate_get_reads_and_post_applies(app, user):
+    rule = SavingsRule(user_id=user.id, type='round-up', is_active=True)
+    db.session.add_all([rule, Transaction(user_id=user.id, date=date.today(), amount=-1250)])
+    db.session.commit()
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+    assert client.get('/api/savings/calculate', headers=headers).get_json()['total_savings'] == 0
+    assert db.session.get(SavingsCheckpoint, user.id) is None
+
+    response = client.post('/api/savings/calculate', headers=headers)
+    assert response.get_json()['total_savings'] == 0.5
+    assert client.get('/api/savings/calculate', headers=headers).get_json()['total_savings'] == 0.5
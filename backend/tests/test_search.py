@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from finance_tracker.extensions import db
+from finance_tracker.models.transaction import Transaction
+from finance_tracker.models.user import User
+from finance_tracker.utils.search import SearchArgsError, parse_search_args, search
+
+START = date(2024, 1, 1)
+
+
+@pytest.fixture
+def user_id(app):
+    user = User(name='Search', email='search@example.com', password_hash='x')
+    other = User(name='Other', email='other@example.com', password_hash='x')
+    db.session.add_all([user, other])
+    db.session.flush()
+    # 300 coffee purchases (more than any fixed candidate set), the best match being the oldest
+    rows = [Transaction(user_id=user.id, amount=-4, category='Food', date=START + timedelta(days=day),
+                        description='Card purchase', merchant='Corner Cafe coffee shop')
+            for day in range(300)]
+    rows[0].merchant = 'Coffee'
+    rows.append(Transaction(user_id=other.id, amount=-4, category='Food', date=START,
+                            description='Coffee', merchant='Coffee'))
+    db.session.add_all(rows)
+    db.session.commit()
+    return user.id
+
+
+def test_ranks_over_every_match(user_id):
+    best = db.session.scalar(db.select(Transaction.id).filter_by(user_id=user_id, merchant='Coffee'))
+    rows, next_offset = search(user_id, 'coffee', 'transactions', limit=10)
+    assert rows[0]['id'] == best
+    assert len(rows) == 10 and next_offset == 10
+
+
+def test_pages_reach_every_match(user_id):
+    seen, offset = [], 0
+    while offset is not None:
+        rows, offset = search(user_id, 'cof', 'transactions', limit=100, offset=offset)
+        seen += [row['id'] for row in rows]
+    assert len(seen) == len(set(seen)) == 300
+
+
+def test_last_page_boundary(user_id):
+    rows, next_offset = search(user_id, 'coffee', 'transactions', limit=100, offset=200)
+    assert len(rows) == 100 and next_offset is None
+    assert search(user_id, 'coffee', 'transactions', limit=100, offset=300) == ([], None)
+
+
+def test_search_route(app, user_id):
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+    response = app.test_client().get('/api/search?q=coffee&type=transactions&limit=5&offset=295',
+                                     headers=headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['transactions']['results']) == 5
+    assert body['transactions']['next_offset'] is None
+    assert 'goals' not in body
+
+
+@pytest.mark.parametrize('args, message', [
+    ({}, 'q is required'),
+    ({'q': 'x', 'type': 'accounts'}, 'type must be one of'),
+    ({'q': 'x', 'limit': '0'}, 'limit must be between'),
+    ({'q': 'x', 'offset': 'a'}, 'offset must be an integer'),
+])
+def test_parse_search_args_errors(args, message):
+    with pytest.raises(SearchArgsError, match=message):
+        parse_search_args(args)
@@ -0,0 +1,14 @@
+import pytest
+from finance_tracker import create_app
+from finance_tracker.utils.sqlite import engine_options
+
+
+def test_engine_options_accept_sqlite_urls():
+    assert engine_options('production', 'sqlite:////tmp/finance.db')['pool_size'] == 10
+    assert engine_options('production', 'sqlite+pysqlite:///:memory:') == {}
+
+
+@pytest.mark.parametrize('url', ['postgresql://finance@localhost/finance', 'mysql+pymysql://finance@localhost/f'])
+def test_create_app_rejects_other_databases(url):
+    with pytest.raises(ValueError, match='DATABASE_URL must be a sqlite: URL'):
+        create_app({'SQLALCHEMY_DATABASE_URI': url})
@@ -0,0 +1,50 @@
+import pytest
+from flask import g
+from finance_tracker.extensions import db, user_cache
+from finance_tracker.models.user import User
+from finance_tracker.utils.auth import load_user
+
+
+@pytest.fixture
+def user_id(app):
+    user = User(name='Cached', email='cached@example.com', password_hash='scrypt:1:8:1$salt$hash')
+    db.session.add(user)
+    db.session.commit()
+    user_cache.clear()
+    return user.id
+
+
+def fresh_request(app):
+    g.pop('_users', None)
+    db.session.remove()
+
+
+def test_cache_keeps_no_password_hash(app, user_id):
+    load_user(user_id)
+    assert 'password_hash' not in user_cache.get(user_id)
+    assert user_cache.get(user_id)['email'] == 'cached@example.com'
+
+    fresh_request(app)
+    user = load_user(user_id)
+    # Loaded from the database when something does need it
+    assert user.password_hash == 'scrypt:1:8:1$salt$hash'
+
+
+def test_rollback_forgets_pending_invalidations(app, user_id):
+    user = db.session.get(User, user_id)
+    user.name = 'Renamed'
+    db.session.flush()
+    assert db.session.info['changed_users'] == {user_id}
+    db.session.rollback()
+    assert 'changed_users' not in db.session.info
+
+
+def test_committed_update_drops_the_cached_row(app, user_id):
+    load_user(user_id)
+    fresh_request(app)
+    user = db.session.get(User, user_id)
+    user.name = 'Renamed'
+    db.session.commit()
+    assert user_cache.get(user_id) is None
+    fresh_request(app)
+    assert load_user(user_id).name == 'Renamed'
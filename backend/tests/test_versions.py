@@ -0,0 +1,47 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from finance_tracker.extensions import db
+from finance_tracker.models.user import User
+
+
+@pytest.fixture
+def client(app):
+    user = User(name='Etag', email='etag@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity=str(user.id))}'
+    return client
+
+
+def test_unchanged_data_answers_304(client):
+    first = client.get('/api/savings/goals')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and first.headers['Cache-Control'] == 'private, no-cache'
+
+    again = client.get('/api/savings/goals', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b'' and again.headers['ETag'] == etag
+
+
+def test_a_write_invalidates_the_etag(client):
+    etag = client.get('/api/savings/goals').headers['ETag']
+    assert client.post('/api/savings/goals', json={'name': 'Bike', 'target_amount': 500}).status_code == 201
+
+    response = client.get('/api/savings/goals', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag and response.headers['Last-Modified']
+    assert [goal['name'] for goal in response.get_json()] == ['Bike']
+
+
+def test_etag_depends_on_the_query_string(client):
+    etag = client.get('/api/savings/goals?limit=1').headers['ETag']
+    response = client.get('/api/savings/goals?limit=2', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.headers['ETag'] != etag
+
+
+def test_writes_are_not_conditional(client):
+    etag = client.get('/api/savings/goals').headers['ETag']
+    response = client.post('/api/savings/goals', json={'name': 'Car', 'target_amount': 900},
+                           headers={'If-None-Match': etag})
+    assert response.status_code == 201